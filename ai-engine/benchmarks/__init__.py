@@ -0,0 +1 @@
+# Benchmarks for AI engine
\ No newline at end of file
@@ -0,0 +1,100 @@
+"""
+Benchmark: encode/decode time and stored bytes for cached service payloads.
+
+Builds the payloads the services actually cache (the comprehensive trade
+analysis and the product market intelligence) and measures every
+available serializer/compression combination of CacheCodec against the
+legacy `json.dumps(value, default=str)` path.
+
+Usage (from the ai-engine directory):
+    python -m benchmarks.codec_benchmark --iterations 500
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Callable, Dict, List
+
+from src.database.codecs import CacheCodec, msgpack, orjson, zstandard
+from src.database.embedded_storage import EmbeddedStorage
+from src.database.redis_client import MockRedisPool, RedisClient
+from src.services.market_analyzer import MarketAnalyzer
+from src.services.trade_intelligence_service import TradeIntelligenceService
+
+
+async def build_payloads() -> Dict[str, Any]:
+    redis_client = RedisClient()
+    redis_client.redis_pool = MockRedisPool()
+
+    storage = EmbeddedStorage()
+    storage.seed({"products": [{"_id": "saffron", "name": "Saffron", "pricing": {"current_price": 2500}}]})
+
+    trade_service = TradeIntelligenceService(storage, redis_client)
+    market_analyzer = MarketAnalyzer(storage, redis_client)
+
+    return {
+        "trade_analysis": await trade_service.get_comprehensive_trade_analysis(
+            "shilajit", "IN", "US", quantity=1000, budget=50000
+        ),
+        "product_intelligence": await market_analyzer.get_product_intelligence("saffron")
+    }
+
+
+def _time_per_call(fn: Callable[[], Any], iterations: int) -> float:
+    started = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - started) / iterations * 1e6
+
+
+def _codecs() -> Dict[str, CacheCodec]:
+    serializers = ["json"] + (["orjson"] if orjson else []) + (["msgpack"] if msgpack else [])
+    compressions = ["none", "zlib"] + (["zstd"] if zstandard else [])
+    return {
+        f"{serializer}+{compression}": CacheCodec(serializer, compression, compress_threshold=1024)
+        for serializer in serializers
+        for compression in compressions
+    }
+
+
+def run(payloads: Dict[str, Any], iterations: int) -> List[Dict[str, Any]]:
+    results = []
+    for payload_name, payload in payloads.items():
+        legacy = json.dumps(payload, default=str)
+        results.append({
+            "payload": payload_name,
+            "codec": "legacy json.dumps",
+            "encode_us": round(_time_per_call(lambda: json.dumps(payload, default=str), iterations), 1),
+            "decode_us": round(_time_per_call(lambda: json.loads(legacy), iterations), 1),
+            "stored_bytes": len(legacy.encode("utf-8"))
+        })
+
+        for codec_name, codec in _codecs().items():
+            encoded = codec.encode(payload)
+            results.append({
+                "payload": payload_name,
+                "codec": codec_name,
+                "encode_us": round(_time_per_call(lambda: codec.encode(payload), iterations), 1),
+                "decode_us": round(_time_per_call(lambda: codec.decode(encoded), iterations), 1),
+                "stored_bytes": len(encoded)
+            })
+    return results
+
+
+def main(iterations: int) -> None:
+    payloads = asyncio.run(build_payloads())
+    results = run(payloads, iterations)
+
+    print(f"{'payload':<22}{'codec':<20}{'encode us':>12}{'decode us':>12}{'bytes':>10}")
+    for row in results:
+        print(
+            f"{row['payload']:<22}{row['codec']:<20}"
+            f"{row['encode_us']:>12}{row['decode_us']:>12}{row['stored_bytes']:>10}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+    main(args.iterations)
@@ -0,0 +1,86 @@
+"""
+Benchmark: per-item cost of PricePredictionModel.predict vs. predict_batch.
+
+Trains the model into a temporary directory, then prices batches of
+1 to 10k products both ways: one predict() call per product (a scaler
+transform and a tree-engine predict per row) and a single predict_batch()
+call. The per-call path is timed on at most --loop-limit products per
+batch size, since its per-item cost does not depend on the batch.
+
+Usage (from the ai-engine directory):
+    python -m benchmarks.prediction_batch_benchmark --sizes 1 10 100 1000 10000 --loop-limit 500
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from src.models.prediction_models import PricePredictionModel
+
+
+async def build_model(model_dir: str) -> PricePredictionModel:
+    model = PricePredictionModel()
+    model.model_path = os.path.join(model_dir, "price_prediction_model.pkl")
+    model.scaler_path = os.path.join(model_dir, "price_scaler.pkl")
+    await model.load_model()
+    # Time the model itself, not repeat hits in the prediction memo
+    model.prediction_memo.max_entries = 0
+    return model
+
+
+async def time_per_call(model: PricePredictionModel, product_ids: List[str]) -> float:
+    started = time.perf_counter()
+    for product_id in product_ids:
+        await model.predict(product_id)
+    return time.perf_counter() - started
+
+
+async def time_batch(model: PricePredictionModel, product_ids: List[str], repeats: int) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        await model.predict_batch(product_ids)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+async def main(sizes: List[int], loop_limit: int, repeats: int) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as model_dir:
+        model = await build_model(model_dir)
+
+        # Warm up sklearn and numpy before timing
+        await model.predict("warmup")
+        await model.predict_batch(["warmup"] * 10)
+
+        rows = []
+        for size in sizes:
+            product_ids = [f"sku_{i}" for i in range(size)]
+            looped = product_ids[:loop_limit]
+            per_call_seconds = await time_per_call(model, looped)
+            batch_seconds = await time_batch(model, product_ids, repeats)
+
+            per_call_us = per_call_seconds / len(looped) * 1e6
+            batch_us = batch_seconds / size * 1e6
+            rows.append({
+                "batch_size": size,
+                "per_call_us_per_item": round(per_call_us, 1),
+                "batch_us_per_item": round(batch_us, 1),
+                "batch_total_ms": round(batch_seconds * 1000, 2),
+                "speedup": round(per_call_us / batch_us, 1) if batch_us else None
+            })
+
+    results = {"loop_limit": loop_limit, "repeats": repeats, "results": rows}
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 100, 1000, 10000])
+    parser.add_argument("--loop-limit", type=int, default=500)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.sizes, args.loop_limit, args.repeats))
@@ -0,0 +1,106 @@
+"""
+Benchmark: per-call Redis client vs. the shared pooled RedisClient.
+
+Runs a GET/SET mix against a local redis-server and reports ops/sec for
+the old pattern (build a Redis object per call and close it again) and
+for RedisClient's single long-lived client.
+
+Usage (from the ai-engine directory):
+    python -m benchmarks.redis_pool_benchmark --url redis://localhost:6379 --ops 20000 --concurrency 50
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import Any, Dict
+
+from redis import asyncio as aioredis
+
+from src.database.redis_client import RedisClient
+
+PAYLOAD = {
+    "product_id": "shilajit",
+    "market_analysis": {market: {"market_price": 45.0, "demand_level": 0.8} for market in ["US", "EU", "UK", "Canada", "Australia", "Japan"]},
+    "risk_factors": ["price_volatility", "currency_fluctuation"]
+}
+
+
+async def _per_call_get(pool: Any, key: str) -> Any:
+    redis = aioredis.Redis(connection_pool=pool)
+    value = await redis.get(key)
+    await redis.aclose()
+    return json.loads(value) if value else None
+
+
+async def _per_call_set(pool: Any, key: str, value: Any) -> bool:
+    redis = aioredis.Redis(connection_pool=pool)
+    result = await redis.setex(key, 300, json.dumps(value, default=str))
+    await redis.aclose()
+    return bool(result)
+
+
+async def _run(ops: int, concurrency: int, get_op, set_op) -> float:
+    """Run `ops` operations (80% reads) across `concurrency` workers, return ops/sec"""
+    per_worker = ops // concurrency
+
+    async def worker(worker_id: int):
+        for i in range(per_worker):
+            key = f"bench_{worker_id}_{i % 100}"
+            if i % 5 == 0:
+                await set_op(key, PAYLOAD)
+            else:
+                await get_op(key)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker(w) for w in range(concurrency)])
+    elapsed = time.perf_counter() - started
+    return (per_worker * concurrency) / elapsed
+
+
+async def main(url: str, ops: int, concurrency: int, pool_size: int) -> Dict[str, Any]:
+    # Before: a Redis object is built and closed around every command
+    legacy_pool = aioredis.ConnectionPool.from_url(
+        url, decode_responses=True, max_connections=pool_size
+    )
+    legacy_ops = await _run(
+        ops, concurrency,
+        lambda key: _per_call_get(legacy_pool, key),
+        lambda key, value: _per_call_set(legacy_pool, key, value)
+    )
+    await legacy_pool.disconnect()
+
+    # After: one shared client over a bounded, health-checked pool
+    client = RedisClient(connection_string=url, max_connections=pool_size)
+    await client.connect()
+    if client.redis is None:
+        raise SystemExit(f"redis-server not reachable at {url}")
+
+    pooled_ops = await _run(
+        ops, concurrency,
+        client.get,
+        lambda key, value: client.set(key, value, expire=300)
+    )
+    pool_stats = client.get_pool_stats()
+    await client.disconnect()
+
+    results = {
+        "ops": ops,
+        "concurrency": concurrency,
+        "pool_size": pool_size,
+        "per_call_client_ops_per_sec": round(legacy_ops, 1),
+        "shared_client_ops_per_sec": round(pooled_ops, 1),
+        "speedup": round(pooled_ops / legacy_ops, 2) if legacy_ops else None,
+        "pool_stats": pool_stats
+    }
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="redis://localhost:6379")
+    parser.add_argument("--ops", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--pool-size", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.url, args.ops, args.concurrency, args.pool_size))
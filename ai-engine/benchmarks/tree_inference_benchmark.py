@@ -0,0 +1,114 @@
+"""
+Benchmark: arbitrage scoring latency with sklearn vs. the array tree engine.
+
+Trains ComprehensiveArbitrageModel into a temporary registry, then times
+the single-lane analysis behind the arbitrage endpoint
+(_analyze_product_opportunity: one price, demand and risk prediction)
+and batches of distinct feature rows of several sizes, once through the
+sklearn estimators and once through the flattened ensembles. Also reports the largest
+difference between the two predictions.
+
+Usage (from the ai-engine directory):
+    python -m benchmarks.tree_inference_benchmark --calls 200 --rows 1 16 64 256 1024
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import tempfile
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+
+from src.models.registry import ModelRegistry
+from src.models.trade_analytics_models import ENSEMBLE_NAMES, TRAINING_COUNTRIES, ComprehensiveArbitrageModel
+
+
+async def build_model(registry_root: str) -> ComprehensiveArbitrageModel:
+    model = ComprehensiveArbitrageModel()
+    model.registry = ModelRegistry(registry_root)
+    model.fit()
+    await model._load_version()
+    await model._load_estimators(model.model_version, list(ENSEMBLE_NAMES))
+    # Time the ensembles themselves, not repeat hits in the prediction memo
+    model.prediction_memo.max_entries = 0
+    return model
+
+
+async def time_single_lane(model: ComprehensiveArbitrageModel, calls: int) -> Dict[str, float]:
+    latencies = []
+    for i in range(calls):
+        source, target = TRAINING_COUNTRIES[i % 5], TRAINING_COUNTRIES[5 + i % 5]
+        started = time.perf_counter()
+        await model._analyze_product_opportunity(f"sku_{i}", source, target, 1000, 100.0 + i)
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    return {
+        "p50_ms": round(statistics.median(latencies), 3),
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1], 3)
+    }
+
+
+def random_features(model: ComprehensiveArbitrageModel, n_rows: int, seed: int) -> np.ndarray:
+    """Unscaled rows spread like the training data, all distinct"""
+    rng = np.random.default_rng(seed)
+    return rng.normal(size=(n_rows, model.scaler.n_features_in_)) * model.scaler.scale_ + model.scaler.mean_
+
+
+def time_rows(model: ComprehensiveArbitrageModel, n_rows: int, repeats: int) -> float:
+    features = random_features(model, n_rows, seed=0)
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        model._predict_scores(features)
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def max_difference(model: ComprehensiveArbitrageModel) -> Dict[str, float]:
+    features = model.scaler.transform(random_features(model, 5000, seed=1))
+    return {
+        name: float(np.abs(engine.predict(features) - model.estimators[name].predict(features)).max())
+        for name, engine in model.compiled_models.items()
+    }
+
+
+async def main(calls: int, row_sizes: List[int], repeats: int) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as registry_root:
+        model = await build_model(registry_root)
+        compiled_max_rows = model.compiled_max_rows
+
+        # Warm up sklearn and numpy before timing
+        await time_single_lane(model, 5)
+
+        single_lane = {}
+        batches = []
+        for engine, max_rows in (("sklearn", 0), ("tree_engine", max(row_sizes))):
+            model.compiled_max_rows = max_rows
+            single_lane[engine] = await time_single_lane(model, calls)
+            for size in row_sizes:
+                batches.append({"engine": engine, "rows": size, "best_ms": round(time_rows(model, size, repeats), 3)})
+
+        results = {
+            "calls": calls,
+            "compiled_max_rows": compiled_max_rows,
+            "nodes": {name: len(engine.value) for name, engine in model.compiled_models.items()},
+            "single_lane": single_lane,
+            "single_lane_speedup": round(
+                single_lane["sklearn"]["p50_ms"] / single_lane["tree_engine"]["p50_ms"], 1
+            ),
+            "row_batches": batches,
+            "max_abs_difference": max_difference(model)
+        }
+    print(json.dumps(results, indent=2))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1, 16, 64, 256, 1024])
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.calls, args.rows, args.repeats))
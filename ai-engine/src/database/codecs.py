@@ -0,0 +1,166 @@
+import json
+import zlib
+from typing import Any, Callable, Dict, Optional, Tuple
+
+try:
+    import orjson
+except ImportError:  # optional: faster JSON encoder
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # optional: compact binary encoder
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # optional: faster compression than zlib
+    zstandard = None
+
+# Header layout for encoded payloads: [FORMAT_VERSION][serializer << 4 | compression]
+# 0xF8 can never start a UTF-8 string, so legacy plain-JSON entries stay decodable.
+FORMAT_VERSION = 0xF8
+
+SERIALIZER_IDS = {"json": 0, "orjson": 1, "msgpack": 2}
+COMPRESSION_IDS = {"none": 0, "zlib": 1, "zstd": 2}
+
+
+def _json_dumps(value: Any) -> bytes:
+    return json.dumps(value, default=str).encode("utf-8")
+
+
+def _json_loads(data: bytes) -> Any:
+    return json.loads(data)
+
+
+def _orjson_dumps(value: Any) -> bytes:
+    return orjson.dumps(
+        value,
+        default=str,
+        option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+    )
+
+
+def _orjson_loads(data: bytes) -> Any:
+    # orjson output is plain JSON, so workers without orjson can still read it
+    if orjson is None:
+        return json.loads(data)
+    return orjson.loads(data)
+
+
+def _msgpack_dumps(value: Any) -> bytes:
+    return msgpack.packb(value, default=str, use_bin_type=True)
+
+
+def _msgpack_loads(data: bytes) -> Any:
+    if msgpack is None:
+        raise ValueError("msgpack-encoded cache entry but msgpack is not installed")
+    return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+SERIALIZERS: Dict[str, Tuple[Callable[[Any], bytes], Callable[[bytes], Any]]] = {
+    "json": (_json_dumps, _json_loads),
+    "orjson": (_orjson_dumps, _orjson_loads),
+    "msgpack": (_msgpack_dumps, _msgpack_loads)
+}
+LOADERS_BY_ID = {SERIALIZER_IDS[name]: loads for name, (_, loads) in SERIALIZERS.items()}
+
+
+class CacheCodec:
+    """Encodes cached payloads with a pluggable serializer and optional compression.
+    
+    Strings are stored as raw UTF-8 so counters and plain values stay
+    readable by other clients. Everything else is serialized, compressed
+    when larger than `compress_threshold` bytes and prefixed with a
+    two-byte header recording the format version, serializer and
+    compression. Entries without the header (written before codecs
+    existed) are decoded as JSON text.
+    """
+    
+    def __init__(
+        self,
+        serializer: str = "auto",
+        compression: str = "auto",
+        compress_threshold: int = 4096,
+        compression_level: int = 3
+    ):
+        if serializer == "auto":
+            serializer = "orjson" if orjson is not None else "json"
+        if compression == "auto":
+            compression = "zstd" if zstandard is not None else "zlib"
+            
+        if serializer not in SERIALIZER_IDS:
+            raise ValueError(f"Unknown cache serializer: {serializer}")
+        if compression not in COMPRESSION_IDS:
+            raise ValueError(f"Unknown cache compression: {compression}")
+        if serializer == "orjson" and orjson is None:
+            raise ValueError("orjson serializer requested but orjson is not installed")
+        if serializer == "msgpack" and msgpack is None:
+            raise ValueError("msgpack serializer requested but msgpack is not installed")
+        if compression == "zstd" and zstandard is None:
+            raise ValueError("zstd compression requested but zstandard is not installed")
+            
+        self.serializer = serializer
+        self.compression = compression
+        self.compress_threshold = compress_threshold
+        self.compression_level = compression_level
+        
+        self._dumps = SERIALIZERS[serializer][0]
+        self._zstd_compressor = (
+            zstandard.ZstdCompressor(level=compression_level) if zstandard is not None else None
+        )
+        self._zstd_decompressor = zstandard.ZstdDecompressor() if zstandard is not None else None
+    
+    def encode(self, value: Any) -> bytes:
+        """Encode a value for storage"""
+        if isinstance(value, str):
+            return value.encode("utf-8")
+        if isinstance(value, bytes):
+            return value
+            
+        body = self._dumps(value)
+        compression = "none"
+        if self.compression != "none" and len(body) >= self.compress_threshold:
+            body = self._compress(body)
+            compression = self.compression
+            
+        flags = (SERIALIZER_IDS[self.serializer] << 4) | COMPRESSION_IDS[compression]
+        return bytes((FORMAT_VERSION, flags)) + body
+    
+    def decode(self, data: Optional[bytes]) -> Optional[Any]:
+        """Decode a stored value; legacy entries fall back to JSON or raw text"""
+        if not data:
+            return None
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+            
+        if data[0] != FORMAT_VERSION:
+            text = data.decode("utf-8")
+            try:
+                return json.loads(text)
+            except json.JSONDecodeError:
+                return text
+                
+        flags = data[1]
+        serializer_id, compression_id = flags >> 4, flags & 0x0F
+        loads = LOADERS_BY_ID.get(serializer_id)
+        if loads is None:
+            raise ValueError(f"Unknown cache serializer id: {serializer_id}")
+            
+        return loads(self._decompress(data[2:], compression_id))
+    
+    def _compress(self, body: bytes) -> bytes:
+        if self.compression == "zstd":
+            return self._zstd_compressor.compress(body)
+        return zlib.compress(body, self.compression_level)
+    
+    def _decompress(self, body: bytes, compression_id: int) -> bytes:
+        if compression_id == COMPRESSION_IDS["none"]:
+            return body
+        if compression_id == COMPRESSION_IDS["zlib"]:
+            return zlib.decompress(body)
+        if compression_id == COMPRESSION_IDS["zstd"]:
+            if self._zstd_decompressor is None:
+                raise ValueError("zstd-compressed cache entry but zstandard is not installed")
+            return self._zstd_decompressor.decompress(body)
+        raise ValueError(f"Unknown cache compression id: {compression_id}")
@@ -0,0 +1,333 @@
+import asyncio
+import copy
+import logging
+import statistics
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
+
+from bson import ObjectId
+
+from .indexes import INDEX_SPECS
+from .market_data import parse_interval, to_naive_utc, to_time_series_document, truncate_timestamp
+from .storage import StorageBackend
+
+
+def _get_field(document: Dict[str, Any], path: str) -> Any:
+    """Resolve a dotted path such as "meta.product_id" """
+    value: Any = document
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def _matches(document: Dict[str, Any], filter_query: Dict[str, Any]) -> bool:
+    """Equality match; array fields match when they contain the value, like Mongo"""
+    for field, expected in filter_query.items():
+        value = _get_field(document, field)
+        if isinstance(value, list) and not isinstance(expected, list):
+            if expected not in value:
+                return False
+        elif value != expected:
+            return False
+    return True
+
+
+def _hashable(value: Any) -> Any:
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return repr(value)
+
+
+class _Collection:
+    """Documents keyed by _id with hash indexes on the leading field of each declared index"""
+    
+    def __init__(self, indexed_fields: Iterable[str]):
+        self.documents: Dict[Any, Dict[str, Any]] = {}
+        self.positions: Dict[Any, int] = {}
+        self.inserted = 0
+        self.indexes: Dict[str, Dict[Any, Set[Any]]] = {
+            field: defaultdict(set) for field in indexed_fields
+        }
+    
+    def insert(self, document: Dict[str, Any]) -> Any:
+        document = copy.deepcopy(document)
+        document.setdefault("_id", ObjectId())
+        if document["_id"] in self.documents:
+            raise ValueError(f"Duplicate key: {document['_id']}")
+        self.documents[document["_id"]] = document
+        self.positions[document["_id"]] = self.inserted
+        self.inserted += 1
+        self._index(document)
+        return document["_id"]
+    
+    def update(self, document_id: Any, update_data: Dict[str, Any]) -> bool:
+        document = self.documents.get(document_id)
+        if document is None:
+            return False
+        changed = any(document.get(field) != value for field, value in update_data.items())
+        self._unindex(document)
+        document.update(copy.deepcopy(update_data))
+        self._index(document)
+        return changed
+    
+    def find(self, filter_query: Dict[str, Any]) -> List[Dict[str, Any]]:
+        candidates: Optional[Set[Any]] = None
+        if "_id" in filter_query:
+            candidates = {filter_query["_id"]} if filter_query["_id"] in self.documents else set()
+        else:
+            for field, expected in filter_query.items():
+                if field in self.indexes:
+                    ids = self.indexes[field].get(_hashable(expected), set())
+                    candidates = ids if candidates is None else candidates & ids
+                    
+        if candidates is None:
+            documents = self.documents.values()
+        else:
+            # Keep insertion order so results are deterministic
+            documents = [self.documents[doc_id] for doc_id in sorted(candidates, key=self.positions.__getitem__)]
+        return [doc for doc in documents if _matches(doc, filter_query)]
+    
+    def _index(self, document: Dict[str, Any]) -> None:
+        for field, index in self.indexes.items():
+            for value in self._index_values(document, field):
+                index[value].add(document["_id"])
+    
+    def _unindex(self, document: Dict[str, Any]) -> None:
+        for field, index in self.indexes.items():
+            for value in self._index_values(document, field):
+                index[value].discard(document["_id"])
+    
+    @staticmethod
+    def _index_values(document: Dict[str, Any], field: str) -> List[Any]:
+        value = _get_field(document, field)
+        values = value if isinstance(value, list) else [value]
+        return [_hashable(item) for item in values]
+
+
+class EmbeddedStorage(StorageBackend):
+    """In-process storage backend with the same surface as MongoDBClient.
+    
+    Collections are dicts with hash indexes on the fields INDEX_SPECS
+    declares, so lookups behave like the indexed Mongo queries. Nothing
+    touches the network or disk and iteration order is insertion order,
+    which keeps load tests and benchmarks deterministic. TTL indexes are
+    not enforced. Returned documents are shared with the store and must
+    be treated as read-only.
+    """
+    
+    def __init__(self):
+        self.collections: Dict[str, _Collection] = {}
+        self.default_batch_size = 1000
+        self.connected = False
+    
+    async def connect(self):
+        """Open the in-memory store"""
+        self.connected = True
+        logging.info("Using embedded in-process storage")
+    
+    async def disconnect(self):
+        """Close the in-memory store; data is kept for reuse"""
+        self.connected = False
+    
+    def seed(self, data: Dict[str, List[Dict[str, Any]]]) -> None:
+        """Load fixture documents, keyed by collection name"""
+        for collection, documents in data.items():
+            for document in documents:
+                if collection == "market_data":
+                    document = to_time_series_document(document)
+                self._collection(collection).insert(document)
+    
+    def _collection(self, name: str) -> _Collection:
+        collection = self.collections.get(name)
+        if collection is None:
+            indexed_fields = {
+                next(iter(index.document["key"])) for index in INDEX_SPECS.get(name, [])
+            }
+            collection = _Collection(indexed_fields)
+            self.collections[name] = collection
+        return collection
+    
+    async def _insert(self, collection: str, document: Dict[str, Any]) -> bool:
+        try:
+            self._collection(collection).insert(document)
+            return True
+        except Exception as e:
+            logging.error(f"Error storing into {collection}: {e}")
+            return False
+    
+    async def get_product(self, product_id: str) -> Optional[Dict[str, Any]]:
+        """Get a single product by ID"""
+        products = self._collection("products").find({"_id": product_id})
+        return products[0] if products else None
+    
+    async def get_products(self, product_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get several products by ID"""
+        documents = self._collection("products").documents
+        return {
+            product_id: documents[product_id]
+            for product_id in product_ids if product_id in documents
+        }
+    
+    async def get_all_products(self) -> List[Dict[str, Any]]:
+        """Get all products"""
+        return self._collection("products").find({})
+    
+    async def get_products_by_category(self, category: str) -> List[Dict[str, Any]]:
+        """Get products by category"""
+        return self._collection("products").find({"category": category})
+    
+    async def update_product(self, product_id: str, update_data: Dict[str, Any]) -> bool:
+        """Update a product"""
+        return self._collection("products").update(product_id, update_data)
+    
+    async def get_market_data(self, product_id: str) -> List[Dict[str, Any]]:
+        """Get market data for a product"""
+        return self._collection("market_data").find({"meta.product_id": product_id})
+    
+    async def get_market_ohlc(
+        self,
+        product_id: str,
+        interval: str = "1d",
+        market: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """Get OHLC, mean price and volatility per market and interval"""
+        try:
+            unit, bin_size = parse_interval(interval)
+            filter_query = {"meta.product_id": product_id}
+            if market:
+                filter_query["meta.market"] = market
+            # Stored timestamps may be naive or tz-aware; compare everything as naive UTC
+            start = to_naive_utc(start) if start else None
+            end = to_naive_utc(end) if end else None
+                
+            groups: Dict[Tuple[Any, datetime], List[Dict[str, Any]]] = defaultdict(list)
+            for tick in self._collection("market_data").find(filter_query):
+                timestamp = to_naive_utc(tick["timestamp"])
+                if (start and timestamp < start) or (end and timestamp >= end):
+                    continue
+                period_start = truncate_timestamp(timestamp, unit, bin_size)
+                groups[(tick["meta"].get("market"), period_start)].append(tick)
+                
+            rows = []
+            for (tick_market, period_start), ticks in sorted(
+                groups.items(), key=lambda item: (str(item[0][0]), item[0][1])
+            ):
+                ticks.sort(key=lambda tick: to_naive_utc(tick["timestamp"]))
+                prices = [tick["price"] for tick in ticks if tick.get("price") is not None]
+                mean = statistics.fmean(prices) if prices else None
+                volatility = statistics.pstdev(prices) if prices else None
+                rows.append({
+                    "market": tick_market,
+                    "period_start": period_start,
+                    "open": prices[0] if prices else None,
+                    "high": max(prices) if prices else None,
+                    "low": min(prices) if prices else None,
+                    "close": prices[-1] if prices else None,
+                    "mean": mean,
+                    "volatility": volatility,
+                    "relative_volatility": volatility / mean if mean else None,
+                    "volume": sum(tick.get("volume") or 0 for tick in ticks),
+                    "samples": len(ticks)
+                })
+            return rows
+            
+        except Exception as e:
+            logging.error(f"Error aggregating market data: {e}")
+            return []
+    
+    async def store_market_data(self, market_data: Dict[str, Any]) -> bool:
+        """Store market data"""
+        try:
+            document = to_time_series_document(market_data)
+        except ValueError as e:
+            logging.error(f"Error storing into market_data: {e}")
+            return False
+        return await self._insert("market_data", document)
+    
+    async def get_orders(self, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get orders with optional status filter"""
+        return self._collection("orders").find({"status": status} if status else {})
+    
+    async def get_suppliers(self, country: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get suppliers with optional country filter"""
+        return self._collection("suppliers").find({"country": country} if country else {})
+    
+    async def store_prediction(self, prediction_data: Dict[str, Any]) -> bool:
+        """Store AI prediction data"""
+        prediction_data.setdefault("created_at", datetime.utcnow())
+        return await self._insert("predictions", prediction_data)
+    
+    async def get_predictions(self, product_id: str) -> List[Dict[str, Any]]:
+        """Get predictions for a product"""
+        return self._collection("predictions").find({"product_id": product_id})
+    
+    async def store_news_impact(self, news_impact: Dict[str, Any]) -> bool:
+        """Store news impact"""
+        news_impact.setdefault("created_at", datetime.utcnow())
+        return await self._insert("news_impacts", news_impact)
+    
+    async def store_news_impacts(self, news_impacts: List[Dict[str, Any]]) -> bool:
+        """Store several news impacts in one batch"""
+        results = [await self.store_news_impact(news_impact) for news_impact in news_impacts]
+        return all(results)
+    
+    async def store_arbitrage_opportunity(self, opportunity: Dict[str, Any]) -> bool:
+        """Store arbitrage opportunity"""
+        return await self._insert("arbitrage_opportunities", opportunity)
+    
+    async def get_arbitrage_opportunities(self) -> List[Dict[str, Any]]:
+        """Get all arbitrage opportunities"""
+        return self._collection("arbitrage_opportunities").find({})
+    
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """No connections to pool; reported for parity with MongoDBClient"""
+        return {"backend": "embedded", "max_pool_size": 0, "in_use": 0, "open": 0}
+    
+    async def iter_documents(
+        self,
+        collection: str,
+        filter_query: Optional[Dict[str, Any]] = None,
+        projection: Optional[Dict[str, Any]] = None,
+        sort: Optional[List[Tuple[str, int]]] = None,
+        limit: int = 0,
+        batch_size: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream documents from a collection one at a time"""
+        documents = self._collection(collection).find(filter_query or {})
+        for field, direction in reversed(sort or []):
+            # Stable sorts applied last key first give a compound ordering; missing fields sort first
+            documents.sort(
+                key=lambda doc: (_get_field(doc, field) is not None, _get_field(doc, field)),
+                reverse=direction < 0
+            )
+        if limit:
+            documents = documents[:limit]
+            
+        batch_size = batch_size or self.default_batch_size
+        for position, document in enumerate(documents, 1):
+            yield self._project(document, projection)
+            if position % batch_size == 0:
+                await asyncio.sleep(0)  # yield to the loop between batches like a cursor would
+    
+    @staticmethod
+    def _project(document: Dict[str, Any], projection: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        if not projection:
+            return document
+        include_id = projection.get("_id", 1)
+        fields = {field: flag for field, flag in projection.items() if field != "_id"}
+        if any(fields.values()):
+            projected = {field: document[field] for field in fields if field in document}
+        else:
+            projected = {field: value for field, value in document.items() if field not in fields}
+        if include_id and "_id" in document:
+            projected["_id"] = document["_id"]
+        elif not include_id:
+            projected.pop("_id", None)
+        return projected
@@ -0,0 +1,129 @@
+import logging
+from typing import Any, Dict, List, Tuple
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+NEWS_IMPACT_RETENTION_SECONDS = 30 * 24 * 3600
+PREDICTION_RETENTION_SECONDS = 90 * 24 * 3600
+
+# Indexes every collection needs; applied idempotently on connect
+INDEX_SPECS: Dict[str, List[IndexModel]] = {
+    "products": [
+        IndexModel([("category", ASCENDING)], name="category_1")
+    ],
+    "orders": [
+        IndexModel([("status", ASCENDING)], name="status_1")
+    ],
+    "suppliers": [
+        IndexModel([("country", ASCENDING)], name="country_1")
+    ],
+    "market_data": [
+        IndexModel(
+            [("meta.product_id", ASCENDING), ("meta.market", ASCENDING), ("timestamp", DESCENDING)],
+            name="meta_product_id_1_meta_market_1_timestamp_-1"
+        )
+    ],
+    "predictions": [
+        IndexModel([("product_id", ASCENDING), ("created_at", DESCENDING)], name="product_id_1_created_at_-1"),
+        IndexModel(
+            [("created_at", ASCENDING)],
+            name="created_at_ttl",
+            expireAfterSeconds=PREDICTION_RETENTION_SECONDS
+        )
+    ],
+    "news_impacts": [
+        IndexModel(
+            [("affected_products", ASCENDING), ("created_at", DESCENDING)],
+            name="affected_products_1_created_at_-1"
+        ),
+        IndexModel(
+            [("created_at", ASCENDING)],
+            name="created_at_ttl",
+            expireAfterSeconds=NEWS_IMPACT_RETENTION_SECONDS
+        )
+    ]
+}
+
+# Filter fields of every query MongoDBClient issues, kept next to the specs
+# so a new query without a matching index is reported at startup
+QUERY_SHAPES: List[Tuple[str, Tuple[str, ...]]] = [
+    ("products", ()),
+    ("products", ("category",)),
+    ("products", ("_id",)),
+    ("market_data", ("meta.product_id",)),
+    ("market_data", ("meta.product_id", "meta.market")),
+    ("orders", ()),
+    ("orders", ("status",)),
+    ("suppliers", ()),
+    ("suppliers", ("country",)),
+    ("predictions", ("product_id",)),
+    ("arbitrage_opportunities", ())
+]
+
+
+def _index_keys(index: IndexModel) -> List[str]:
+    return [field for field, _ in index.document["key"].items()]
+
+
+def find_uncovered_queries(
+    specs: Dict[str, List[IndexModel]] = INDEX_SPECS,
+    query_shapes: List[Tuple[str, Tuple[str, ...]]] = QUERY_SHAPES
+) -> List[Dict[str, Any]]:
+    """Queries whose filter fields are not a prefix of any declared index.
+    
+    Unfiltered scans and `_id` lookups are always covered.
+    """
+    uncovered = []
+    for collection, fields in query_shapes:
+        if not fields or fields == ("_id",):
+            continue
+        covered = any(
+            set(_index_keys(index)[:len(fields)]) == set(fields)
+            for index in specs.get(collection, [])
+        )
+        if not covered:
+            uncovered.append({"collection": collection, "filter_fields": list(fields)})
+    return uncovered
+
+
+async def ensure_indexes(db: Any, specs: Dict[str, List[IndexModel]] = INDEX_SPECS) -> Dict[str, List[str]]:
+    """Create missing indexes and bring TTLs in line with the spec.
+    
+    Existing indexes with the same definition are left alone, so this is
+    safe to run on every startup. Returns the index names per collection.
+    """
+    applied: Dict[str, List[str]] = {}
+    for collection, indexes in specs.items():
+        try:
+            applied[collection] = await db[collection].create_indexes(indexes)
+        except OperationFailure as e:
+            # An index with this name exists with different options; TTLs can be changed in place
+            logging.warning(f"Index options differ on {collection}, reconciling: {e}")
+            applied[collection] = await _reconcile_indexes(db, collection, indexes)
+        except Exception as e:
+            logging.error(f"Error creating indexes on {collection}: {e}")
+            
+    for query in find_uncovered_queries(specs):
+        logging.warning(
+            f"Query on {query['collection']} by {query['filter_fields']} is not covered by an index"
+        )
+    return applied
+
+
+async def _reconcile_indexes(db: Any, collection: str, indexes: List[IndexModel]) -> List[str]:
+    names = []
+    for index in indexes:
+        document = index.document
+        try:
+            names.extend(await db[collection].create_indexes([index]))
+        except OperationFailure as e:
+            if "expireAfterSeconds" not in document:
+                logging.error(f"Cannot apply index {document['name']} on {collection}: {e}")
+                continue
+            await db.command({
+                "collMod": collection,
+                "index": {"name": document["name"], "expireAfterSeconds": document["expireAfterSeconds"]}
+            })
+            names.append(document["name"])
+    return names
@@ -0,0 +1,98 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+class LocalCache:
+    """In-process LRU cache with per-entry TTLs and a memory budget.
+    
+    Values are returned as stored, without copying; callers that hand
+    them out should store immutable payloads (RedisClient keeps encoded
+    bytes) or treat them as read-only. Entry sizes are supplied by the
+    caller (the length of the serialized payload) and bound the total
+    footprint.
+    """
+    
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        max_entries: int = 10000,
+        default_ttl: int = 300
+    ):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self.entries: "OrderedDict[str, Tuple[Any, float, int]]" = OrderedDict()
+        self.current_bytes = 0
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "invalidations": 0
+        }
+    
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """Return (hit, value) for a key, dropping it if expired"""
+        entry = self.entries.get(key)
+        if entry is None:
+            self.stats["misses"] += 1
+            return False, None
+            
+        value, expires_at, _ = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.stats["expirations"] += 1
+            self.stats["misses"] += 1
+            return False, None
+            
+        self.entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return True, value
+    
+    def set(self, key: str, value: Any, ttl: Optional[float] = None, size: int = 0) -> bool:
+        """Store a value for `ttl` seconds; oversized entries are not cached"""
+        ttl = self.default_ttl if ttl is None else ttl
+        if ttl <= 0 or size > self.max_bytes:
+            self._remove(key)
+            return False
+            
+        self._remove(key)
+        self.entries[key] = (value, time.monotonic() + ttl, size)
+        self.current_bytes += size
+        
+        while self.entries and (
+            self.current_bytes > self.max_bytes or len(self.entries) > self.max_entries
+        ):
+            oldest_key = next(iter(self.entries))
+            self._remove(oldest_key)
+            self.stats["evictions"] += 1
+            
+        return True
+    
+    def delete(self, key: str) -> bool:
+        """Invalidate a key"""
+        if key in self.entries:
+            self._remove(key)
+            self.stats["invalidations"] += 1
+            return True
+        return False
+    
+    def clear(self) -> None:
+        self.entries.clear()
+        self.current_bytes = 0
+    
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            "entries": len(self.entries),
+            "bytes": self.current_bytes,
+            "max_bytes": self.max_bytes,
+            "hit_ratio": round(self.stats["hits"] / lookups, 4) if lookups else 0,
+            **self.stats
+        }
+    
+    def _remove(self, key: str) -> None:
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.current_bytes -= entry[2]
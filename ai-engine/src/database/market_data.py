@@ -0,0 +1,192 @@
+import logging
+import re
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo.errors import CollectionInvalid, OperationFailure
+
+# market_data is a MongoDB time-series collection: one measurement per
+# document, grouped by (product_id, market) under the meta field
+MARKET_DATA_COLLECTION = "market_data"
+# A plain market_data collection is renamed here while market_data_migration copies it over
+LEGACY_MARKET_DATA_COLLECTION = "market_data_legacy"
+MARKET_DATA_TIMESERIES = {
+    "timeField": "timestamp",
+    "metaField": "meta",
+    "granularity": "minutes"
+}
+META_FIELDS = ("product_id", "market")
+NAMESPACE_EXISTS = 48
+
+INTERVAL_UNITS = {"m": "minute", "h": "hour", "d": "day", "w": "week", "M": "month"}
+
+
+def parse_interval(interval: str) -> Tuple[str, int]:
+    """Turn "15m", "4h", "1d", "1w" or "1M" into a $dateTrunc (unit, binSize)"""
+    match = re.fullmatch(r"(\d+)([mhdwM])", interval)
+    if not match:
+        raise ValueError(f"Unsupported interval: {interval}")
+    return INTERVAL_UNITS[match.group(2)], int(match.group(1))
+
+
+# $dateTrunc aligns bins to this reference date; weeks start on Sunday
+BIN_REFERENCE = datetime(2000, 1, 1)
+WEEK_REFERENCE = datetime(2000, 1, 2)
+UNIT_SECONDS = {"minute": 60, "hour": 3600, "day": 86400, "week": 7 * 86400}
+
+
+def to_naive_utc(timestamp: datetime) -> datetime:
+    """Naive UTC datetime, the form MongoDB returns BSON dates in"""
+    if timestamp.tzinfo is not None:
+        return timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp
+
+
+def truncate_timestamp(timestamp: datetime, unit: str, bin_size: int) -> datetime:
+    """Python equivalent of $dateTrunc for the units parse_interval produces"""
+    timestamp = to_naive_utc(timestamp)
+    if unit == "month":
+        months = (timestamp.year - BIN_REFERENCE.year) * 12 + timestamp.month - 1
+        months -= months % bin_size
+        return datetime(BIN_REFERENCE.year + months // 12, months % 12 + 1, 1)
+        
+    reference = WEEK_REFERENCE if unit == "week" else BIN_REFERENCE
+    bin_seconds = UNIT_SECONDS[unit] * bin_size
+    elapsed = (timestamp - reference).total_seconds()
+    return reference + timedelta(seconds=elapsed - elapsed % bin_seconds)
+
+
+def _parse_timestamp(value: Any) -> Optional[datetime]:
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    return None
+
+
+def to_time_series_document(market_data: Dict[str, Any], stamp_missing: bool = True) -> Dict[str, Any]:
+    """Move product/market into the meta field and make the timestamp a BSON date.
+    
+    A missing timestamp is set to the current time when `stamp_missing` is
+    set (new ticks); otherwise a missing or unparseable timestamp raises
+    ValueError rather than re-dating the tick.
+    """
+    timestamp = market_data.get("timestamp")
+    if timestamp is None and stamp_missing:
+        parsed = datetime.utcnow()
+    else:
+        parsed = _parse_timestamp(timestamp)
+        if parsed is None:
+            raise ValueError(f"Invalid market data timestamp: {timestamp!r}")
+            
+    document = {key: value for key, value in market_data.items() if key not in META_FIELDS}
+    meta = dict(market_data.get("meta") or {})
+    for field in META_FIELDS:
+        if field in market_data:
+            meta[field] = market_data[field]
+    document["meta"] = meta
+    document["timestamp"] = parsed
+    return document
+
+
+def build_ohlc_pipeline(
+    product_id: str,
+    interval: str = "1d",
+    market: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    price_field: str = "price",
+    volume_field: str = "volume"
+) -> List[Dict[str, Any]]:
+    """Aggregation reducing raw ticks to one OHLC row per market and interval"""
+    unit, bin_size = parse_interval(interval)
+    
+    match: Dict[str, Any] = {"meta.product_id": product_id}
+    if market:
+        match["meta.market"] = market
+    if start or end:
+        match["timestamp"] = {}
+        if start:
+            match["timestamp"]["$gte"] = start
+        if end:
+            match["timestamp"]["$lt"] = end
+            
+    price = f"${price_field}"
+    return [
+        {"$match": match},
+        {"$sort": {"timestamp": 1}},
+        {"$group": {
+            "_id": {
+                "market": "$meta.market",
+                "period_start": {"$dateTrunc": {"date": "$timestamp", "unit": unit, "binSize": bin_size}}
+            },
+            "open": {"$first": price},
+            "high": {"$max": price},
+            "low": {"$min": price},
+            "close": {"$last": price},
+            "mean": {"$avg": price},
+            "volatility": {"$stdDevPop": price},
+            "volume": {"$sum": f"${volume_field}"},
+            "samples": {"$sum": 1}
+        }},
+        {"$sort": {"_id.market": 1, "_id.period_start": 1}},
+        {"$project": {
+            "_id": 0,
+            "market": "$_id.market",
+            "period_start": "$_id.period_start",
+            "open": 1,
+            "high": 1,
+            "low": 1,
+            "close": 1,
+            "mean": 1,
+            "volatility": 1,
+            "relative_volatility": {
+                "$cond": [{"$gt": ["$mean", 0]}, {"$divide": ["$volatility", "$mean"]}, None]
+            },
+            "volume": 1,
+            "samples": 1
+        }}
+    ]
+
+
+async def ensure_market_data_collection(db: Any) -> bool:
+    """Create market_data as a time-series collection if it does not exist yet.
+    
+    Returns True when the collection is time-series. An existing plain
+    collection (documents with a top-level product_id, which the
+    meta.product_id queries do not match) is left alone: it is moved over
+    by the one-off job in market_data_migration, not on every connect.
+    """
+    try:
+        collections = {
+            info["name"]: info.get("type")
+            for info in await (await db.list_collections(
+                filter={"name": MARKET_DATA_COLLECTION}
+            )).to_list(length=None)
+        }
+        if MARKET_DATA_COLLECTION not in collections:
+            try:
+                await db.create_collection(MARKET_DATA_COLLECTION, timeseries=MARKET_DATA_TIMESERIES)
+                logging.info("Created market_data time-series collection")
+            except CollectionInvalid:
+                # Another worker created it first
+                pass
+            except OperationFailure as e:
+                if e.code != NAMESPACE_EXISTS:
+                    raise
+            return True
+            
+        if collections[MARKET_DATA_COLLECTION] != "timeseries":
+            logging.warning(
+                "market_data is a plain collection; run "
+                "`python -m src.database.market_data_migration` to move it to time-series"
+            )
+            return False
+        return True
+        
+    except Exception as e:
+        logging.error(f"Error creating market_data time-series collection: {e}")
+        return False
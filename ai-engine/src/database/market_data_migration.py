@@ -0,0 +1,236 @@
+"""
+One-off job: move a plain market_data collection into the time-series layout.
+
+The plain collection is renamed to market_data_legacy and copied into a new
+time-series market_data batch by batch. A lease in the migrations collection
+keeps concurrent runs out, and a document is only removed from the legacy
+collection once its insert into market_data is confirmed. Ticks with a
+missing or unparseable timestamp are counted as rejected and stay in the
+legacy collection for inspection, which is then kept rather than dropped.
+
+Safe to rerun after an interruption; it resumes from the recorded checkpoint.
+
+Usage (from the ai-engine directory):
+    python -m src.database.market_data_migration --batch-size 1000
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set
+
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError, CollectionInvalid, DuplicateKeyError, OperationFailure
+
+from .market_data import (
+    LEGACY_MARKET_DATA_COLLECTION,
+    MARKET_DATA_COLLECTION,
+    MARKET_DATA_TIMESERIES,
+    NAMESPACE_EXISTS,
+    to_naive_utc,
+    to_time_series_document
+)
+
+MIGRATIONS_COLLECTION = "migrations"
+MIGRATION_ID = "market_data_timeseries"
+
+
+class MigrationLocked(RuntimeError):
+    """Another run holds the migration lease"""
+
+
+async def acquire_migration_lock(db: Any, owner: str, lease: float) -> Optional[Dict[str, Any]]:
+    """Take the migration lease if it is free or expired; returns the lock document"""
+    now = datetime.utcnow()
+    try:
+        return await db[MIGRATIONS_COLLECTION].find_one_and_update(
+            {"_id": MIGRATION_ID, "$or": [{"owner": None}, {"expires_at": {"$lt": now}}]},
+            {"$set": {"owner": owner, "expires_at": now + timedelta(seconds=lease)}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+    except DuplicateKeyError:
+        # The lock document exists and is held: the upsert tried to insert it again
+        return None
+
+
+async def _update_lock(db: Any, owner: str, lease: float, fields: Dict[str, Any]) -> None:
+    """Record progress and renew the lease; fails if the lease was lost"""
+    fields = dict(fields, expires_at=datetime.utcnow() + timedelta(seconds=lease))
+    result = await db[MIGRATIONS_COLLECTION].update_one(
+        {"_id": MIGRATION_ID, "owner": owner}, {"$set": fields}
+    )
+    if result.matched_count == 0:
+        raise MigrationLocked("Lost the market_data migration lease")
+
+
+async def release_migration_lock(db: Any, owner: str) -> None:
+    await db[MIGRATIONS_COLLECTION].update_one(
+        {"_id": MIGRATION_ID, "owner": owner}, {"$set": {"owner": None, "expires_at": None}}
+    )
+
+
+async def _prepare_collections(db: Any) -> Set[str]:
+    """Rename a plain market_data out of the way and create the time-series collection"""
+    collections = {
+        info["name"]: info.get("type")
+        for info in await (await db.list_collections(
+            filter={"name": {"$in": [MARKET_DATA_COLLECTION, LEGACY_MARKET_DATA_COLLECTION]}}
+        )).to_list(length=None)
+    }
+    if collections.get(MARKET_DATA_COLLECTION) not in (None, "timeseries"):
+        if LEGACY_MARKET_DATA_COLLECTION in collections:
+            raise RuntimeError(
+                f"Both a plain {MARKET_DATA_COLLECTION} and {LEGACY_MARKET_DATA_COLLECTION} exist; merge them by hand"
+            )
+        await db[MARKET_DATA_COLLECTION].rename(LEGACY_MARKET_DATA_COLLECTION)
+        collections[LEGACY_MARKET_DATA_COLLECTION] = collections.pop(MARKET_DATA_COLLECTION)
+        logging.info("Renamed plain market_data collection to market_data_legacy")
+        
+    if MARKET_DATA_COLLECTION not in collections:
+        try:
+            await db.create_collection(MARKET_DATA_COLLECTION, timeseries=MARKET_DATA_TIMESERIES)
+            logging.info("Created market_data time-series collection")
+        except CollectionInvalid:
+            pass
+        except OperationFailure as e:
+            if e.code != NAMESPACE_EXISTS:
+                raise
+    return set(collections)
+
+
+async def _insert_documents(target: Any, documents: List[Dict[str, Any]]) -> List[Any]:
+    """Insert a batch and return the _ids the server confirmed as written"""
+    try:
+        await target.insert_many(documents, ordered=False)
+        return [document["_id"] for document in documents]
+    except BulkWriteError as e:
+        details = e.details or {}
+        if details.get("writeConcernErrors"):
+            # Not confirmed as durable: stop with the batch still marked pending
+            raise
+        failed = {error["index"] for error in details.get("writeErrors", [])}
+        for error in details.get("writeErrors", []):
+            logging.warning(f"Could not migrate market_data {documents[error['index']]['_id']}: {error.get('errmsg')}")
+        return [document["_id"] for index, document in enumerate(documents) if index not in failed]
+
+
+async def _resolve_pending(db: Any, pending: List[Any]) -> int:
+    """Clean up after a run that stopped between inserting a batch and deleting it.
+    
+    Looks the batch up in market_data by its time range and products, which
+    the meta and time indexes serve, and deletes the legacy copies that
+    made it across; the rest are picked up again by the main loop.
+    """
+    legacy = db[LEGACY_MARKET_DATA_COLLECTION]
+    documents = []
+    for document in await legacy.find({"_id": {"$in": pending}}).to_list(length=None):
+        try:
+            documents.append(to_time_series_document(document, stamp_missing=False))
+        except ValueError:
+            continue
+    if not documents:
+        return 0
+        
+    timestamps = [to_naive_utc(document["timestamp"]) for document in documents]
+    query = {
+        "meta.product_id": {"$in": list({document["meta"].get("product_id") for document in documents})},
+        "timestamp": {"$gte": min(timestamps), "$lte": max(timestamps)}
+    }
+    copied = {
+        document["_id"]
+        for document in await db[MARKET_DATA_COLLECTION].find(query, {"_id": 1}).to_list(length=None)
+    }
+    ids = [document["_id"] for document in documents if document["_id"] in copied]
+    if ids:
+        await legacy.delete_many({"_id": {"$in": ids}})
+    return len(ids)
+
+
+async def migrate_market_data(db: Any, batch_size: int = 1000, lease: float = 300.0) -> Dict[str, Any]:
+    """Run the migration under the lease; returns counts of what was moved"""
+    owner = uuid.uuid4().hex
+    state = await acquire_migration_lock(db, owner, lease)
+    if state is None:
+        raise MigrationLocked("Another market_data migration is running")
+        
+    stats = {"migrated": 0, "rejected": 0, "recovered": 0, "remaining": 0, "completed": False}
+    try:
+        collections = await _prepare_collections(db)
+        if LEGACY_MARKET_DATA_COLLECTION not in collections:
+            stats["completed"] = True
+            await _update_lock(db, owner, lease, {"completed_at": datetime.utcnow()})
+            return stats
+            
+        legacy = db[LEGACY_MARKET_DATA_COLLECTION]
+        target = db[MARKET_DATA_COLLECTION]
+        checkpoint = state.get("checkpoint")
+        if state.get("pending"):
+            stats["recovered"] = await _resolve_pending(db, state["pending"])
+            await _update_lock(db, owner, lease, {"pending": []})
+            
+        while True:
+            query = {"_id": {"$gt": checkpoint}} if checkpoint is not None else {}
+            batch = await legacy.find(query).sort("_id", 1).limit(batch_size).to_list(length=batch_size)
+            if not batch:
+                break
+                
+            documents = []
+            for document in batch:
+                try:
+                    documents.append(to_time_series_document(document, stamp_missing=False))
+                except ValueError as e:
+                    logging.warning(f"Skipping market_data {document['_id']}: {e}")
+                    stats["rejected"] += 1
+                    
+            if documents:
+                # Recorded first so a rerun can tell whether this batch reached market_data
+                await _update_lock(db, owner, lease, {"pending": [document["_id"] for document in documents]})
+                inserted = await _insert_documents(target, documents)
+                if inserted:
+                    await legacy.delete_many({"_id": {"$in": inserted}})
+                stats["migrated"] += len(inserted)
+                stats["rejected"] += len(documents) - len(inserted)
+                
+            checkpoint = batch[-1]["_id"]
+            await _update_lock(db, owner, lease, {"checkpoint": checkpoint, "pending": []})
+            
+        stats["remaining"] = await legacy.count_documents({})
+        if stats["remaining"] == 0:
+            await legacy.drop()
+            stats["completed"] = True
+            await _update_lock(db, owner, lease, {"checkpoint": None, "completed_at": datetime.utcnow()})
+        else:
+            # Rejected ticks are kept; a rerun rescans them from the start
+            logging.warning(f"{stats['remaining']} market_data documents left in {LEGACY_MARKET_DATA_COLLECTION}")
+            await _update_lock(db, owner, lease, {"checkpoint": None})
+        return stats
+        
+    finally:
+        await release_migration_lock(db, owner)
+
+
+async def main(url: str, database: str, batch_size: int, lease: float) -> Dict[str, Any]:
+    from motor.motor_asyncio import AsyncIOMotorClient
+    
+    client = AsyncIOMotorClient(url)
+    try:
+        stats = await migrate_market_data(client[database], batch_size, lease)
+    finally:
+        client.close()
+    print(json.dumps(stats, indent=2))
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=os.getenv("MONGODB_URL", "mongodb://localhost:27017"))
+    parser.add_argument("--database", default="exportexpresspro")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--lease", type=float, default=300.0, help="Seconds a run holds the lock without progress")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(args.url, args.database, args.batch_size, args.lease))
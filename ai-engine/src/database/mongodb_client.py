@@ -1,31 +1,138 @@
 import asyncio
 import logging
-from typing import List, Dict, Any, Optional
+import os
+from datetime import datetime
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
 from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo.errors import ConnectionFailure, ServerSelectionTimeoutError
+from pymongo.errors import ConnectionFailure, OperationFailure, ServerSelectionTimeoutError
+from pymongo.read_preferences import Nearest, Primary, PrimaryPreferred, Secondary, SecondaryPreferred
+from .indexes import ensure_indexes
+from .market_data import build_ohlc_pipeline, ensure_market_data_collection, to_time_series_document
+from .pool_monitor import PoolMonitor
+from .product_cache import ProductCache
+from .storage import StorageBackend
+from .write_buffer import WriteBehindBuffer
 
-class MongoDBClient:
-    def __init__(self):
+READ_PREFERENCE_MODES = {
+    "primary": Primary,
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest
+}
+
+# Analytical reads that tolerate replication lag; every other read goes to the primary.
+# Product lookups stay on the primary so the product cache never reloads a stale copy.
+DEFAULT_READ_PREFERENCES = {
+    "get_all_products": "secondaryPreferred",
+    "get_market_data": "secondaryPreferred",
+    "get_market_ohlc": "secondaryPreferred",
+    "iter_documents": "secondaryPreferred",
+    "get_predictions": "secondaryPreferred",
+    "get_arbitrage_opportunities": "secondaryPreferred"
+}
+
+class MongoDBClient(StorageBackend):
+    def __init__(
+        self,
+        connection_string: Optional[str] = None,
+        database_name: str = "exportexpresspro",
+        max_pool_size: int = 100,
+        min_pool_size: int = 0,
+        pool_timeout: float = 5.0,
+        max_idle_time: float = 300.0,
+        connect_timeout: float = 5.0,
+        socket_timeout: float = 30.0,
+        server_selection_timeout: float = 5.0,
+        compressors: Optional[str] = None,
+        read_preferences: Optional[Dict[str, str]] = None,
+        max_staleness: int = -1
+    ):
         self.client: Optional[AsyncIOMotorClient] = None
         self.db = None
-        self.connection_string = "mongodb://localhost:27017"
-        self.database_name = "exportexpresspro"
+        self.connection_string = connection_string or os.getenv("MONGODB_URL", "mongodb://localhost:27017")
+        self.database_name = database_name
+        self.default_batch_size = 1000
+        
+        # Pool sizing is per server and per process: size max_pool_size for one worker
+        self.max_pool_size = max_pool_size
+        self.min_pool_size = min_pool_size
+        self.pool_timeout = pool_timeout  # seconds to wait for a free connection
+        self.max_idle_time = max_idle_time  # seconds before an idle connection is closed
+        self.connect_timeout = connect_timeout
+        self.socket_timeout = socket_timeout
+        self.server_selection_timeout = server_selection_timeout
+        self.compressors = compressors  # e.g. "zstd,snappy,zlib"; None sends uncompressed
+        self.pool_monitor = PoolMonitor(max_pool_size)
+        
+        # Read preference per method name; unlisted methods read from the primary
+        self.read_preferences = {
+            method: self._make_read_preference(mode, max_staleness)
+            for method, mode in {**DEFAULT_READ_PREFERENCES, **(read_preferences or {})}.items()
+        }
+        
+        # Write-behind buffering for append-only collections
+        self.write_buffer: Optional[WriteBehindBuffer] = None
+        self.write_batch_size = 500
+        self.write_flush_interval = 1.0  # seconds
+        self.write_buffer_limit = 10000  # queued documents before writers wait
+        
+        # Read-through product cache; update_product invalidates its entries and
+        # the optional change-stream listener picks up writes from other processes
+        self.product_cache = ProductCache(self._load_products, ttl=300)
+        self.watch_product_changes = False
+        self.product_watch_task: Optional[asyncio.Task] = None
 
     async def connect(self):
         """Connect to MongoDB"""
         try:
-            self.client = AsyncIOMotorClient(self.connection_string)
+            options = {
+                "maxPoolSize": self.max_pool_size,
+                "minPoolSize": self.min_pool_size,
+                "waitQueueTimeoutMS": int(self.pool_timeout * 1000),
+                "maxIdleTimeMS": int(self.max_idle_time * 1000),
+                "connectTimeoutMS": int(self.connect_timeout * 1000),
+                "socketTimeoutMS": int(self.socket_timeout * 1000),
+                "serverSelectionTimeoutMS": int(self.server_selection_timeout * 1000),
+                "event_listeners": [self.pool_monitor]
+            }
+            if self.compressors:
+                options["compressors"] = self.compressors
+            self.client = AsyncIOMotorClient(self.connection_string, **options)
             self.db = self.client[self.database_name]
             
             # Test the connection
             await self.client.admin.command('ping')
-            logging.info("Successfully connected to MongoDB")
+            await ensure_market_data_collection(self.db)
+            await ensure_indexes(self.db)
+            
+            self.write_buffer = WriteBehindBuffer(
+                self.db,
+                max_batch=self.write_batch_size,
+                max_delay=self.write_flush_interval,
+                max_pending=self.write_buffer_limit
+            )
+            self.write_buffer.start()
+            
+            if self.watch_product_changes:
+                self.start_product_change_listener()
+            logging.info(f"Successfully connected to MongoDB (pool size {self.max_pool_size})")
         except (ConnectionFailure, ServerSelectionTimeoutError) as e:
             logging.error(f"Failed to connect to MongoDB: {e}")
             raise
 
     async def disconnect(self):
         """Disconnect from MongoDB"""
+        if self.product_watch_task is not None:
+            self.product_watch_task.cancel()
+            try:
+                await self.product_watch_task
+            except asyncio.CancelledError:
+                pass
+            self.product_watch_task = None
+        if self.write_buffer is not None:
+            await self.write_buffer.close()
+            self.write_buffer = None
         if self.client:
             self.client.close()
             logging.info("Disconnected from MongoDB")
@@ -33,11 +140,11 @@ class MongoDBClient:
     async def get_all_products(self) -> List[Dict[str, Any]]:
         """Get all products from the database"""
         try:
-            if not self.db:
+            if self.db is None:
                 logging.warning("Database not connected, returning empty list")
                 return []
             
-            cursor = self.db.products.find({})
+            cursor = self._read_collection("products", "get_all_products").find({})
             products = await cursor.to_list(length=None)
             logging.info(f"Retrieved {len(products)} products from database")
             return products
@@ -48,10 +155,18 @@ class MongoDBClient:
     async def store_news_impact(self, news_impact: Dict[str, Any]) -> bool:
         """Store news impact in the database"""
         try:
-            if not self.db:
+            if self.db is None:
                 logging.warning("Database not connected, cannot store news impact")
                 return False
             
+            # BSON date for the retention TTL index
+            news_impact.setdefault("created_at", datetime.utcnow())
+            
+            if self.write_buffer is not None:
+                # Queued documents are retried until written; a full buffer raises WriteBufferFull
+                await self.write_buffer.enqueue("news_impacts", news_impact)
+                return True
+            
             result = await self.db.news_impacts.insert_one(news_impact)
             logging.info(f"Stored news impact with ID: {result.inserted_id}")
             return True
@@ -59,13 +174,37 @@ class MongoDBClient:
             logging.error(f"Error storing news impact: {e}")
             return False
 
+    async def store_news_impacts(self, news_impacts: List[Dict[str, Any]]) -> bool:
+        """Store several news impacts in one batch"""
+        try:
+            if self.db is None:
+                logging.warning("Database not connected, cannot store news impacts")
+                return False
+            
+            if not news_impacts:
+                return True
+            
+            created_at = datetime.utcnow()
+            for news_impact in news_impacts:
+                news_impact.setdefault("created_at", created_at)
+            
+            if self.write_buffer is not None:
+                await self.write_buffer.enqueue_many("news_impacts", news_impacts)
+                return True
+            
+            await self.db.news_impacts.insert_many(news_impacts, ordered=False)
+            return True
+        except Exception as e:
+            logging.error(f"Error storing news impacts: {e}")
+            return False
+
     async def get_products_by_category(self, category: str) -> List[Dict[str, Any]]:
         """Get products by category"""
         try:
-            if not self.db:
+            if self.db is None:
                 return []
             
-            cursor = self.db.products.find({"category": category})
+            cursor = self._read_collection("products", "get_products_by_category").find({"category": category})
             products = await cursor.to_list(length=None)
             return products
         except Exception as e:
@@ -75,7 +214,7 @@ class MongoDBClient:
     async def get_product_by_id(self, product_id: str) -> Optional[Dict[str, Any]]:
         """Get a single product by ID"""
         try:
-            if not self.db:
+            if self.db is None:
                 return None
             
             product = await self.db.products.find_one({"_id": product_id})
@@ -84,16 +223,43 @@ class MongoDBClient:
             logging.error(f"Error getting product by ID: {e}")
             return None
 
+    async def get_product(self, product_id: str) -> Optional[Dict[str, Any]]:
+        """Get a single product by ID through the product cache"""
+        try:
+            if self.db is None:
+                return None
+            
+            return await self.product_cache.get(product_id)
+        except Exception as e:
+            logging.error(f"Error getting product: {e}")
+            return None
+
+    async def get_products(self, product_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get several products by ID; cache misses are fetched with one $in query"""
+        try:
+            if self.db is None:
+                return {}
+            
+            return await self.product_cache.get_many(product_ids)
+        except Exception as e:
+            logging.error(f"Error getting products: {e}")
+            return {}
+
+    async def _load_products(self, product_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        cursor = self.db.products.find({"_id": {"$in": product_ids}})
+        return {product["_id"]: product async for product in cursor}
+
     async def update_product(self, product_id: str, update_data: Dict[str, Any]) -> bool:
         """Update a product"""
         try:
-            if not self.db:
+            if self.db is None:
                 return False
             
             result = await self.db.products.update_one(
                 {"_id": product_id}, 
                 {"$set": update_data}
             )
+            self.product_cache.invalidate(product_id)
             return result.modified_count > 0
         except Exception as e:
             logging.error(f"Error updating product: {e}")
@@ -102,22 +268,52 @@ class MongoDBClient:
     async def get_market_data(self, product_id: str) -> List[Dict[str, Any]]:
         """Get market data for a product"""
         try:
-            if not self.db:
+            if self.db is None:
                 return []
             
-            cursor = self.db.market_data.find({"product_id": product_id})
+            cursor = self._read_collection("market_data", "get_market_data").find({"meta.product_id": product_id})
             market_data = await cursor.to_list(length=None)
             return market_data
         except Exception as e:
             logging.error(f"Error getting market data: {e}")
             return []
 
+    async def get_market_ohlc(
+        self,
+        product_id: str,
+        interval: str = "1d",
+        market: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """Get OHLC, mean price and volatility per market and interval.
+        
+        The reduction runs on the server, so only one row per market and
+        interval is transferred however many ticks the window holds.
+        """
+        try:
+            if self.db is None:
+                return []
+            
+            pipeline = build_ohlc_pipeline(product_id, interval, market, start, end)
+            cursor = self._read_collection("market_data", "get_market_ohlc").aggregate(pipeline)
+            return await cursor.to_list(length=None)
+        except Exception as e:
+            logging.error(f"Error aggregating market data: {e}")
+            return []
+
     async def store_market_data(self, market_data: Dict[str, Any]) -> bool:
         """Store market data"""
         try:
-            if not self.db:
+            if self.db is None:
                 return False
             
+            market_data = to_time_series_document(market_data)
+            
+            if self.write_buffer is not None:
+                await self.write_buffer.enqueue("market_data", market_data)
+                return True
+            
             result = await self.db.market_data.insert_one(market_data)
             return True
         except Exception as e:
@@ -127,14 +323,14 @@ class MongoDBClient:
     async def get_orders(self, status: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get orders with optional status filter"""
         try:
-            if not self.db:
+            if self.db is None:
                 return []
             
             filter_query = {}
             if status:
                 filter_query["status"] = status
             
-            cursor = self.db.orders.find(filter_query)
+            cursor = self._read_collection("orders", "get_orders").find(filter_query)
             orders = await cursor.to_list(length=None)
             return orders
         except Exception as e:
@@ -144,14 +340,14 @@ class MongoDBClient:
     async def get_suppliers(self, country: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get suppliers with optional country filter"""
         try:
-            if not self.db:
+            if self.db is None:
                 return []
             
             filter_query = {}
             if country:
                 filter_query["country"] = country
             
-            cursor = self.db.suppliers.find(filter_query)
+            cursor = self._read_collection("suppliers", "get_suppliers").find(filter_query)
             suppliers = await cursor.to_list(length=None)
             return suppliers
         except Exception as e:
@@ -161,9 +357,16 @@ class MongoDBClient:
     async def store_prediction(self, prediction_data: Dict[str, Any]) -> bool:
         """Store AI prediction data"""
         try:
-            if not self.db:
+            if self.db is None:
                 return False
             
+            # BSON date for the retention TTL index
+            prediction_data.setdefault("created_at", datetime.utcnow())
+            
+            if self.write_buffer is not None:
+                await self.write_buffer.enqueue("predictions", prediction_data)
+                return True
+            
             result = await self.db.predictions.insert_one(prediction_data)
             return True
         except Exception as e:
@@ -173,10 +376,10 @@ class MongoDBClient:
     async def get_predictions(self, product_id: str) -> List[Dict[str, Any]]:
         """Get predictions for a product"""
         try:
-            if not self.db:
+            if self.db is None:
                 return []
             
-            cursor = self.db.predictions.find({"product_id": product_id})
+            cursor = self._read_collection("predictions", "get_predictions").find({"product_id": product_id})
             predictions = await cursor.to_list(length=None)
             return predictions
         except Exception as e:
@@ -186,9 +389,13 @@ class MongoDBClient:
     async def store_arbitrage_opportunity(self, opportunity: Dict[str, Any]) -> bool:
         """Store arbitrage opportunity"""
         try:
-            if not self.db:
+            if self.db is None:
                 return False
             
+            if self.write_buffer is not None:
+                await self.write_buffer.enqueue("arbitrage_opportunities", opportunity)
+                return True
+            
             result = await self.db.arbitrage_opportunities.insert_one(opportunity)
             return True
         except Exception as e:
@@ -198,12 +405,125 @@ class MongoDBClient:
     async def get_arbitrage_opportunities(self) -> List[Dict[str, Any]]:
         """Get all arbitrage opportunities"""
         try:
-            if not self.db:
+            if self.db is None:
                 return []
             
-            cursor = self.db.arbitrage_opportunities.find({})
+            cursor = self._read_collection("arbitrage_opportunities", "get_arbitrage_opportunities").find({})
             opportunities = await cursor.to_list(length=None)
             return opportunities
         except Exception as e:
             logging.error(f"Error getting arbitrage opportunities: {e}")
-            return [] 
\ No newline at end of file
+            return [] 
+
+    def start_product_change_listener(self) -> None:
+        """Invalidate cached products on every write to the collection, from any process"""
+        if self.product_watch_task is None and self.db is not None:
+            self.product_watch_task = asyncio.create_task(self._watch_products())
+
+    async def _watch_products(self) -> None:
+        while True:
+            try:
+                async with self.db.products.watch() as stream:
+                    # Anything may have changed while the stream was not open
+                    self.product_cache.clear()
+                    async for change in stream:
+                        document_key = change.get("documentKey")
+                        if document_key and "_id" in document_key:
+                            self.product_cache.invalidate(document_key["_id"])
+                        else:
+                            # drop, rename and invalidate events carry no document key
+                            self.product_cache.clear()
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                # Change streams need a replica set; TTL expiry still bounds staleness
+                logging.warning(f"Product change stream unavailable, relying on cache TTL: {e}")
+                return
+            except Exception as e:
+                logging.error(f"Product change stream error, reconnecting: {e}")
+                await asyncio.sleep(5)
+
+    def get_product_cache_stats(self) -> Dict[str, Any]:
+        """Get product cache hit ratio and load counters"""
+        return self.product_cache.get_stats()
+
+    def _read_collection(self, collection: str, method: str):
+        read_preference = self.read_preferences.get(method)
+        if read_preference is None:
+            return self.db[collection]
+        return self.db.get_collection(collection, read_preference=read_preference)
+
+    @staticmethod
+    def _make_read_preference(mode: str, max_staleness: int = -1) -> Any:
+        if mode not in READ_PREFERENCE_MODES:
+            raise ValueError(f"Unknown read preference: {mode}")
+        if mode == "primary":
+            return Primary()
+        return READ_PREFERENCE_MODES[mode](max_staleness=max_staleness)
+
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Get connection pool saturation and checkout wait metrics"""
+        if self.client is None:
+            return {"backend": "disconnected", "max_pool_size": self.max_pool_size, "in_use": 0, "open": 0}
+        
+        return {
+            "backend": "mongodb",
+            "max_pool_size": self.max_pool_size,
+            "min_pool_size": self.min_pool_size,
+            "compressors": self.compressors,
+            "read_preferences": {
+                method: read_preference.mongos_mode
+                for method, read_preference in self.read_preferences.items()
+            },
+            **self.pool_monitor.snapshot()
+        }
+
+    def get_write_buffer_stats(self) -> Dict[str, Any]:
+        """Get write-behind queue depth and throughput counters"""
+        if self.write_buffer is None:
+            return {"enabled": False}
+        return {"enabled": True, **self.write_buffer.get_stats()}
+
+    async def iter_documents(
+        self,
+        collection: str,
+        filter_query: Optional[Dict[str, Any]] = None,
+        projection: Optional[Dict[str, Any]] = None,
+        sort: Optional[List[Tuple[str, int]]] = None,
+        limit: int = 0,
+        batch_size: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream documents from a collection one at a time.
+        
+        The server returns `batch_size` documents per round trip, so only
+        one batch is held in memory however large the result is. Errors are
+        raised rather than ending the stream, which would look like a
+        complete result.
+        """
+        try:
+            if self.db is None:
+                logging.warning(f"Database not connected, cannot stream {collection}")
+                return
+            
+            cursor = self._find(collection, filter_query, projection, sort, limit, batch_size)
+            async for document in cursor:
+                yield document
+        except Exception as e:
+            logging.error(f"Error streaming {collection}: {e}")
+            raise
+
+    def _find(
+        self,
+        collection: str,
+        filter_query: Optional[Dict[str, Any]],
+        projection: Optional[Dict[str, Any]],
+        sort: Optional[List[Tuple[str, int]]],
+        limit: int,
+        batch_size: Optional[int]
+    ):
+        cursor = self._read_collection(collection, "iter_documents").find(filter_query or {}, projection)
+        if sort:
+            cursor = cursor.sort(sort)
+        if limit:
+            cursor = cursor.limit(limit)
+        return cursor.batch_size(batch_size or self.default_batch_size)
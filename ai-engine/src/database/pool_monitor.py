@@ -0,0 +1,127 @@
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, Tuple
+
+from pymongo import monitoring
+
+from ..utils.metrics import LatencyHistogram
+
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """Records connection checkout waits and saturation for every server pool.
+    
+    The driver calls these hooks from its own threads, so counters are
+    updated under a lock. `max_pool_size` is the per-server limit the
+    client was built with and is used to count saturated checkouts.
+    """
+    
+    def __init__(self, max_pool_size: int):
+        self.max_pool_size = max_pool_size
+        self.lock = threading.Lock()
+        self.in_use: Dict[Any, int] = defaultdict(int)
+        self.open: Dict[Any, int] = defaultdict(int)
+        self.checkout_started: Dict[Tuple[Any, int], float] = {}
+        self.wait_latency = LatencyHistogram()
+        self.stats = {
+            "checkouts": 0,
+            "saturated_checkouts": 0,
+            "timeouts": 0,
+            "failed_checkouts": 0,
+            "pool_clears": 0,
+            "total_wait_ms": 0.0,
+            "max_wait_ms": 0.0,
+            "peak_in_use": 0
+        }
+    
+    def pool_created(self, event):
+        pass
+    
+    def pool_ready(self, event):
+        pass
+    
+    def pool_cleared(self, event):
+        with self.lock:
+            self.stats["pool_clears"] += 1
+    
+    def pool_closed(self, event):
+        with self.lock:
+            self.in_use.pop(event.address, None)
+            self.open.pop(event.address, None)
+    
+    def connection_created(self, event):
+        with self.lock:
+            self.open[event.address] += 1
+    
+    def connection_ready(self, event):
+        pass
+    
+    def connection_closed(self, event):
+        with self.lock:
+            self.open[event.address] = max(0, self.open[event.address] - 1)
+    
+    def connection_check_out_started(self, event):
+        with self.lock:
+            if self.in_use[event.address] >= self.max_pool_size:
+                self.stats["saturated_checkouts"] += 1
+            # Checkout runs on one thread; used when the driver reports no duration
+            self.checkout_started[(event.address, threading.get_ident())] = time.perf_counter()
+    
+    def connection_check_out_failed(self, event):
+        with self.lock:
+            self.checkout_started.pop((event.address, threading.get_ident()), None)
+            self.stats["failed_checkouts"] += 1
+            if event.reason == monitoring.ConnectionCheckOutFailedReason.TIMEOUT:
+                self.stats["timeouts"] += 1
+    
+    def connection_checked_out(self, event):
+        with self.lock:
+            started = self.checkout_started.pop((event.address, threading.get_ident()), None)
+            duration = getattr(event, "duration", None)
+            if duration is not None:
+                wait_ms = duration * 1000
+            else:
+                wait_ms = (time.perf_counter() - started) * 1000 if started is not None else 0.0
+                
+            self.in_use[event.address] += 1
+            self.stats["checkouts"] += 1
+            self.stats["total_wait_ms"] += wait_ms
+            self.stats["max_wait_ms"] = max(self.stats["max_wait_ms"], wait_ms)
+            self.stats["peak_in_use"] = max(self.stats["peak_in_use"], self.in_use[event.address])
+            self.wait_latency.observe(wait_ms)
+    
+    def connection_checked_in(self, event):
+        with self.lock:
+            self.in_use[event.address] = max(0, self.in_use[event.address] - 1)
+    
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            stats = dict(self.stats)
+            servers = {
+                f"{address[0]}:{address[1]}": {
+                    "in_use": self.in_use.get(address, 0),
+                    "open": self.open.get(address, 0)
+                }
+                for address in set(self.in_use) | set(self.open)
+            }
+            wait_latency = self.wait_latency.snapshot()
+            
+        in_use = sum(server["in_use"] for server in servers.values())
+        checkouts = stats["checkouts"]
+        return {
+            "in_use": in_use,
+            "open": sum(server["open"] for server in servers.values()),
+            "saturation": round(
+                max((server["in_use"] for server in servers.values()), default=0) / self.max_pool_size, 3
+            ) if self.max_pool_size else 0,
+            "peak_in_use": stats["peak_in_use"],
+            "checkouts": checkouts,
+            "saturated_checkouts": stats["saturated_checkouts"],
+            "failed_checkouts": stats["failed_checkouts"],
+            "pool_timeouts": stats["timeouts"],
+            "pool_clears": stats["pool_clears"],
+            "avg_wait_ms": round(stats["total_wait_ms"] / checkouts, 3) if checkouts else 0,
+            "max_wait_ms": round(stats["max_wait_ms"], 3),
+            "wait_latency": wait_latency,
+            "servers": servers
+        }
@@ -0,0 +1,119 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Iterable, List
+
+from .local_cache import LocalCache
+
+# Cached in place of products that do not exist so repeated misses stay cheap
+_MISSING = object()
+
+
+class ProductCache:
+    """Read-through cache of product documents in front of a bulk loader.
+    
+    Misses are fetched together with one `loader(ids)` call (an `$in`
+    query on Mongo) and concurrent requests for an id already being
+    loaded wait for that load instead of issuing their own. Entries are
+    dropped by `invalidate()`; a load that started before an invalidation
+    is returned to its callers but not cached, so an update is never
+    papered over by the document it replaced. Cached documents are shared
+    and must be treated as read-only.
+    """
+    
+    def __init__(
+        self,
+        loader: Callable[[List[Any]], Awaitable[Dict[Any, Dict[str, Any]]]],
+        ttl: int = 300,
+        missing_ttl: int = 30,
+        max_entries: int = 5000
+    ):
+        self.loader = loader
+        self.ttl = ttl
+        self.missing_ttl = missing_ttl
+        self.entries = LocalCache(max_entries=max_entries, default_ttl=ttl)
+        self.inflight: Dict[Any, asyncio.Future] = {}
+        self.generation = 0
+        self.stats = {
+            "loads": 0,
+            "loaded": 0,
+            "coalesced": 0
+        }
+    
+    async def get(self, product_id: Any) -> Any:
+        """Get one product, loading it on a miss; None if it does not exist"""
+        return (await self.get_many([product_id])).get(product_id)
+    
+    async def get_many(self, product_ids: Iterable[Any]) -> Dict[Any, Dict[str, Any]]:
+        """Get several products with at most one load; missing ids are left out"""
+        products: Dict[Any, Dict[str, Any]] = {}
+        to_load: List[Any] = []
+        waiting: Dict[Any, asyncio.Future] = {}
+        
+        for product_id in dict.fromkeys(product_ids):
+            hit, product = self.entries.get(product_id)
+            if hit:
+                if product is not _MISSING:
+                    products[product_id] = product
+            elif product_id in self.inflight:
+                waiting[product_id] = self.inflight[product_id]
+            else:
+                to_load.append(product_id)
+                
+        if to_load:
+            loaded = await self._load(to_load)
+            products.update((product_id, loaded[product_id]) for product_id in to_load if product_id in loaded)
+            
+        if waiting:
+            self.stats["coalesced"] += len(waiting)
+            for product_id, future in waiting.items():
+                loaded = await future
+                if product_id in loaded:
+                    products[product_id] = loaded[product_id]
+                    
+        return products
+    
+    def invalidate(self, product_id: Any) -> None:
+        """Drop a product so the next read goes to the database"""
+        self.generation += 1
+        self.entries.delete(product_id)
+    
+    def clear(self) -> None:
+        self.generation += 1
+        self.entries.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "inflight": len(self.inflight),
+            **self.entries.get_stats(),
+            **self.stats
+        }
+    
+    async def _load(self, product_ids: List[Any]) -> Dict[Any, Dict[str, Any]]:
+        future = asyncio.get_running_loop().create_future()
+        for product_id in product_ids:
+            self.inflight[product_id] = future
+        generation = self.generation
+        self.stats["loads"] += 1
+        
+        try:
+            loaded = await self.loader(product_ids)
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # waiters re-raise it; don't warn when there are none
+            raise
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        finally:
+            for product_id in product_ids:
+                if self.inflight.get(product_id) is future:
+                    del self.inflight[product_id]
+                    
+        self.stats["loaded"] += len(loaded)
+        if generation == self.generation:
+            for product_id in product_ids:
+                if product_id in loaded:
+                    self.entries.set(product_id, loaded[product_id], self.ttl)
+                else:
+                    self.entries.set(product_id, _MISSING, self.missing_ttl)
+        future.set_result(loaded)
+        return loaded
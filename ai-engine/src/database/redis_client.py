@@ -1,136 +1,629 @@
 import asyncio
+import fnmatch
 import logging
-import json
-from typing import Any, Optional, Dict, List
-import aioredis
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Optional, Dict, List, Tuple, Union
+from redis import asyncio as aioredis
 from datetime import timedelta
+from .codecs import CacheCodec
+from .local_cache import LocalCache
+from ..utils.metrics import CacheMetrics
+
+# Hot service caches that are served from the in-process L1 layer
+DEFAULT_LOCAL_CACHE_PREFIXES = ("intelligence_", "trade_analysis_", "logistics_lane_")
+
+# Service cache key groups reported separately in the per-prefix metrics
+CACHE_METRIC_PREFIXES = (
+    "intelligence_",
+    "trade_analysis_",
+    "logistics_lane_"
+)
+INVALIDATION_CHANNEL = "cache_invalidation"
+
+# Delete a lock only if it is still held by the caller's token
+RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+class InstrumentedConnectionPool(aioredis.BlockingConnectionPool):
+    """Blocking connection pool that records checkout waits and saturation"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = {
+            "checkouts": 0,
+            "saturated_checkouts": 0,
+            "timeouts": 0,
+            "total_wait_ms": 0.0,
+            "max_wait_ms": 0.0,
+            "peak_in_use": 0
+        }
+    
+    def in_use_count(self) -> int:
+        return len(getattr(self, "_in_use_connections", ()))
+    
+    def idle_count(self) -> int:
+        return len(getattr(self, "_available_connections", ()))
+    
+    async def get_connection(self, *args, **kwargs):
+        """Check out a connection, tracking how long callers queue for one"""
+        if self.idle_count() == 0 and self.in_use_count() >= self.max_connections:
+            self.stats["saturated_checkouts"] += 1
+        
+        started = time.perf_counter()
+        try:
+            connection = await super().get_connection(*args, **kwargs)
+        except aioredis.ConnectionError:
+            self.stats["timeouts"] += 1
+            raise
+        
+        wait_ms = (time.perf_counter() - started) * 1000
+        self.stats["checkouts"] += 1
+        self.stats["total_wait_ms"] += wait_ms
+        self.stats["max_wait_ms"] = max(self.stats["max_wait_ms"], wait_ms)
+        self.stats["peak_in_use"] = max(self.stats["peak_in_use"], self.in_use_count())
+        return connection
+
 
 class RedisClient:
     """Redis client for caching and real-time data"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        connection_string: str = "redis://localhost:6379",
+        db_index: int = 0,
+        max_connections: int = 50,
+        pool_timeout: float = 5.0,
+        socket_timeout: float = 5.0,
+        health_check_interval: int = 30,
+        local_cache_prefixes: Optional[Tuple[str, ...]] = DEFAULT_LOCAL_CACHE_PREFIXES,
+        local_cache_max_bytes: int = 64 * 1024 * 1024,
+        codec: Optional[CacheCodec] = None
+    ):
         self.redis_pool = None
-        self.connection_string = "redis://localhost:6379"
-        self.db_index = 0
+        self.redis = None
+        self.connection_string = connection_string
+        self.db_index = db_index
+        self.codec = codec or CacheCodec()
+        
+        # Pool sizing - one shared client multiplexes all commands over this pool
+        self.max_connections = max_connections
+        self.pool_timeout = pool_timeout  # seconds to wait for a free connection
+        self.socket_timeout = socket_timeout
+        self.health_check_interval = health_check_interval  # seconds between idle PINGs
+        
+        # L1: per-worker cache in front of Redis, kept coherent via pub/sub
+        self.local_cache_prefixes = tuple(local_cache_prefixes or ())
+        self.local_cache = LocalCache(max_bytes=local_cache_max_bytes)
+        self.instance_id = uuid.uuid4().hex
+        self.invalidation_task: Optional[asyncio.Task] = None
+        self.cache_stats = {"l1_hits": 0, "l2_hits": 0, "misses": 0}
+        
+        # Per-prefix hit/miss/byte/latency counters, split by backend
+        self.metrics = CacheMetrics(CACHE_METRIC_PREFIXES + self.local_cache_prefixes)
         
     async def connect(self):
         """Connect to Redis"""
         try:
-            self.redis_pool = aioredis.ConnectionPool.from_url(
+            # A blocking pool queues callers when saturated instead of raising
+            self.redis_pool = InstrumentedConnectionPool.from_url(
                 self.connection_string,
                 db=self.db_index,
                 encoding="utf-8",
-                decode_responses=True
+                decode_responses=False,  # values are binary codec payloads
+                max_connections=self.max_connections,
+                timeout=self.pool_timeout,
+                socket_timeout=self.socket_timeout,
+                socket_connect_timeout=self.socket_timeout,
+                health_check_interval=self.health_check_interval,
+                retry_on_timeout=True
             )
+            self.redis = aioredis.Redis(connection_pool=self.redis_pool)
             
             # Test the connection
-            redis = aioredis.Redis(connection_pool=self.redis_pool)
-            await redis.ping()
-            await redis.close()
+            await self.redis.ping()
             
-            logging.info("Successfully connected to Redis")
+            if self.local_cache_prefixes:
+                self.invalidation_task = asyncio.create_task(self._listen_for_invalidations())
+            
+            logging.info(
+                f"Successfully connected to Redis (pool size {self.max_connections})"
+            )
             
         except Exception as e:
             logging.error(f"Failed to connect to Redis: {e}")
+            if self.redis_pool is not None and not isinstance(self.redis_pool, MockRedisPool):
+                await self.redis_pool.disconnect()
             # Create a mock Redis client for development
-            self.redis_pool = MockRedisPool()
+            self.redis = None
+            self.redis_pool = MockRedisPool(codec=self.codec)
+            self.redis_pool.start()
             logging.warning("Using mock Redis client for development")
     
     async def disconnect(self):
         """Disconnect from Redis"""
-        if self.redis_pool and hasattr(self.redis_pool, 'disconnect'):
+        if self.invalidation_task is not None:
+            self.invalidation_task.cancel()
+            try:
+                await self.invalidation_task
+            except asyncio.CancelledError:
+                pass
+            self.invalidation_task = None
+        self.local_cache.clear()
+        
+        if self.redis is not None:
+            await self.redis.aclose(close_connection_pool=True)
+            self.redis = None
+            logging.info("Disconnected from Redis")
+        elif self.redis_pool and hasattr(self.redis_pool, 'disconnect'):
             await self.redis_pool.disconnect()
             logging.info("Disconnected from Redis")
     
+    @property
+    def backend(self) -> str:
+        """Which store is serving requests; "mock" means running degraded"""
+        if isinstance(self.redis_pool, MockRedisPool):
+            return "mock"
+        return "redis" if self.redis is not None else "disconnected"
+    
+    async def ping(self) -> bool:
+        """Check that Redis is reachable through the shared pool"""
+        try:
+            if isinstance(self.redis_pool, MockRedisPool):
+                return True
+            
+            return bool(await self.redis.ping())
+            
+        except Exception as e:
+            logging.error(f"Redis health check failed: {e}")
+            return False
+    
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Get connection pool saturation metrics"""
+        if isinstance(self.redis_pool, MockRedisPool):
+            return {
+                "backend": "mock",
+                "max_connections": 0,
+                "in_use": 0,
+                "idle": 0,
+                "store": self.redis_pool.get_stats()
+            }
+        
+        if self.redis_pool is None:
+            return {"backend": "disconnected", "max_connections": 0, "in_use": 0, "idle": 0}
+        
+        stats = self.redis_pool.stats
+        in_use = self.redis_pool.in_use_count()
+        idle = self.redis_pool.idle_count()
+        checkouts = stats["checkouts"]
+        
+        return {
+            "backend": "redis",
+            "max_connections": self.max_connections,
+            "in_use": in_use,
+            "idle": idle,
+            "created": in_use + idle,
+            "saturation": round(in_use / self.max_connections, 3) if self.max_connections else 0,
+            "peak_in_use": stats["peak_in_use"],
+            "checkouts": checkouts,
+            "saturated_checkouts": stats["saturated_checkouts"],
+            "pool_timeouts": stats["timeouts"],
+            "avg_wait_ms": round(stats["total_wait_ms"] / checkouts, 3) if checkouts else 0,
+            "max_wait_ms": round(stats["max_wait_ms"], 3)
+        }
+    
+    def get_cache_metrics(self) -> Dict[str, Any]:
+        """Per-prefix cache counters and latency histograms"""
+        return {
+            "backend": self.backend,
+            "degraded": self.backend != "redis",
+            "prefixes": self.metrics.snapshot(),
+            "tiers": self.get_cache_stats()
+        }
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get L1 (in-process) and L2 (Redis) hit ratios"""
+        l1_hits = self.cache_stats["l1_hits"]
+        l2_hits = self.cache_stats["l2_hits"]
+        misses = self.cache_stats["misses"]
+        lookups = l1_hits + l2_hits + misses
+        l2_lookups = l2_hits + misses
+        
+        return {
+            "lookups": lookups,
+            "l1_hits": l1_hits,
+            "l2_hits": l2_hits,
+            "misses": misses,
+            "l1_hit_ratio": round(l1_hits / lookups, 4) if lookups else 0,
+            "l2_hit_ratio": round(l2_hits / l2_lookups, 4) if l2_lookups else 0,
+            "overall_hit_ratio": round((l1_hits + l2_hits) / lookups, 4) if lookups else 0,
+            "local_cache": self.local_cache.get_stats()
+        }
+    
+    def _uses_local_cache(self, key: str) -> bool:
+        """L1 only fronts a real Redis; the mock is already in-process"""
+        return (
+            self.redis is not None
+            and bool(self.local_cache_prefixes)
+            and key.startswith(self.local_cache_prefixes)
+        )
+    
+    async def _publish_invalidation(self, key: str) -> None:
+        """Tell other workers to drop their L1 copy of a key"""
+        try:
+            await self.redis.publish(INVALIDATION_CHANNEL, f"{self.instance_id}:{key}")
+        except Exception as e:
+            logging.error(f"Error publishing cache invalidation: {e}")
+    
+    async def _invalidate_local(self, keys: List[str]) -> None:
+        """Drop L1 copies of rewritten keys here and in other workers"""
+        keys = [key for key in keys if self._uses_local_cache(key)]
+        for key in keys:
+            self.local_cache.delete(key)
+            
+        if len(keys) == 1:
+            await self._publish_invalidation(keys[0])
+        elif keys:
+            try:
+                async with self.redis.pipeline(transaction=False) as pipe:
+                    for key in keys:
+                        pipe.publish(INVALIDATION_CHANNEL, f"{self.instance_id}:{key}")
+                    await pipe.execute()
+            except Exception as e:
+                logging.error(f"Error publishing cache invalidation: {e}")
+    
+    async def _listen_for_invalidations(self) -> None:
+        """Drop L1 entries rewritten by other workers"""
+        while True:
+            pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                async for message in pubsub.listen():
+                    data = message.get("data", b"")
+                    if isinstance(data, bytes):
+                        data = data.decode("utf-8")
+                    origin, _, key = str(data).partition(":")
+                    if origin != self.instance_id:
+                        self.local_cache.delete(key)
+            except asyncio.CancelledError:
+                await pubsub.aclose()
+                raise
+            except Exception as e:
+                # Missed messages could leave stale entries, so start from empty
+                logging.error(f"Cache invalidation listener error: {e}")
+                self.local_cache.clear()
+                await pubsub.aclose()
+                await asyncio.sleep(1)
+    
+    def _serialize(self, value: Any) -> bytes:
+        """Encode a value with the configured codec"""
+        return self.codec.encode(value)
+    
+    def _deserialize(self, value: Optional[bytes]) -> Optional[Any]:
+        """Decode a stored value; pre-codec entries decode as JSON or raw text"""
+        return self.codec.decode(value)
+    
+    @staticmethod
+    def _decode_key(key: Union[bytes, str]) -> str:
+        return key.decode("utf-8") if isinstance(key, bytes) else key
+    
     async def get(self, key: str) -> Optional[Any]:
         """Get value from Redis"""
+        backend = self.backend
+        started = time.perf_counter()
         try:
             if isinstance(self.redis_pool, MockRedisPool):
-                return await self.redis_pool.get(key)
+                result = await self.redis_pool.get(key)
+                self.metrics.record_read(
+                    backend, key, result is not None, self.redis_pool.sizes.get(key, 0),
+                    (time.perf_counter() - started) * 1000
+                )
+                return result
             
-            redis = aioredis.Redis(connection_pool=self.redis_pool)
-            value = await redis.get(key)
-            await redis.close()
+            if not self._uses_local_cache(key):
+                value = await self.redis.get(key)
+                self.metrics.record_read(
+                    backend, key, value is not None, len(value or b""),
+                    (time.perf_counter() - started) * 1000
+                )
+                return self._deserialize(value)
             
-            if value:
-                try:
-                    return json.loads(value)
-                except json.JSONDecodeError:
-                    return value
-            return None
+            # L1 holds the encoded payload and decodes it per hit, so every
+            # caller gets its own copy and mutating a result cannot corrupt the cache
+            hit, payload = self.local_cache.get(key)
+            if hit:
+                self.cache_stats["l1_hits"] += 1
+                result = self._deserialize(payload)
+                self.metrics.record_read(
+                    backend, key, True, elapsed_ms=(time.perf_counter() - started) * 1000, l1=True
+                )
+                return result
+            
+            # Fetch the remaining TTL in the same round trip so L1 expires with Redis
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.get(key)
+                pipe.pttl(key)
+                value, ttl_ms = await pipe.execute()
+            
+            self.metrics.record_read(
+                backend, key, value is not None, len(value or b""),
+                (time.perf_counter() - started) * 1000
+            )
+            result = self._deserialize(value)
+            if result is None:
+                self.cache_stats["misses"] += 1
+                return None
+            
+            self.cache_stats["l2_hits"] += 1
+            ttl = ttl_ms / 1000 if ttl_ms and ttl_ms > 0 else None
+            self.local_cache.set(key, value, ttl=ttl, size=len(value))
+            return result
             
         except Exception as e:
+            self.metrics.record_error(backend, key)
             logging.error(f"Error getting value from Redis: {e}")
             return None
     
     async def set(self, key: str, value: Any, expire: Optional[int] = None) -> bool:
         """Set value in Redis"""
+        backend = self.backend
+        started = time.perf_counter()
         try:
             if isinstance(self.redis_pool, MockRedisPool):
-                return await self.redis_pool.set(key, value, expire)
+                result = await self.redis_pool.set(key, value, expire)
+                self.metrics.record_write(
+                    backend, key, self.redis_pool.sizes.get(key, 0),
+                    (time.perf_counter() - started) * 1000
+                )
+                return result
             
-            redis = aioredis.Redis(connection_pool=self.redis_pool)
-            
-            # Serialize value if it's not a string
-            if not isinstance(value, str):
-                value = json.dumps(value, default=str)
+            serialized = self._serialize(value)
             
             if expire:
-                result = await redis.setex(key, expire, value)
+                result = await self.redis.setex(key, expire, serialized)
             else:
-                result = await redis.set(key, value)
+                result = await self.redis.set(key, serialized)
+            self.metrics.record_write(
+                backend, key, len(serialized), (time.perf_counter() - started) * 1000
+            )
+            
+            if self._uses_local_cache(key):
+                self.local_cache.set(key, serialized, ttl=expire, size=len(serialized))
+                await self._publish_invalidation(key)
             
-            await redis.close()
             return bool(result)
             
         except Exception as e:
+            self.metrics.record_error(backend, key)
             logging.error(f"Error setting value in Redis: {e}")
             return False
     
     async def delete(self, key: str) -> bool:
         """Delete key from Redis"""
+        backend = self.backend
         try:
+            self.metrics.record_delete(backend, key)
             if isinstance(self.redis_pool, MockRedisPool):
                 return await self.redis_pool.delete(key)
             
-            redis = aioredis.Redis(connection_pool=self.redis_pool)
-            result = await redis.delete(key)
-            await redis.close()
+            result = await self.redis.delete(key)
+            
+            if self._uses_local_cache(key):
+                self.local_cache.delete(key)
+                await self._publish_invalidation(key)
+            
             return bool(result)
             
         except Exception as e:
+            self.metrics.record_error(backend, key)
             logging.error(f"Error deleting key from Redis: {e}")
             return False
     
+    async def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """Get several values in one round trip; missing keys map to None"""
+        if not keys:
+            return {}
+        
+        backend = self.backend
+        started = time.perf_counter()
+        try:
+            if isinstance(self.redis_pool, MockRedisPool):
+                results = await self.redis_pool.get_many(keys)
+                sizes = [self.redis_pool.sizes.get(key, 0) for key in keys]
+                self._record_batch_reads(backend, keys, [results[key] is not None for key in keys], sizes, started)
+                return results
+            
+            values = await self.redis.mget(keys)
+            self._record_batch_reads(
+                backend, keys, [value is not None for value in values],
+                [len(value or b"") for value in values], started
+            )
+            return {
+                key: self._deserialize(value) for key, value in zip(keys, values)
+            }
+            
+        except Exception as e:
+            for key in keys:
+                self.metrics.record_error(backend, key)
+            logging.error(f"Error getting multiple values from Redis: {e}")
+            return {key: None for key in keys}
+    
+    async def set_many(
+        self,
+        mapping: Dict[str, Any],
+        expire: Optional[Union[int, Dict[str, int]]] = None
+    ) -> bool:
+        """Set several values in one round trip.
+        
+        `expire` is either one TTL for every key or a per-key TTL mapping;
+        keys missing from the mapping are stored without expiry.
+        """
+        if not mapping:
+            return True
+        
+        backend = self.backend
+        started = time.perf_counter()
+        try:
+            if isinstance(self.redis_pool, MockRedisPool):
+                result = await self.redis_pool.set_many(mapping, expire)
+                self._record_batch_writes(
+                    backend, {key: self.redis_pool.sizes.get(key, 0) for key in mapping}, started
+                )
+                return result
+            
+            sizes = {}
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for key, value in mapping.items():
+                    ttl = expire.get(key) if isinstance(expire, dict) else expire
+                    serialized = self._serialize(value)
+                    sizes[key] = len(serialized)
+                    if ttl:
+                        pipe.setex(key, ttl, serialized)
+                    else:
+                        pipe.set(key, serialized)
+                results = await pipe.execute()
+            self._record_batch_writes(backend, sizes, started)
+            
+            await self._invalidate_local(list(mapping.keys()))
+            return all(results)
+            
+        except Exception as e:
+            for key in mapping:
+                self.metrics.record_error(backend, key)
+            logging.error(f"Error setting multiple values in Redis: {e}")
+            return False
+    
+    def _record_batch_reads(
+        self, backend: str, keys: List[str], hits: List[bool], sizes: List[int], started: float
+    ) -> None:
+        """Count every key of a batch; latency is recorded once per prefix"""
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        timed = set()
+        for key, hit, size in zip(keys, hits, sizes):
+            prefix = self.metrics.prefix_for(key)
+            self.metrics.record_read(
+                backend, key, hit, size, None if prefix in timed else elapsed_ms
+            )
+            timed.add(prefix)
+    
+    def _record_batch_writes(self, backend: str, sizes: Dict[str, int], started: float) -> None:
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        timed = set()
+        for key, size in sizes.items():
+            prefix = self.metrics.prefix_for(key)
+            self.metrics.record_write(backend, key, size, None if prefix in timed else elapsed_ms)
+            timed.add(prefix)
+    
+    def pipeline(self) -> "RedisPipeline":
+        """Group commands into a single round trip.
+        
+        Usage:
+            async with redis_client.pipeline() as pipe:
+                pipe.get("intelligence_saffron")
+                pipe.set("intelligence_turmeric", data, expire=300)
+            results = pipe.results
+        """
+        return RedisPipeline(self)
+    
     async def exists(self, key: str) -> bool:
         """Check if key exists in Redis"""
         try:
             if isinstance(self.redis_pool, MockRedisPool):
                 return await self.redis_pool.exists(key)
             
-            redis = aioredis.Redis(connection_pool=self.redis_pool)
-            result = await redis.exists(key)
-            await redis.close()
+            result = await self.redis.exists(key)
             return bool(result)
             
         except Exception as e:
             logging.error(f"Error checking key existence in Redis: {e}")
             return False
     
+    async def acquire_lock(self, name: str, lease: float) -> Optional[str]:
+        """Take a lock for `lease` seconds; returns the owner token or None if held"""
+        token = uuid.uuid4().hex
+        try:
+            if isinstance(self.redis_pool, MockRedisPool):
+                acquired = await self.redis_pool.set_if_absent(name, token, lease)
+            else:
+                acquired = await self.redis.set(name, token, nx=True, px=int(lease * 1000))
+            return token if acquired else None
+            
+        except Exception as e:
+            logging.error(f"Error acquiring Redis lock: {e}")
+            return None
+    
+    async def release_lock(self, name: str, token: str) -> bool:
+        """Release a lock if it is still owned by `token`"""
+        try:
+            if isinstance(self.redis_pool, MockRedisPool):
+                return await self.redis_pool.delete_if_equals(name, token)
+            
+            result = await self.redis.eval(RELEASE_LOCK_SCRIPT, 1, name, token)
+            return bool(result)
+            
+        except Exception as e:
+            logging.error(f"Error releasing Redis lock: {e}")
+            return False
+    
+    async def scan_keys(self, pattern: str = "*", count: int = 1000) -> AsyncIterator[str]:
+        """Iterate keys matching pattern with SCAN, `count` keys per round trip.
+        
+        Unlike KEYS this never blocks the server; keys written or deleted
+        during the scan may or may not be returned.
+        """
+        try:
+            if isinstance(self.redis_pool, MockRedisPool):
+                async for key in self.redis_pool.scan_keys(pattern, count):
+                    yield key
+                return
+            
+            async for key in self.redis.scan_iter(match=pattern, count=count):
+                yield self._decode_key(key)
+                
+        except Exception as e:
+            logging.error(f"Error scanning keys in Redis: {e}")
+    
     async def keys(self, pattern: str = "*") -> List[str]:
         """Get keys matching pattern"""
+        return [key async for key in self.scan_keys(pattern)]
+    
+    async def delete_pattern(self, pattern: str, batch_size: int = 500) -> int:
+        """Delete every key matching pattern; returns the number removed.
+        
+        Keys are found with SCAN and removed with UNLINK in batches, so
+        memory is reclaimed off the main thread and the server stays
+        responsive while large groups of cached entries are invalidated.
+        """
+        deleted = 0
+        batch: List[str] = []
+        async for key in self.scan_keys(pattern, count=batch_size):
+            batch.append(key)
+            if len(batch) >= batch_size:
+                deleted += await self._unlink(batch)
+                batch = []
+        if batch:
+            deleted += await self._unlink(batch)
+        return deleted
+    
+    async def _unlink(self, keys: List[str]) -> int:
+        for key in keys:
+            self.metrics.record_delete(self.backend, key)
         try:
             if isinstance(self.redis_pool, MockRedisPool):
-                return await self.redis_pool.keys(pattern)
+                return await self.redis_pool.unlink(keys)
             
-            redis = aioredis.Redis(connection_pool=self.redis_pool)
-            keys = await redis.keys(pattern)
-            await redis.close()
-            return keys
+            result = await self.redis.unlink(*keys)
+            await self._invalidate_local(keys)
+            return int(result)
             
         except Exception as e:
-            logging.error(f"Error getting keys from Redis: {e}")
-            return []
+            logging.error(f"Error unlinking keys from Redis: {e}")
+            return 0
     
     async def increment(self, key: str, amount: int = 1) -> int:
         """Increment value in Redis"""
@@ -138,9 +631,7 @@ class RedisClient:
             if isinstance(self.redis_pool, MockRedisPool):
                 return await self.redis_pool.increment(key, amount)
             
-            redis = aioredis.Redis(connection_pool=self.redis_pool)
-            result = await redis.incrby(key, amount)
-            await redis.close()
+            result = await self.redis.incrby(key, amount)
             return result
             
         except Exception as e:
@@ -153,9 +644,12 @@ class RedisClient:
             if isinstance(self.redis_pool, MockRedisPool):
                 return await self.redis_pool.expire(key, seconds)
             
-            redis = aioredis.Redis(connection_pool=self.redis_pool)
-            result = await redis.expire(key, seconds)
-            await redis.close()
+            result = await self.redis.expire(key, seconds)
+            
+            if self._uses_local_cache(key):
+                self.local_cache.delete(key)
+                await self._publish_invalidation(key)
+            
             return bool(result)
             
         except Exception as e:
@@ -168,18 +662,12 @@ class RedisClient:
             if isinstance(self.redis_pool, MockRedisPool):
                 return await self.redis_pool.hash_set(name, mapping)
             
-            redis = aioredis.Redis(connection_pool=self.redis_pool)
-            
             # Serialize values
-            serialized_mapping = {}
-            for key, value in mapping.items():
-                if not isinstance(value, str):
-                    serialized_mapping[key] = json.dumps(value, default=str)
-                else:
-                    serialized_mapping[key] = value
-            
-            result = await redis.hset(name, mapping=serialized_mapping)
-            await redis.close()
+            serialized_mapping = {
+                key: self._serialize(value) for key, value in mapping.items()
+            }
+            
+            result = await self.redis.hset(name, mapping=serialized_mapping)
             return bool(result)
             
         except Exception as e:
@@ -192,16 +680,8 @@ class RedisClient:
             if isinstance(self.redis_pool, MockRedisPool):
                 return await self.redis_pool.hash_get(name, key)
             
-            redis = aioredis.Redis(connection_pool=self.redis_pool)
-            value = await redis.hget(name, key)
-            await redis.close()
-            
-            if value:
-                try:
-                    return json.loads(value)
-                except json.JSONDecodeError:
-                    return value
-            return None
+            value = await self.redis.hget(name, key)
+            return self._deserialize(value)
             
         except Exception as e:
             logging.error(f"Error getting hash value from Redis: {e}")
@@ -213,95 +693,391 @@ class RedisClient:
             if isinstance(self.redis_pool, MockRedisPool):
                 return await self.redis_pool.hash_get_all(name)
             
-            redis = aioredis.Redis(connection_pool=self.redis_pool)
-            values = await redis.hgetall(name)
-            await redis.close()
+            values = await self.redis.hgetall(name)
             
             # Deserialize values
-            result = {}
-            for key, value in values.items():
-                try:
-                    result[key] = json.loads(value)
-                except json.JSONDecodeError:
-                    result[key] = value
-            
-            return result
+            return {
+                self._decode_key(key): self._deserialize(value) for key, value in values.items()
+            }
             
         except Exception as e:
             logging.error(f"Error getting all hash values from Redis: {e}")
             return {}
 
 
+class RedisPipeline:
+    """Queues RedisClient commands and sends them in one round trip.
+    
+    Results are decoded with the same path as the single-key methods and
+    are available as `results` after the context exits (or from execute()).
+    """
+    
+    def __init__(self, client: RedisClient):
+        self.client = client
+        self.commands: List[Tuple[str, tuple]] = []
+        self.results: List[Any] = []
+    
+    async def __aenter__(self) -> "RedisPipeline":
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            await self.execute()
+    
+    def get(self, key: str) -> "RedisPipeline":
+        self.commands.append(("get", (key,)))
+        return self
+    
+    def set(self, key: str, value: Any, expire: Optional[int] = None) -> "RedisPipeline":
+        self.commands.append(("set", (key, value, expire)))
+        return self
+    
+    def delete(self, key: str) -> "RedisPipeline":
+        self.commands.append(("delete", (key,)))
+        return self
+    
+    def exists(self, key: str) -> "RedisPipeline":
+        self.commands.append(("exists", (key,)))
+        return self
+    
+    def increment(self, key: str, amount: int = 1) -> "RedisPipeline":
+        self.commands.append(("increment", (key, amount)))
+        return self
+    
+    def expire(self, key: str, seconds: int) -> "RedisPipeline":
+        self.commands.append(("expire", (key, seconds)))
+        return self
+    
+    def hash_set(self, name: str, mapping: Dict[str, Any]) -> "RedisPipeline":
+        self.commands.append(("hash_set", (name, mapping)))
+        return self
+    
+    def hash_get(self, name: str, key: str) -> "RedisPipeline":
+        self.commands.append(("hash_get", (name, key)))
+        return self
+    
+    def hash_get_all(self, name: str) -> "RedisPipeline":
+        self.commands.append(("hash_get_all", (name,)))
+        return self
+    
+    async def execute(self) -> List[Any]:
+        """Send all queued commands and return their decoded results"""
+        commands, self.commands = self.commands, []
+        if not commands:
+            self.results = []
+            return self.results
+        
+        try:
+            if isinstance(self.client.redis_pool, MockRedisPool):
+                mock = self.client.redis_pool
+                self.results = [
+                    await getattr(mock, name)(*args) for name, args in commands
+                ]
+                return self.results
+            
+            async with self.client.redis.pipeline(transaction=False) as pipe:
+                for name, args in commands:
+                    self._queue(pipe, name, args)
+                raw_results = await pipe.execute(raise_on_error=False)
+            
+            self.results = [
+                self._decode(name, raw) for (name, _), raw in zip(commands, raw_results)
+            ]
+            await self.client._invalidate_local([
+                args[0] for name, args in commands if name in ("set", "delete", "expire")
+            ])
+            
+        except Exception as e:
+            logging.error(f"Error executing Redis pipeline: {e}")
+            self.results = [None] * len(commands)
+        
+        return self.results
+    
+    def _queue(self, pipe: Any, name: str, args: tuple) -> None:
+        """Translate a queued command onto the underlying redis pipeline"""
+        serialize = self.client._serialize
+        if name == "get":
+            pipe.get(args[0])
+        elif name == "set":
+            key, value, expire = args
+            if expire:
+                pipe.setex(key, expire, serialize(value))
+            else:
+                pipe.set(key, serialize(value))
+        elif name == "delete":
+            pipe.delete(args[0])
+        elif name == "exists":
+            pipe.exists(args[0])
+        elif name == "increment":
+            pipe.incrby(args[0], args[1])
+        elif name == "expire":
+            pipe.expire(args[0], args[1])
+        elif name == "hash_set":
+            hash_name, mapping = args
+            pipe.hset(hash_name, mapping={key: serialize(value) for key, value in mapping.items()})
+        elif name == "hash_get":
+            pipe.hget(args[0], args[1])
+        elif name == "hash_get_all":
+            pipe.hgetall(args[0])
+    
+    def _decode(self, name: str, raw: Any) -> Any:
+        """Decode a raw pipeline reply the same way the single-key methods do"""
+        if isinstance(raw, Exception):
+            logging.error(f"Error in pipelined Redis {name}: {raw}")
+            return None
+        if name in ("get", "hash_get"):
+            return self.client._deserialize(raw)
+        if name == "hash_get_all":
+            return {
+                self.client._decode_key(key): self.client._deserialize(value)
+                for key, value in raw.items()
+            }
+        if name == "increment":
+            return raw
+        return bool(raw)
+
+
 class MockRedisPool:
-    """Mock Redis pool for development/testing"""
+    """In-memory Redis stand-in used when no server is reachable.
+    
+    Values are stored serialized exactly as RedisClient writes them and
+    decoded on read, TTLs expire lazily on access and through a periodic
+    sweep, and the store is bounded by entry count and byte budget with
+    LRU eviction.
+    """
+    
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        max_bytes: int = 64 * 1024 * 1024,
+        sweep_interval: float = 60.0,
+        codec: Optional[CacheCodec] = None
+    ):
+        self.codec = codec or CacheCodec()
+        self.data: "OrderedDict[str, Any]" = OrderedDict()
+        self.expirations: Dict[str, float] = {}
+        self.sizes: Dict[str, int] = {}
+        self.current_bytes = 0
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval
+        self.sweep_task: Optional[asyncio.Task] = None
+        self.stats = {"evictions": 0, "expirations": 0}
+    
+    def start(self) -> None:
+        """Start the background sweep of expired keys"""
+        if self.sweep_task is None:
+            self.sweep_task = asyncio.create_task(self._sweep_loop())
+    
+    async def disconnect(self) -> None:
+        """Stop the sweeper and drop all data"""
+        if self.sweep_task is not None:
+            self.sweep_task.cancel()
+            try:
+                await self.sweep_task
+            except asyncio.CancelledError:
+                pass
+            self.sweep_task = None
+        self.data.clear()
+        self.expirations.clear()
+        self.sizes.clear()
+        self.current_bytes = 0
+    
+    def sweep_expired(self) -> int:
+        """Remove every expired key; returns the number removed"""
+        now = time.monotonic()
+        expired = [key for key, expires_at in self.expirations.items() if expires_at <= now]
+        for key in expired:
+            self._remove(key)
+        self.stats["expirations"] += len(expired)
+        return len(expired)
     
-    def __init__(self):
-        self.data = {}
-        self.expirations = {}
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self.data),
+            "bytes": self.current_bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "keys_with_ttl": len(self.expirations),
+            **self.stats
+        }
+    
+    async def _sweep_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            try:
+                self.sweep_expired()
+            except Exception as e:
+                logging.error(f"Mock Redis sweep error: {e}")
+    
+    def _lookup(self, key: str) -> Optional[Any]:
+        """Return the stored value, expiring it lazily and refreshing LRU order"""
+        if key not in self.data:
+            return None
+        
+        expires_at = self.expirations.get(key)
+        if expires_at is not None and expires_at <= time.monotonic():
+            self._remove(key)
+            self.stats["expirations"] += 1
+            return None
+        
+        self.data.move_to_end(key)
+        return self.data[key]
+    
+    def _store(self, key: str, value: Any) -> None:
+        """Store a serialized value and evict least recently used keys over budget"""
+        if key in self.data:
+            self.current_bytes -= self.sizes[key]
+        
+        if isinstance(value, dict):
+            size = len(key) + sum(len(field) + len(item) for field, item in value.items())
+        else:
+            size = len(key) + len(value)
+        
+        self.data[key] = value
+        self.data.move_to_end(key)
+        self.sizes[key] = size
+        self.current_bytes += size
+        
+        while len(self.data) > 1 and (
+            len(self.data) > self.max_entries or self.current_bytes > self.max_bytes
+        ):
+            oldest_key = next(iter(self.data))
+            self._remove(oldest_key)
+            self.stats["evictions"] += 1
+    
+    def _remove(self, key: str) -> None:
+        if key in self.data:
+            del self.data[key]
+            self.current_bytes -= self.sizes.pop(key, 0)
+        self.expirations.pop(key, None)
     
     async def get(self, key: str) -> Optional[Any]:
         """Mock get operation"""
-        if key in self.data:
-            return self.data[key]
-        return None
+        value = self._lookup(key)
+        if isinstance(value, dict):
+            return None  # GET on a hash is a WRONGTYPE error in Redis
+        return self.codec.decode(value)
     
     async def set(self, key: str, value: Any, expire: Optional[int] = None) -> bool:
         """Mock set operation"""
-        self.data[key] = value
+        self._store(key, self.codec.encode(value))
         if expire:
-            # In a real implementation, you'd handle expiration
-            pass
+            self.expirations[key] = time.monotonic() + expire
+        else:
+            # SET without a TTL clears any previous expiry
+            self.expirations.pop(key, None)
+        return True
+    
+    async def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """Mock multi-key get operation"""
+        return {key: await self.get(key) for key in keys}
+    
+    async def set_many(
+        self,
+        mapping: Dict[str, Any],
+        expire: Optional[Union[int, Dict[str, int]]] = None
+    ) -> bool:
+        """Mock multi-key set operation"""
+        for key, value in mapping.items():
+            ttl = expire.get(key) if isinstance(expire, dict) else expire
+            await self.set(key, value, ttl)
         return True
     
+    async def set_if_absent(self, key: str, value: str, expire: float) -> bool:
+        """Mock SET NX PX operation"""
+        if self._lookup(key) is not None:
+            return False
+        await self.set(key, value)
+        self.expirations[key] = time.monotonic() + expire
+        return True
+    
+    async def delete_if_equals(self, key: str, value: str) -> bool:
+        """Mock compare-and-delete used to release locks"""
+        if self._lookup(key) == value.encode("utf-8"):
+            self._remove(key)
+            return True
+        return False
+    
     async def delete(self, key: str) -> bool:
         """Mock delete operation"""
-        if key in self.data:
-            del self.data[key]
+        if self._lookup(key) is not None:
+            self._remove(key)
             return True
         return False
     
     async def exists(self, key: str) -> bool:
         """Mock exists operation"""
-        return key in self.data
+        return self._lookup(key) is not None
     
     async def keys(self, pattern: str = "*") -> List[str]:
         """Mock keys operation"""
+        self.sweep_expired()
         if pattern == "*":
             return list(self.data.keys())
-        # Simple pattern matching (not full regex support)
-        import fnmatch
         return [key for key in self.data.keys() if fnmatch.fnmatch(key, pattern)]
     
+    async def scan_keys(self, pattern: str = "*", count: int = 1000) -> AsyncIterator[str]:
+        """Mock SCAN: yields matching keys `count` at a time, letting other tasks run in between"""
+        keys = await self.keys(pattern)
+        for start in range(0, len(keys), count):
+            for key in keys[start:start + count]:
+                if key in self.data:
+                    yield key
+            await asyncio.sleep(0)
+    
+    async def unlink(self, keys: List[str]) -> int:
+        """Mock unlink operation"""
+        removed = 0
+        for key in keys:
+            if self._lookup(key) is not None:
+                self._remove(key)
+                removed += 1
+        return removed
+    
     async def increment(self, key: str, amount: int = 1) -> int:
         """Mock increment operation"""
-        current_value = self.data.get(key, 0)
-        if isinstance(current_value, (int, float)):
-            new_value = current_value + amount
-        else:
+        current_value = self._lookup(key)
+        if current_value is None:
             new_value = amount
-        self.data[key] = new_value
+        elif isinstance(current_value, bytes) and current_value.lstrip(b"-").isdigit():
+            new_value = int(current_value) + amount
+        else:
+            raise ValueError("value is not an integer or out of range")
+        
+        # INCRBY keeps the existing TTL
+        self._store(key, str(new_value).encode("utf-8"))
         return new_value
     
     async def expire(self, key: str, seconds: int) -> bool:
         """Mock expire operation"""
-        # Simplified - doesn't actually expire keys
-        return key in self.data
+        if self._lookup(key) is None:
+            return False
+        self.expirations[key] = time.monotonic() + seconds
+        return True
     
     async def hash_set(self, name: str, mapping: Dict[str, Any]) -> bool:
         """Mock hash set operation"""
-        if name not in self.data:
-            self.data[name] = {}
-        self.data[name].update(mapping)
-        return True
+        current = self._lookup(name)
+        if current is not None and not isinstance(current, dict):
+            raise ValueError("WRONGTYPE Operation against a key holding the wrong kind of value")
+        
+        current = dict(current or {})
+        added = sum(1 for field in mapping if field not in current)
+        current.update({field: self.codec.encode(value) for field, value in mapping.items()})
+        self._store(name, current)
+        return bool(added)
     
     async def hash_get(self, name: str, key: str) -> Optional[Any]:
         """Mock hash get operation"""
-        if name in self.data and isinstance(self.data[name], dict):
-            return self.data[name].get(key)
+        current = self._lookup(name)
+        if isinstance(current, dict):
+            return self.codec.decode(current.get(key))
         return None
     
     async def hash_get_all(self, name: str) -> Dict[str, Any]:
         """Mock hash get all operation"""
-        if name in self.data and isinstance(self.data[name], dict):
-            return self.data[name].copy()
-        return {}
\ No newline at end of file
+        current = self._lookup(name)
+        if isinstance(current, dict):
+            return {field: self.codec.decode(value) for field, value in current.items()}
+        return {}
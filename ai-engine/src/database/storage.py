@@ -0,0 +1,174 @@
+import os
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+
+class StorageBackend(ABC):
+    """Persistence surface the services and API depend on.
+    
+    MongoDBClient is the production implementation; EmbeddedStorage keeps
+    everything in process for tests, load tests and benchmarks.
+    """
+    
+    # Documents per cursor batch when a caller does not pass batch_size
+    default_batch_size: int = 1000
+    
+    @abstractmethod
+    async def connect(self):
+        """Open the backend"""
+    
+    @abstractmethod
+    async def disconnect(self):
+        """Flush pending writes and close the backend"""
+    
+    @abstractmethod
+    async def get_product(self, product_id: str) -> Optional[Dict[str, Any]]:
+        """Get a single product by ID"""
+    
+    @abstractmethod
+    async def get_products(self, product_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get several products by ID, keyed by ID; unknown IDs are left out"""
+    
+    @abstractmethod
+    async def get_all_products(self) -> List[Dict[str, Any]]:
+        """Get all products"""
+    
+    @abstractmethod
+    async def get_products_by_category(self, category: str) -> List[Dict[str, Any]]:
+        """Get products by category"""
+    
+    @abstractmethod
+    async def update_product(self, product_id: str, update_data: Dict[str, Any]) -> bool:
+        """Update a product"""
+    
+    @abstractmethod
+    async def get_market_data(self, product_id: str) -> List[Dict[str, Any]]:
+        """Get market data for a product"""
+    
+    @abstractmethod
+    async def get_market_ohlc(
+        self,
+        product_id: str,
+        interval: str = "1d",
+        market: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> List[Dict[str, Any]]:
+        """Get OHLC, mean price and volatility per market and interval"""
+    
+    @abstractmethod
+    async def store_market_data(self, market_data: Dict[str, Any]) -> bool:
+        """Store market data"""
+    
+    @abstractmethod
+    async def get_orders(self, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get orders with optional status filter"""
+    
+    @abstractmethod
+    async def get_suppliers(self, country: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Get suppliers with optional country filter"""
+    
+    @abstractmethod
+    async def store_prediction(self, prediction_data: Dict[str, Any]) -> bool:
+        """Store AI prediction data"""
+    
+    @abstractmethod
+    async def get_predictions(self, product_id: str) -> List[Dict[str, Any]]:
+        """Get predictions for a product"""
+    
+    @abstractmethod
+    async def store_news_impact(self, news_impact: Dict[str, Any]) -> bool:
+        """Store news impact"""
+    
+    @abstractmethod
+    async def store_news_impacts(self, news_impacts: List[Dict[str, Any]]) -> bool:
+        """Store several news impacts in one batch"""
+    
+    @abstractmethod
+    async def store_arbitrage_opportunity(self, opportunity: Dict[str, Any]) -> bool:
+        """Store arbitrage opportunity"""
+    
+    @abstractmethod
+    async def get_arbitrage_opportunities(self) -> List[Dict[str, Any]]:
+        """Get all arbitrage opportunities"""
+    
+    @abstractmethod
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """Get connection pool saturation and checkout wait metrics"""
+    
+    @abstractmethod
+    def iter_documents(
+        self,
+        collection: str,
+        filter_query: Optional[Dict[str, Any]] = None,
+        projection: Optional[Dict[str, Any]] = None,
+        sort: Optional[List[Tuple[str, int]]] = None,
+        limit: int = 0,
+        batch_size: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream documents from a collection one at a time"""
+    
+    async def iter_batches(
+        self,
+        collection: str,
+        filter_query: Optional[Dict[str, Any]] = None,
+        projection: Optional[Dict[str, Any]] = None,
+        sort: Optional[List[Tuple[str, int]]] = None,
+        limit: int = 0,
+        batch_size: Optional[int] = None
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Stream documents from a collection in lists of up to `batch_size`"""
+        batch_size = batch_size or self.default_batch_size
+        batch = []
+        async for document in self.iter_documents(
+            collection, filter_query, projection, sort, limit, batch_size
+        ):
+            batch.append(document)
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    
+    def stream_products(self, **options) -> AsyncIterator[Dict[str, Any]]:
+        """Stream all products; accepts iter_documents options"""
+        return self.iter_documents("products", {}, **options)
+    
+    def stream_orders(self, status: Optional[str] = None, **options) -> AsyncIterator[Dict[str, Any]]:
+        """Stream orders with optional status filter"""
+        filter_query = {"status": status} if status else {}
+        return self.iter_documents("orders", filter_query, **options)
+    
+    def stream_suppliers(self, country: Optional[str] = None, **options) -> AsyncIterator[Dict[str, Any]]:
+        """Stream suppliers with optional country filter"""
+        filter_query = {"country": country} if country else {}
+        return self.iter_documents("suppliers", filter_query, **options)
+    
+    def stream_market_data(self, product_id: str, **options) -> AsyncIterator[Dict[str, Any]]:
+        """Stream market data for a product"""
+        return self.iter_documents("market_data", {"meta.product_id": product_id}, **options)
+    
+    def stream_predictions(self, product_id: str, **options) -> AsyncIterator[Dict[str, Any]]:
+        """Stream predictions for a product"""
+        return self.iter_documents("predictions", {"product_id": product_id}, **options)
+    
+    def stream_arbitrage_opportunities(self, **options) -> AsyncIterator[Dict[str, Any]]:
+        """Stream all arbitrage opportunities"""
+        return self.iter_documents("arbitrage_opportunities", {}, **options)
+
+
+def create_storage_backend(backend: Optional[str] = None, **options) -> StorageBackend:
+    """Build the configured backend: "mongodb" (default) or "embedded".
+    
+    The choice falls back to the STORAGE_BACKEND environment variable.
+    `options` (pool sizing, timeouts, read preferences) go to MongoDBClient.
+    """
+    backend = (backend or os.getenv("STORAGE_BACKEND", "mongodb")).lower()
+    if backend == "embedded":
+        from .embedded_storage import EmbeddedStorage
+        return EmbeddedStorage()
+    if backend == "mongodb":
+        from .mongodb_client import MongoDBClient
+        return MongoDBClient(**options)
+    raise ValueError(f"Unknown storage backend: {backend}")
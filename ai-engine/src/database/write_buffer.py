@@ -0,0 +1,257 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from pymongo.errors import AutoReconnect, BulkWriteError, ConnectionFailure, PyMongoError
+
+# Server error code for a duplicate _id; on a retried batch it means the first attempt got through
+DUPLICATE_KEY_ERROR = 11000
+
+
+class WriteBufferFull(Exception):
+    """Raised when a document cannot be queued before `enqueue_timeout`"""
+
+
+@dataclass
+class _QueuedWrite:
+    document: Dict[str, Any]
+    future: asyncio.Future
+    # Set once an insert_many has carried the document, so a later duplicate
+    # _id means an earlier attempt (possibly in an earlier flush) wrote it
+    sent: bool = False
+
+
+def _is_transient(error: Exception) -> bool:
+    if isinstance(error, (AutoReconnect, ConnectionFailure)):
+        return True
+    return isinstance(error, PyMongoError) and error.has_error_label("RetryableWriteError")
+
+
+class WriteBehindBuffer:
+    """Batches inserts per collection and writes them with unordered insert_many.
+    
+    A collection is flushed once it holds `max_batch` documents or its
+    oldest document has waited `max_delay` seconds. When `max_pending`
+    documents are queued, writers wait up to `enqueue_timeout` seconds for
+    a flush and then get WriteBufferFull, so a write is either queued or
+    refused. Queued documents are never dropped for a transient failure:
+    a batch is retried `max_retries` times with exponential backoff and
+    then put back at the front of its queue for the next flush. Only
+    documents the server or driver rejects outright (e.g. failing
+    validation or BSON encoding) are discarded; they are counted as
+    "rejected". A non-transient error that fails the whole call is
+    narrowed down by splitting the batch, so one bad document cannot
+    block its collection. Each document's future
+    from `enqueue` resolves True once written and False if rejected.
+    `close()` flushes everything still queued.
+    """
+    
+    def __init__(
+        self,
+        db: Any,
+        max_batch: int = 500,
+        max_delay: float = 1.0,
+        max_pending: int = 10000,
+        max_retries: int = 3,
+        retry_backoff: float = 0.1,
+        enqueue_timeout: float = 30.0
+    ):
+        self.db = db
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.max_pending = max_pending
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff  # seconds before the first retry, doubled per attempt
+        self.enqueue_timeout = enqueue_timeout
+        self.buffers: Dict[str, Deque[_QueuedWrite]] = {}
+        self.oldest: Dict[str, float] = {}
+        self.pending = 0
+        self.wake = asyncio.Event()
+        self.space_available = asyncio.Event()
+        self.flush_lock = asyncio.Lock()
+        self.flush_task: Optional[asyncio.Task] = None
+        self.closing = False
+        self.stats = {
+            "enqueued": 0,
+            "written": 0,
+            "rejected": 0,
+            "retries": 0,
+            "requeued": 0,
+            "flushes": 0,
+            "backpressure_waits": 0
+        }
+    
+    def start(self) -> None:
+        """Start the background flusher"""
+        if self.flush_task is None:
+            self.flush_task = asyncio.create_task(self._flush_loop())
+    
+    async def close(self) -> None:
+        """Stop the flusher and write out everything still buffered"""
+        if self.flush_task is not None:
+            # Let an in-flight insert finish rather than cancelling it mid-batch
+            self.closing = True
+            self.wake.set()
+            await self.flush_task
+            self.flush_task = None
+            self.closing = False
+        await self.flush_all()
+        if self.pending:
+            logging.error(f"Write-behind buffer closed with {self.pending} documents still unwritten")
+    
+    async def enqueue(self, collection: str, document: Dict[str, Any]) -> asyncio.Future:
+        """Queue a document, waiting for a flush if the buffer is full.
+        
+        Returns a future that resolves True once the document is written
+        and False if the server rejects it. Raises WriteBufferFull when no
+        space frees up within `enqueue_timeout` seconds.
+        """
+        if self.pending >= self.max_pending:
+            self.stats["backpressure_waits"] += 1
+            deadline = time.monotonic() + self.enqueue_timeout
+        while self.pending >= self.max_pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise WriteBufferFull(f"Write buffer full ({self.pending} documents pending)")
+            if self.flush_task is None:
+                if not await self.flush_all():
+                    await asyncio.sleep(min(self.max_delay, remaining))
+                continue
+            self.space_available.clear()
+            self.wake.set()
+            try:
+                await asyncio.wait_for(self.space_available.wait(), timeout=remaining)
+            except asyncio.TimeoutError:
+                pass
+            
+        future = asyncio.get_running_loop().create_future()
+        buffer = self.buffers.setdefault(collection, deque())
+        if not buffer:
+            self.oldest[collection] = time.monotonic()
+        buffer.append(_QueuedWrite(document, future))
+        self.pending += 1
+        self.stats["enqueued"] += 1
+        
+        if len(buffer) >= self.max_batch:
+            if self.flush_task is None:
+                await self.flush(collection)
+            else:
+                self.wake.set()
+        return future
+    
+    async def enqueue_many(self, collection: str, documents: List[Dict[str, Any]]) -> List[asyncio.Future]:
+        return [await self.enqueue(collection, document) for document in documents]
+    
+    async def flush(self, collection: str) -> int:
+        """Write every buffered document of a collection; returns the number written.
+        
+        Stops early when documents still fail after their retries; those
+        stay queued for the next flush.
+        """
+        async with self.flush_lock:
+            written = 0
+            buffer = self.buffers.get(collection)
+            while buffer:
+                batch = [buffer.popleft() for _ in range(min(self.max_batch, len(buffer)))]
+                inserted, unwritten = await self._insert_batch(collection, batch)
+                written += inserted
+                self.pending -= len(batch) - len(unwritten)
+                self.space_available.set()
+                if unwritten:
+                    # Put them back in order; they still count as pending, so backpressure still applies
+                    buffer.extendleft(reversed(unwritten))
+                    self.stats["requeued"] += len(unwritten)
+                    return written
+            self.oldest.pop(collection, None)
+            return written
+    
+    async def flush_all(self) -> int:
+        written = 0
+        for collection in list(self.buffers):
+            written += await self.flush(collection)
+        return written
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "collections": {name: len(buffer) for name, buffer in self.buffers.items() if buffer},
+            **self.stats
+        }
+    
+    async def _flush_loop(self) -> None:
+        while not self.closing:
+            try:
+                await asyncio.wait_for(self.wake.wait(), timeout=self.max_delay)
+            except asyncio.TimeoutError:
+                pass
+            self.wake.clear()
+            
+            try:
+                now = time.monotonic()
+                for collection, buffer in list(self.buffers.items()):
+                    due = (
+                        len(buffer) >= self.max_batch
+                        or (buffer and now - self.oldest.get(collection, now) >= self.max_delay)
+                        or self.pending >= self.max_pending
+                    )
+                    if due:
+                        await self.flush(collection)
+            except Exception as e:
+                logging.error(f"Write-behind flush error: {e}")
+    
+    async def _insert_batch(self, collection: str, batch: List[_QueuedWrite]) -> Tuple[int, List[_QueuedWrite]]:
+        """Insert a batch, retrying transient failures; returns (written, documents to requeue)"""
+        self.stats["flushes"] += 1
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self.stats["retries"] += 1
+                await asyncio.sleep(self.retry_backoff * 2 ** (attempt - 1))
+            sent_before = [queued.sent for queued in batch]
+            for queued in batch:
+                queued.sent = True
+            try:
+                # Unordered: one bad document does not stop the rest of the batch.
+                # insert_many sets _id on each document, so a retry cannot insert twice.
+                await self.db[collection].insert_many([queued.document for queued in batch], ordered=False)
+                rejected = {}
+            except BulkWriteError as e:
+                if e.details.get("writeConcernErrors") and not e.details.get("writeErrors"):
+                    logging.warning(f"Write-behind insert into {collection} not acknowledged, retrying: {e}")
+                    continue
+                rejected = {
+                    error["index"]: error for error in e.details.get("writeErrors", [])
+                    if not (sent_before[error["index"]] and error.get("code") == DUPLICATE_KEY_ERROR)
+                }
+            except Exception as e:
+                if _is_transient(e):
+                    logging.warning(
+                        f"Write-behind insert into {collection} failed "
+                        f"(attempt {attempt + 1}/{self.max_retries + 1}): {e}"
+                    )
+                    continue
+                if len(batch) > 1:
+                    # The error (e.g. bson InvalidDocument) failed the whole call: split to isolate the culprit
+                    middle = len(batch) // 2
+                    written_left, unwritten_left = await self._insert_batch(collection, batch[:middle])
+                    written_right, unwritten_right = await self._insert_batch(collection, batch[middle:])
+                    return written_left + written_right, unwritten_left + unwritten_right
+                rejected = {0: {"errmsg": str(e)}}
+                
+            if rejected:
+                logging.error(
+                    f"Write-behind insert into {collection} rejected {len(rejected)} documents: "
+                    f"{next(iter(rejected.values())).get('errmsg')}"
+                )
+            for index, queued in enumerate(batch):
+                if not queued.future.done():
+                    queued.future.set_result(index not in rejected)
+            self.stats["written"] += len(batch) - len(rejected)
+            self.stats["rejected"] += len(rejected)
+            return len(batch) - len(rejected), []
+            
+        logging.error(f"Write-behind insert into {collection} still failing; {len(batch)} documents requeued")
+        return 0, batch
@@ -8,7 +8,7 @@ from datetime import datetime
 import os
 
 # Import our services
-from .database.mongodb_client import MongoDBClient
+from .database.storage import create_storage_backend
 from .database.redis_client import RedisClient
 from .services.market_analyzer import MarketAnalyzer
 from .services.news_processor import NewsProcessor
@@ -16,6 +16,7 @@ from .services.trade_intelligence_service import TradeIntelligenceService
 from .data_processing.trade_data_processor import TradeDataProcessor
 from .models.prediction_models import PricePredictionModel, ArbitragePredictionModel
 from .models.trade_analytics_models import ComprehensiveArbitrageModel
+from .models.training import shutdown_training_executor
 from .utils.websocket_manager import WebSocketManager
 
 # Configure logging
@@ -49,6 +50,9 @@ arbitrage_model = None
 comprehensive_model = None
 websocket_manager = None
 
+# Largest product_ids list the bulk prediction endpoint accepts
+MAX_BATCH_PREDICTIONS = 10000
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize all services on startup"""
@@ -59,8 +63,8 @@ async def startup_event():
     try:
         logger.info("Starting AI Analytics Engine...")
         
-        # Initialize database connections
-        db_client = MongoDBClient()
+        # Initialize database connections (STORAGE_BACKEND=embedded runs without mongod)
+        db_client = create_storage_backend()
         await db_client.connect()
         
         redis_client = RedisClient()
@@ -104,6 +108,7 @@ async def shutdown_event():
         await db_client.disconnect()
     if redis_client:
         await redis_client.disconnect()
+    shutdown_training_executor()
     
     logger.info("Services shut down successfully")
 
@@ -116,11 +121,23 @@ async def health_check():
         "timestamp": datetime.utcnow().isoformat(),
         "services": {
             "database": "connected" if db_client else "disconnected",
-            "redis": "connected" if redis_client else "disconnected",
-            "models": "loaded" if comprehensive_model and comprehensive_model.is_trained else "not_loaded"
+            "redis": redis_client.backend if redis_client else "disconnected",
+            "models": _model_status(comprehensive_model)
+        },
+        "model_versions": {
+            "price_prediction": price_model.model_version if price_model else None,
+            "comprehensive_arbitrage": comprehensive_model.model_version if comprehensive_model else None
         }
     }
 
+def _model_status(model: Any) -> str:
+    if model is None:
+        return "not_loaded"
+    if model.is_trained:
+        return "loaded"
+    training = model.training_task is not None and not model.training_task.done()
+    return "training" if training else "not_loaded"
+
 # Enhanced Trade Analytics Endpoints
 
 @app.post("/api/v2/trade-analysis/comprehensive")
@@ -260,6 +277,54 @@ async def predict_price(request: Dict[str, Any]):
         logger.error(f"Error in price prediction: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/api/v2/predictions/price/batch")
+async def predict_price_batch(request: Dict[str, Any]):
+    """Price predictions for many products in one model call"""
+    try:
+        product_ids = request.get("product_ids")
+        horizons = request.get("horizons")
+        
+        if not product_ids or not isinstance(product_ids, list):
+            raise HTTPException(status_code=400, detail="product_ids must be a non-empty list")
+        if len(product_ids) > MAX_BATCH_PREDICTIONS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"At most {MAX_BATCH_PREDICTIONS} product_ids per request"
+            )
+        
+        predictions = await price_model.predict_batch(product_ids, horizons)
+        
+        return {
+            "success": True,
+            "data": {
+                "predictions": predictions,
+                "total_count": len(predictions)
+            },
+            "timestamp": datetime.utcnow().isoformat()
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in batch price prediction: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/v2/models/retrain")
+async def retrain_models():
+    """Retrain the ML models in the background; current models serve until swapped"""
+    if not price_model or not comprehensive_model:
+        raise HTTPException(status_code=503, detail="Models not initialized")
+    
+    await price_model.train_model(wait=False)
+    await comprehensive_model.train_models(wait=False)
+    
+    return {
+        "success": True,
+        "data": {"retraining": ["price_model", "comprehensive_model"]},
+        "message": "Model retraining started",
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
 @app.get("/api/v2/arbitrage/opportunities")
 async def get_arbitrage_opportunities(
     market: Optional[str] = None,
@@ -365,6 +430,44 @@ async def get_news_impact(product_id: str, days: int = 7):
         logger.error(f"Error getting news impact: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# Observability endpoints
+@app.get("/api/v2/metrics/cache")
+async def get_cache_metrics():
+    """Cache hit/miss, byte and latency metrics per key prefix"""
+    if not redis_client:
+        raise HTTPException(status_code=503, detail="Redis client not initialized")
+    
+    return {
+        "success": True,
+        "data": {
+            **redis_client.get_cache_metrics(),
+            "pool": redis_client.get_pool_stats()
+        },
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+@app.get("/api/v2/metrics/storage")
+async def get_storage_metrics():
+    """Database connection pool saturation and checkout wait metrics"""
+    if not db_client:
+        raise HTTPException(status_code=503, detail="Database client not initialized")
+    
+    return {
+        "success": True,
+        "data": {"pool": db_client.get_pool_stats()},
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+@app.get("/api/v2/metrics/predictions")
+async def get_prediction_metrics():
+    """Prediction memo hit rates per model"""
+    models = {"price_prediction": price_model, "comprehensive_arbitrage": comprehensive_model}
+    return {
+        "success": True,
+        "data": {name: model.prediction_memo.get_stats() for name, model in models.items() if model},
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
 # Background task endpoints
 @app.post("/api/v2/background/update-market-data")
 async def trigger_market_data_update(background_tasks: BackgroundTasks):
@@ -0,0 +1,38 @@
+from itertools import repeat
+from typing import Any, Iterable, Optional, Sequence
+
+import numpy as np
+
+# Unknown code of model versions trained before a code was reserved; it is
+# also the code of the first real class, so those versions cannot tell them apart
+LEGACY_UNKNOWN_CATEGORY = 0
+
+
+class CategoryTable:
+    """Label to integer code lookup compiled from a fitted LabelEncoder.
+    
+    A plain dict replaces LabelEncoder.transform, which allocates arrays
+    and binary-searches `classes_` on every call and raises on unknown
+    labels. Unknown labels map to `unknown_code`, by default `len(classes)`,
+    a code no real class has; models are trained with some rows set to it.
+    """
+    
+    def __init__(self, classes: Sequence[Any], unknown_code: Optional[int] = None):
+        self.codes = {label: code for code, label in enumerate(np.asarray(classes).tolist())}
+        self.unknown_code = len(self.codes) if unknown_code is None else unknown_code
+    
+    @classmethod
+    def from_encoder(cls, encoder: Any, unknown_code: Optional[int] = None) -> "CategoryTable":
+        return cls(encoder.classes_, unknown_code)
+    
+    def __len__(self) -> int:
+        return len(self.codes)
+    
+    def encode(self, label: Any) -> int:
+        return self.codes.get(label, self.unknown_code)
+    
+    def encode_many(self, labels: Iterable[Any]) -> np.ndarray:
+        """Codes for a list or array of labels in one pass"""
+        if isinstance(labels, np.ndarray):
+            labels = labels.tolist()
+        return np.fromiter(map(self.codes.get, labels, repeat(self.unknown_code)), dtype=np.int64)
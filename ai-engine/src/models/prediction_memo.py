@@ -0,0 +1,92 @@
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class PredictionMemo:
+    """Bounded LRU of model outputs keyed by quantized feature vectors.
+    
+    Rows are snapped to a grid of `resolution` standard deviations per
+    feature (taken from the fitted scaler), so vectors that differ only in
+    noise share an entry; a resolution of 0 keys on the exact values.
+    Keys carry the model version and `reset` is called whenever a model
+    is swapped in, so a prediction from an older model is never served.
+    """
+    
+    def __init__(self, max_entries: int = 50000, resolution: float = 1e-3):
+        self.max_entries = max_entries
+        self.resolution = resolution
+        self.entries: "OrderedDict[Tuple[Optional[str], bytes], Any]" = OrderedDict()
+        self.model_version: Optional[str] = None
+        self.quantum: Optional[np.ndarray] = None
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "computed": 0,
+            "evictions": 0,
+            "invalidations": 0
+        }
+    
+    def reset(self, model_version: Optional[str], feature_scale: Optional[np.ndarray] = None) -> None:
+        """Drop every entry and key new ones on `model_version`"""
+        if self.entries:
+            self.stats["invalidations"] += 1
+        self.entries.clear()
+        self.model_version = model_version
+        if feature_scale is None or not self.resolution:
+            self.quantum = None
+        else:
+            self.quantum = np.asarray(feature_scale, dtype=float) * self.resolution
+    
+    def predict(self, features: np.ndarray, compute: Callable[[np.ndarray], np.ndarray]) -> np.ndarray:
+        """Outputs for each feature row; `compute` runs once per distinct uncached row"""
+        features = np.asarray(features, dtype=float)
+        if not len(features):
+            return compute(features)
+            
+        results: List[Any] = []
+        missing: Dict[Tuple[Optional[str], bytes], List[int]] = {}
+        for row, key in enumerate(self._keys(features)):
+            value = self.entries.get(key)
+            if value is None:
+                missing.setdefault(key, []).append(row)
+            else:
+                self.entries.move_to_end(key)
+            results.append(value)
+            
+        missed = sum(len(rows) for rows in missing.values())
+        self.stats["hits"] += len(features) - missed
+        self.stats["misses"] += missed
+        
+        if missing:
+            # Duplicate rows in one batch are computed once
+            computed = compute(features[[rows[0] for rows in missing.values()]]).tolist()
+            self.stats["computed"] += len(computed)
+            for (key, rows), value in zip(missing.items(), computed):
+                self._store(key, value)
+                for row in rows:
+                    results[row] = value
+                    
+        return np.array(results)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "model_version": self.model_version,
+            "hit_ratio": round(self.stats["hits"] / lookups, 4) if lookups else 0,
+            **self.stats
+        }
+    
+    def _keys(self, features: np.ndarray) -> List[Tuple[Optional[str], bytes]]:
+        if self.quantum is not None:
+            features = np.round(features / self.quantum).astype(np.int64)
+        return [(self.model_version, row.tobytes()) for row in features]
+    
+    def _store(self, key: Tuple[Optional[str], bytes], value: Any) -> None:
+        self.entries[key] = value
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.stats["evictions"] += 1
@@ -4,155 +4,320 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
 import logging
 import asyncio
+import hashlib
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.preprocessing import StandardScaler
 import joblib
 import os
+import time
+import sklearn
+
+from .prediction_memo import PredictionMemo
+from .registry import ModelRegistry, VersionWatch
+from .training import run_training
+from .tree_engine import TreeEnsemble, export_tree_ensemble
+
+PRICE_MODEL_NAME = "price_prediction"
+# Registry array group holding the flattened forest; workers serve from it
+PRICE_TREE_ARRAYS = "model_tree"
+
+# Days ahead that predictions are reported for
+PREDICTION_HORIZONS = [3, 7, 14, 30]
+PRICE_FEATURES = ["current_price", "supply_level", "demand_level", "seasonal_factor", "market_volatility"]
 
 class PricePredictionModel:
     """Advanced price prediction model using machine learning"""
     
     def __init__(self):
+        # sklearn forest, for batches above compiled_max_rows; loaded in the background on first need
         self.model = None
+        self.estimator_task: Optional[asyncio.Task] = None
+        self.compiled_model: Optional[TreeEnsemble] = None
+        # Up to this many rows the array engine beats sklearn's per-tree overhead
+        self.compiled_max_rows = 256
         self.scaler = StandardScaler()
         self.model_path = "models/price_prediction_model.pkl"
         self.scaler_path = "models/price_scaler.pkl"
         self.is_trained = False
+        self.training_task: Optional[asyncio.Task] = None
+        
+        # Versioned artifacts shared by all workers; legacy pickles above are read-only fallbacks
+        self.registry = ModelRegistry()
+        self.model_version: Optional[str] = None
+        self.version_watch = VersionWatch(self.registry, PRICE_MODEL_NAME)
+        
+        # Repeat scoring of the same product and day skips the scaler and forest
+        self.prediction_memo = PredictionMemo()
         
     async def load_model(self):
         """Load pre-trained model or create new one"""
         try:
-            if os.path.exists(self.model_path) and os.path.exists(self.scaler_path):
+            if self.registry.current_version(PRICE_MODEL_NAME):
+                await self._load_version()
+            elif os.path.exists(self.model_path) and os.path.exists(self.scaler_path):
                 self.model = joblib.load(self.model_path)
+                self.compiled_model = TreeEnsemble.from_model(self.model)
                 self.scaler = joblib.load(self.scaler_path)
+                self.model_version = "legacy"
+                self.prediction_memo.reset(self.model_version, self.scaler.scale_)
                 self.is_trained = True
                 logging.info("Loaded pre-trained price prediction model")
             else:
-                await self.train_model()
+                # Predictions wait for this run; the rest of the API keeps serving
+                await self.train_model(wait=False)
         except Exception as e:
             logging.error(f"Error loading model: {str(e)}")
-            await self.train_model()
+            await self.train_model(wait=False)
+    
+    async def train_model(self, wait: bool = True):
+        """Train the price prediction model in a worker process and swap it in.
+        
+        The current model keeps serving until the new one is ready, and
+        calls made while a run is in flight share that run.
+        """
+        if self.training_task is None or self.training_task.done():
+            self.training_task = asyncio.create_task(self._train_in_background())
+        if wait:
+            await asyncio.shield(self.training_task)
     
-    async def train_model(self):
-        """Train the price prediction model"""
+    async def _train_in_background(self):
         try:
-            # Create synthetic training data for demonstration
-            # In production, this would use real historical data
-            np.random.seed(42)
-            n_samples = 1000
-            
-            # Generate synthetic features
-            historical_prices = np.random.normal(2000, 500, n_samples)
-            supply_levels = np.random.uniform(0.3, 1.0, n_samples)
-            demand_levels = np.random.uniform(0.4, 1.2, n_samples)
-            seasonal_factors = np.random.uniform(0.8, 1.3, n_samples)
-            market_volatility = np.random.uniform(0.1, 0.5, n_samples)
-            
-            # Generate target prices with some realistic patterns
-            target_prices = (
-                historical_prices * 
-                (1 + 0.2 * (demand_levels - 0.8)) *
-                (1 - 0.15 * (supply_levels - 0.65)) *
-                seasonal_factors *
-                (1 + 0.1 * market_volatility)
-            )
-            
-            # Create feature matrix
-            X = np.column_stack([
-                historical_prices,
-                supply_levels,
-                demand_levels,
-                seasonal_factors,
-                market_volatility
-            ])
-            
-            # Scale features
-            X_scaled = self.scaler.fit_transform(X)
-            
-            # Train model
-            self.model = RandomForestRegressor(
-                n_estimators=100,
-                max_depth=10,
-                random_state=42
-            )
-            self.model.fit(X_scaled, target_prices)
-            
-            # Save model
-            os.makedirs("models", exist_ok=True)
-            joblib.dump(self.model, self.model_path)
-            joblib.dump(self.scaler, self.scaler_path)
-            
-            self.is_trained = True
+            # The worker publishes to the registry; only the version string comes back
+            version = await run_training(_fit_price_model, self.registry.root)
+            await self._load_version(version)
             logging.info("Trained new price prediction model")
             
         except Exception as e:
             logging.error(f"Error training model: {str(e)}")
-            self.is_trained = False
+            self.is_trained = self.compiled_model is not None
+    
+    async def _load_version(self, version: Optional[str] = None):
+        version, artifacts, _ = await asyncio.to_thread(
+            self.registry.load, PRICE_MODEL_NAME, version, artifacts=("scaler", PRICE_TREE_ARRAYS)
+        )
+        tree_arrays = artifacts.get(PRICE_TREE_ARRAYS)
+        if tree_arrays is None:
+            # Published before the array export: flatten the forest once, then let it go
+            _, estimators, _ = await asyncio.to_thread(
+                self.registry.load, PRICE_MODEL_NAME, version, artifacts=("model",)
+            )
+            tree_arrays = export_tree_ensemble(estimators["model"])
+        
+        # Swap in one step so no prediction pairs the new model with the old scaler
+        self.model, self.compiled_model, self.scaler, self.model_version = (
+            None, TreeEnsemble(tree_arrays), artifacts["scaler"], version
+        )
+        self.prediction_memo.reset(version, self.scaler.scale_)
+        self.is_trained = True
+        logging.info(f"Loaded price prediction model version {version}")
+    
+    async def refresh_model(self):
+        """Switch to a version another worker published, checked at most every 30s"""
+        version = self.version_watch.newer_than(self.model_version)
+        if version:
+            try:
+                await self._load_version(version)
+            except Exception as e:
+                logging.error(f"Error loading price model version {version}: {str(e)}")
+    
+    def fit(self) -> str:
+        """Fit the model and publish it to the registry; runs in a training worker"""
+        started = time.perf_counter()
+        
+        # Create synthetic training data for demonstration
+        # In production, this would use real historical data
+        np.random.seed(42)
+        n_samples = 1000
+        
+        # Generate synthetic features
+        historical_prices = np.random.normal(2000, 500, n_samples)
+        supply_levels = np.random.uniform(0.3, 1.0, n_samples)
+        demand_levels = np.random.uniform(0.4, 1.2, n_samples)
+        seasonal_factors = np.random.uniform(0.8, 1.3, n_samples)
+        market_volatility = np.random.uniform(0.1, 0.5, n_samples)
+        
+        # Generate target prices with some realistic patterns
+        target_prices = (
+            historical_prices * 
+            (1 + 0.2 * (demand_levels - 0.8)) *
+            (1 - 0.15 * (supply_levels - 0.65)) *
+            seasonal_factors *
+            (1 + 0.1 * market_volatility)
+        )
+        
+        # Create feature matrix
+        X = np.column_stack([
+            historical_prices,
+            supply_levels,
+            demand_levels,
+            seasonal_factors,
+            market_volatility
+        ])
+        
+        # Scale features
+        X_scaled = self.scaler.fit_transform(X)
+        
+        # Train model
+        self.model = RandomForestRegressor(
+            n_estimators=100,
+            max_depth=10,
+            random_state=42
+        )
+        self.model.fit(X_scaled, target_prices)
+        
+        # Flatten the forest for serving and check it against sklearn
+        tree_arrays = export_tree_ensemble(self.model)
+        if not np.allclose(TreeEnsemble(tree_arrays).predict(X_scaled), self.model.predict(X_scaled)):
+            raise ValueError("Exported price model does not match its sklearn predictions")
+        
+        # Publish model; workers map the tree arrays and read the forest only for large batches
+        return self.registry.publish(
+            PRICE_MODEL_NAME,
+            {"model": self.model, "scaler": self.scaler},
+            {
+                "trained_at": datetime.utcnow().isoformat(),
+                "training_seconds": round(time.perf_counter() - started, 3),
+                "n_samples": n_samples,
+                "features": PRICE_FEATURES,
+                "estimator": type(self.model).__name__,
+                "params": self.model.get_params(),
+                "sklearn_version": sklearn.__version__,
+                "numpy_version": np.__version__
+            },
+            arrays={PRICE_TREE_ARRAYS: tree_arrays}
+        )
     
     async def predict(self, product_id: str, timeframe: int = 3) -> Dict[str, Any]:
         """Predict price for a product over specified timeframe"""
+        predictions = await self.predict_batch([product_id])
+        return predictions[product_id]
+    
+    async def predict_batch(
+        self,
+        product_ids: List[str],
+        horizons: Optional[List[int]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Predict prices for many products with one scaler transform and one forest predict"""
+        horizons = list(horizons or PREDICTION_HORIZONS)
         try:
+            await self.refresh_model()
             if not self.is_trained:
                 await self.train_model()
             
-            # Generate features for prediction
-            # In production, these would come from real market data
-            current_price = 2500  # Base price
-            supply_level = np.random.uniform(0.4, 0.9)
-            demand_level = np.random.uniform(0.5, 1.1)
-            seasonal_factor = 1.0 + 0.2 * np.sin(2 * np.pi * datetime.now().timetuple().tm_yday / 365)
-            market_volatility = np.random.uniform(0.1, 0.4)
-            
-            # Create feature vector
-            features = np.array([[
-                current_price,
-                supply_level,
-                demand_level,
-                seasonal_factor,
-                market_volatility
-            ]])
+            if not product_ids:
+                return {}
             
-            # Scale features
-            features_scaled = self.scaler.transform(features)
+            # Generate features for prediction, one row per product
+            # In production, these would come from real market data
+            features = self._generate_features(product_ids)
+            if len(features) > self.compiled_max_rows:
+                self._load_estimator_in_background()
+            supply_levels = features[:, 1]
+            demand_levels = features[:, 2]
+            market_volatility = features[:, 4]
             
-            # Make prediction
-            predicted_price = self.model.predict(features_scaled)[0]
+            predicted_prices = self.prediction_memo.predict(features, self._predict_prices)
             
             # Calculate confidence based on model uncertainty
-            confidence = max(0.5, min(0.95, 1.0 - market_volatility))
+            confidence = np.clip(1.0 - market_volatility, 0.5, 0.95)
             
-            # Generate multiple timeframe predictions
-            predictions = {}
-            for days in [3, 7, 14, 30]:
-                # Adjust prediction based on timeframe
-                time_factor = 1.0 + 0.05 * (days - 3)  # Slight upward trend
-                volatility_factor = 1.0 + 0.1 * market_volatility * (days / 7)
-                
-                adjusted_price = predicted_price * time_factor * volatility_factor
-                
-                predictions[f"price_{days}_days"] = {
-                    "value": round(adjusted_price, 2),
-                    "confidence": max(0.3, confidence - 0.1 * (days / 7)),
-                    "factors": self._get_influencing_factors(supply_level, demand_level, market_volatility)
+            # Timeframe adjustments for every (product, horizon) pair at once
+            days = np.asarray(horizons, dtype=float)
+            time_factor = 1.0 + 0.05 * (days - 3)  # Slight upward trend
+            volatility_factor = 1.0 + 0.1 * market_volatility[:, None] * (days / 7)
+            adjusted_prices = np.round(predicted_prices[:, None] * time_factor * volatility_factor, 2)
+            horizon_confidence = np.maximum(0.3, confidence[:, None] - 0.1 * (days / 7))
+            
+            last_updated = datetime.utcnow().isoformat()
+            results = {}
+            for row, product_id in enumerate(product_ids):
+                factors = self._get_influencing_factors(
+                    supply_levels[row], demand_levels[row], market_volatility[row]
+                )
+                results[product_id] = {
+                    "predictions": {
+                        f"price_{horizon}_days": {
+                            "value": value,
+                            "confidence": value_confidence,
+                            "factors": factors
+                        }
+                        for horizon, value, value_confidence in zip(
+                            horizons, adjusted_prices[row].tolist(), horizon_confidence[row].tolist()
+                        )
+                    },
+                    "confidence": float(confidence[row]),
+                    "model_version": self.model_version,
+                    "last_updated": last_updated
                 }
             
-            return {
-                "predictions": predictions,
-                "confidence": confidence,
-                "model_version": "1.0",
-                "last_updated": datetime.utcnow().isoformat()
-            }
+            return results
             
         except Exception as e:
             logging.error(f"Prediction error: {str(e)}")
             return {
-                "predictions": {
-                    "price_3_days": {"value": 2500, "confidence": 0.5, "factors": ["default"]}
-                },
-                "confidence": 0.5,
-                "error": str(e)
+                product_id: {
+                    "predictions": {
+                        "price_3_days": {"value": 2500, "confidence": 0.5, "factors": ["default"]}
+                    },
+                    "confidence": 0.5,
+                    "error": str(e)
+                }
+                for product_id in product_ids
             }
     
+    def _predict_prices(self, features: np.ndarray) -> np.ndarray:
+        """Predict with the array engine for small batches, sklearn for large ones once it is loaded"""
+        features = self.scaler.transform(features)
+        if len(features) <= self.compiled_max_rows or self.model is None:
+            return self.compiled_model.predict(features)
+        return self.model.predict(features)
+    
+    def _load_estimator_in_background(self):
+        """Start reading the sklearn forest off the event loop; until then the array engine serves"""
+        if self.model is None and (self.estimator_task is None or self.estimator_task.done()):
+            self.estimator_task = asyncio.create_task(self._load_estimator(self.model_version))
+    
+    async def _load_estimator(self, version: Optional[str]):
+        try:
+            _, artifacts, _ = await asyncio.to_thread(
+                self.registry.load, PRICE_MODEL_NAME, version, artifacts=("model",)
+            )
+            # A newer version may have been swapped in while this one was read
+            if version == self.model_version:
+                self.model = artifacts["model"]
+        except Exception as e:
+            logging.error(f"Error loading price model estimator {version}: {str(e)}")
+    
+    def _generate_features(self, product_ids: List[str]) -> np.ndarray:
+        """Feature matrix in training column order, one row per product.
+        
+        The placeholder market signals are drawn from a hash of product id
+        and date, so a product keeps the same features for the whole day.
+        """
+        n_products = len(product_ids)
+        today = datetime.now().date()
+        digests = b"".join(
+            hashlib.blake2b(f"{product_id}:{today}".encode(), digest_size=24).digest()
+            for product_id in product_ids
+        )
+        draws = np.frombuffer(digests, dtype=np.uint64).reshape(-1, 3) / 2.0 ** 64
+        
+        current_price = np.full(n_products, 2500.0)  # Base price
+        supply_level = 0.4 + 0.5 * draws[:, 0]
+        demand_level = 0.5 + 0.6 * draws[:, 1]
+        seasonal_factor = np.full(
+            n_products, 1.0 + 0.2 * np.sin(2 * np.pi * today.timetuple().tm_yday / 365)
+        )
+        market_volatility = 0.1 + 0.3 * draws[:, 2]
+        
+        return np.column_stack([
+            current_price,
+            supply_level,
+            demand_level,
+            seasonal_factor,
+            market_volatility
+        ])
+    
     def _get_influencing_factors(self, supply: float, demand: float, volatility: float) -> List[str]:
         """Get list of factors influencing the prediction"""
         factors = []
@@ -176,6 +341,13 @@ class PricePredictionModel:
         return factors
 
 
+def _fit_price_model(registry_root: str) -> str:
+    """Training-pool entry point: fit a fresh model, publish it and return its version"""
+    model = PricePredictionModel()
+    model.registry = ModelRegistry(registry_root)
+    return model.fit()
+
+
 class ArbitragePredictionModel:
     """Arbitrage opportunity detection model"""
     
@@ -0,0 +1,223 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import joblib
+import numpy as np
+
+MANIFEST_FILE = "manifest.json"
+CURRENT_FILE = "CURRENT"
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _write_atomic(path: str, content: str) -> None:
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    with open(temporary_path, "w") as handle:
+        handle.write(content)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(temporary_path, path)
+
+
+class ModelRegistry:
+    """Versioned model artifacts on disk, shared by every worker process.
+    
+    Layout: `<root>/<model name>/<version>/` holds one uncompressed joblib
+    file per artifact, one `.npy` file per array of each array group
+    (`<group>/<array>.npy`), and `manifest.json` (checksums, training
+    metadata, version). `<root>/<model name>/CURRENT` names the live
+    version and is replaced atomically on publish, so readers never see a
+    half-written version.
+    
+    Array groups are loaded with `np.load(mmap_mode="r")`: the arrays are
+    mapped from the page cache, so workers loading the same version share
+    that memory. Joblib artifacts are unpickled into each worker; objects
+    such as sklearn trees copy their arrays on unpickle even when mapped,
+    so serving state should be published as arrays.
+    """
+    
+    def __init__(self, root: Optional[str] = None, keep_versions: int = 3):
+        self.root = root or os.getenv("MODEL_REGISTRY_DIR", "models/registry")
+        self.keep_versions = keep_versions
+    
+    def publish(
+        self,
+        name: str,
+        artifacts: Dict[str, Any],
+        metadata: Optional[Dict[str, Any]] = None,
+        arrays: Optional[Dict[str, Dict[str, Any]]] = None
+    ) -> str:
+        """Write a new version of `name`, make it current and return its version.
+        
+        `arrays` maps group names to dicts of arrays or scalars; each value
+        is saved as its own `.npy` file and comes back as a read-only map.
+        """
+        created_at = datetime.now(timezone.utc)
+        version = f"{created_at.strftime('%Y%m%dT%H%M%S.%fZ')}-{uuid.uuid4().hex[:8]}"
+        model_dir = os.path.join(self.root, name)
+        staging_dir = os.path.join(model_dir, f".staging-{version}")
+        os.makedirs(staging_dir)
+        
+        try:
+            files = {}
+            for artifact, value in artifacts.items():
+                filename = f"{artifact}.joblib"
+                path = os.path.join(staging_dir, filename)
+                # Uncompressed, so arrays can be memory-mapped on load
+                joblib.dump(value, path)
+                files[artifact] = {
+                    "file": filename,
+                    "sha256": _sha256(path),
+                    "bytes": os.path.getsize(path)
+                }
+                
+            array_files = {}
+            for group, values in (arrays or {}).items():
+                os.makedirs(os.path.join(staging_dir, group))
+                array_files[group] = {}
+                for key, value in values.items():
+                    filename = os.path.join(group, f"{key}.npy")
+                    path = os.path.join(staging_dir, filename)
+                    np.save(path, np.asarray(value), allow_pickle=False)
+                    array_files[group][key] = {
+                        "file": filename,
+                        "sha256": _sha256(path),
+                        "bytes": os.path.getsize(path)
+                    }
+                
+            manifest = {
+                "name": name,
+                "version": version,
+                "created_at": created_at.isoformat(),
+                "artifacts": files,
+                "arrays": array_files,
+                "metadata": metadata or {}
+            }
+            _write_atomic(os.path.join(staging_dir, MANIFEST_FILE), json.dumps(manifest, indent=2, default=str))
+            os.rename(staging_dir, os.path.join(model_dir, version))
+        except Exception:
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            raise
+            
+        _write_atomic(os.path.join(model_dir, CURRENT_FILE), version)
+        logging.info(f"Published {name} model version {version}")
+        self.prune(name)
+        return version
+    
+    def current_version(self, name: str) -> Optional[str]:
+        """Version CURRENT points to, or None if nothing is published"""
+        try:
+            with open(os.path.join(self.root, name, CURRENT_FILE)) as handle:
+                return handle.read().strip() or None
+        except FileNotFoundError:
+            return None
+    
+    def list_versions(self, name: str) -> List[str]:
+        """Published versions of a model, oldest first"""
+        model_dir = os.path.join(self.root, name)
+        if not os.path.isdir(model_dir):
+            return []
+        return sorted(
+            entry for entry in os.listdir(model_dir)
+            if os.path.isfile(os.path.join(model_dir, entry, MANIFEST_FILE))
+        )
+    
+    def get_manifest(self, name: str, version: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        version = version or self.current_version(name)
+        if version is None:
+            return None
+        try:
+            with open(os.path.join(self.root, name, version, MANIFEST_FILE)) as handle:
+                return json.load(handle)
+        except FileNotFoundError:
+            return None
+    
+    def load(
+        self,
+        name: str,
+        version: Optional[str] = None,
+        mmap: bool = True,
+        verify: bool = True,
+        artifacts: Optional[Iterable[str]] = None
+    ) -> Tuple[str, Dict[str, Any], Dict[str, Any]]:
+        """Load (version, artifacts, manifest), the current version by default.
+        
+        `artifacts` limits loading to those artifact and array group names;
+        names the version does not have are skipped. Array groups come
+        back as dicts of arrays. Raises FileNotFoundError when nothing is
+        published and ValueError when a file does not match its manifest
+        checksum.
+        """
+        manifest = self.get_manifest(name, version)
+        if manifest is None:
+            raise FileNotFoundError(f"No published {name} model version {version or ''}".strip())
+            
+        wanted = None if artifacts is None else set(artifacts)
+        version_dir = os.path.join(self.root, name, manifest["version"])
+        mmap_mode = "r" if mmap else None
+        
+        def read(label: str, entry: Dict[str, Any]) -> str:
+            path = os.path.join(version_dir, entry["file"])
+            if verify and _sha256(path) != entry["sha256"]:
+                raise ValueError(f"Checksum mismatch for {name} {manifest['version']} artifact {label}")
+            return path
+            
+        loaded: Dict[str, Any] = {}
+        for artifact, entry in manifest["artifacts"].items():
+            if wanted is None or artifact in wanted:
+                loaded[artifact] = joblib.load(read(artifact, entry), mmap_mode=mmap_mode)
+        for group, entries in manifest.get("arrays", {}).items():
+            if wanted is None or group in wanted:
+                loaded[group] = {
+                    key: np.load(read(f"{group}/{key}", entry), mmap_mode=mmap_mode, allow_pickle=False)
+                    for key, entry in entries.items()
+                }
+        return manifest["version"], loaded, manifest
+    
+    def prune(self, name: str) -> List[str]:
+        """Delete all but the newest `keep_versions` versions; the current one is always kept.
+        
+        Workers still mapping a deleted version keep their mapping until
+        they switch (unlinked files stay readable on POSIX).
+        """
+        current = self.current_version(name)
+        versions = self.list_versions(name)
+        removed = []
+        for version in versions[:max(0, len(versions) - self.keep_versions)]:
+            if version == current:
+                continue
+            shutil.rmtree(os.path.join(self.root, name, version), ignore_errors=True)
+            removed.append(version)
+        return removed
+
+
+class VersionWatch:
+    """Throttled check for a newly published version of one model"""
+    
+    def __init__(self, registry: ModelRegistry, name: str, interval: float = 30.0):
+        self.registry = registry
+        self.name = name
+        self.interval = interval
+        self.next_check = 0.0
+    
+    def newer_than(self, loaded_version: Optional[str]) -> Optional[str]:
+        """The current version if it differs from `loaded_version`, checked at most every `interval` seconds"""
+        now = time.monotonic()
+        if now < self.next_check:
+            return None
+        self.next_check = now + self.interval
+        current = self.registry.current_version(self.name)
+        return current if current and current != loaded_version else None
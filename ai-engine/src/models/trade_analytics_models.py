@@ -1,7 +1,7 @@
 import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, Iterator, List, Any, Optional, Tuple
 import logging
 import asyncio
 from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
@@ -9,9 +9,36 @@ from sklearn.preprocessing import StandardScaler, LabelEncoder
 from sklearn.cluster import KMeans
 import joblib
 import os
+import time
+import sklearn
 from dataclasses import dataclass, asdict
 from enum import Enum
 
+from .categorical import LEGACY_UNKNOWN_CATEGORY, CategoryTable
+from .prediction_memo import PredictionMemo
+from .registry import ModelRegistry, VersionWatch
+from .training import run_training
+from .tree_engine import TreeEnsemble, export_tree_ensemble
+
+ARBITRAGE_MODEL_NAME = "comprehensive_arbitrage"
+ENSEMBLE_NAMES = ("price_model", "demand_model", "risk_model")
+# Registry array groups holding each flattened ensemble
+TREE_ARRAYS = {name: f"{name}_tree" for name in ENSEMBLE_NAMES}
+# What a serving worker loads; the sklearn estimators are only read for large batches.
+# compiled_models is the joblib artifact versions published before TREE_ARRAYS used.
+SERVING_ARTIFACTS = ("scaler", "label_encoders", "unknown_codes", "compiled_models", *TREE_ARRAYS.values())
+
+# Share of training rows whose categorical columns are set to the unknown code
+UNKNOWN_TRAINING_FRACTION = 0.02
+
+# Placeholder base price, seasonal factor, market volatility and trade
+# relationship; prediction feature columns 4-7 in training order
+PREDICTION_FEATURE_DEFAULTS = [2500, 1.0, 0.3, 0.8]
+
+# Categories the synthetic training data is drawn from
+TRAINING_COUNTRIES = ["IN", "US", "DE", "CN", "JP", "UK", "CA", "AU", "BR", "MX"]
+TRAINING_PRODUCT_CATEGORIES = ["spices", "textiles", "electronics", "machinery", "chemicals"]
+
 class RiskLevel(Enum):
     LOW = "low"
     MEDIUM = "medium"
@@ -125,14 +152,29 @@ class ComprehensiveArbitrageModel:
     """Advanced arbitrage prediction model with comprehensive analytics"""
     
     def __init__(self):
-        self.price_model = None
-        self.demand_model = None
-        self.risk_model = None
+        # sklearn ensembles by name, for batches above compiled_max_rows; loaded in the background on first need
+        self.estimators: Dict[str, Any] = {}
+        self.estimator_task: Optional[asyncio.Task] = None
+        self.compiled_models: Dict[str, TreeEnsemble] = {}
+        # Up to this many rows the array engine beats sklearn's per-tree overhead
+        self.compiled_max_rows = 256
+        # Lanes with the same encoded route and quantity bucket are scored once per model version
+        self.prediction_memo = PredictionMemo()
         self.route_optimizer = None
         self.scaler = StandardScaler()
         self.label_encoders = {}
+        self.category_tables: Dict[str, CategoryTable] = {}
+        self.feature_buffer = np.empty((0, 8))
         self.model_path = "models/comprehensive_arbitrage_model.pkl"
         self.is_trained = False
+        self.training_samples = 2000
+        self.training_chunk_size = 1_000_000  # rows generated per chunk
+        self.training_task: Optional[asyncio.Task] = None
+        
+        # Versioned artifacts shared by all workers; model_path is a read-only legacy fallback
+        self.registry = ModelRegistry()
+        self.model_version: Optional[str] = None
+        self.version_watch = VersionWatch(self.registry, ARBITRAGE_MODEL_NAME)
         
         # Reference data
         self.countries_data = {}
@@ -145,74 +187,170 @@ class ComprehensiveArbitrageModel:
     async def load_models(self):
         """Load all trained models"""
         try:
-            if os.path.exists(self.model_path):
-                model_data = joblib.load(self.model_path)
-                self.price_model = model_data['price_model']
-                self.demand_model = model_data['demand_model']
-                self.risk_model = model_data['risk_model']
-                self.scaler = model_data['scaler']
-                self.label_encoders = model_data['label_encoders']
-                self.is_trained = True
+            if self.registry.current_version(ARBITRAGE_MODEL_NAME):
+                await self._load_version()
+            elif os.path.exists(self.model_path):
+                self._swap_models(joblib.load(self.model_path), "legacy")
                 logging.info("Loaded comprehensive arbitrage models")
             else:
-                await self.train_models()
+                # Analyses wait for this run; the rest of the API keeps serving
+                await self.train_models(wait=False)
         except Exception as e:
             logging.error(f"Error loading models: {str(e)}")
-            await self.train_models()
+            await self.train_models(wait=False)
     
-    async def train_models(self):
-        """Train all prediction models"""
+    async def train_models(self, wait: bool = True):
+        """Train all prediction models in a worker process and swap them in.
+        
+        The current models keep serving until the new ones are ready, and
+        calls made while a run is in flight share that run.
+        """
+        if self.training_task is None or self.training_task.done():
+            self.training_task = asyncio.create_task(self._train_in_background())
+        if wait:
+            await asyncio.shield(self.training_task)
+    
+    async def _train_in_background(self):
         try:
-            # Generate synthetic training data
-            training_data = self._generate_training_data()
-            
-            # Prepare features
-            X = self._prepare_features(training_data)
-            
-            # Train price prediction model
-            price_targets = training_data['market_prices']
-            self.price_model = GradientBoostingRegressor(
-                n_estimators=200,
-                max_depth=8,
-                random_state=42
+            # The worker publishes to the registry; only the version string comes back
+            version = await run_training(
+                _fit_arbitrage_models, self.registry.root, self.training_samples
             )
-            self.price_model.fit(X, price_targets)
-            
-            # Train demand prediction model
-            demand_targets = training_data['demand_scores']
-            self.demand_model = RandomForestRegressor(
-                n_estimators=150,
-                max_depth=10,
-                random_state=42
-            )
-            self.demand_model.fit(X, demand_targets)
-            
-            # Train risk assessment model
-            risk_targets = training_data['risk_scores']
-            self.risk_model = RandomForestRegressor(
-                n_estimators=100,
-                max_depth=6,
-                random_state=42
-            )
-            self.risk_model.fit(X, risk_targets)
-            
-            # Save models
-            os.makedirs("models", exist_ok=True)
-            model_data = {
-                'price_model': self.price_model,
-                'demand_model': self.demand_model,
-                'risk_model': self.risk_model,
-                'scaler': self.scaler,
-                'label_encoders': self.label_encoders
-            }
-            joblib.dump(model_data, self.model_path)
-            
-            self.is_trained = True
+            await self._load_version(version)
             logging.info("Trained comprehensive arbitrage models")
             
         except Exception as e:
             logging.error(f"Error training models: {str(e)}")
-            self.is_trained = False
+            self.is_trained = bool(self.compiled_models)
+    
+    async def _load_version(self, version: Optional[str] = None):
+        version, model_data, _ = await asyncio.to_thread(
+            self.registry.load, ARBITRAGE_MODEL_NAME, version, artifacts=SERVING_ARTIFACTS
+        )
+        if 'compiled_models' not in model_data and not all(group in model_data for group in TREE_ARRAYS.values()):
+            # Published before the array export: flatten the estimators once, then let them go
+            _, estimators, _ = await asyncio.to_thread(
+                self.registry.load, ARBITRAGE_MODEL_NAME, version, artifacts=ENSEMBLE_NAMES
+            )
+            model_data.update(
+                {TREE_ARRAYS[name]: export_tree_ensemble(estimator) for name, estimator in estimators.items()}
+            )
+        self._swap_models(model_data, version)
+        logging.info(f"Loaded comprehensive arbitrage models version {version}")
+    
+    async def refresh_models(self):
+        """Switch to a version another worker published, checked at most every 30s"""
+        version = self.version_watch.newer_than(self.model_version)
+        if version:
+            try:
+                await self._load_version(version)
+            except Exception as e:
+                logging.error(f"Error loading arbitrage models version {version}: {str(e)}")
+    
+    def _swap_models(self, model_data: Dict[str, Any], version: Optional[str] = None):
+        compiled = {}
+        for name in ENSEMBLE_NAMES:
+            if TREE_ARRAYS[name] in model_data:
+                compiled[name] = model_data[TREE_ARRAYS[name]]
+            elif 'compiled_models' in model_data:
+                compiled[name] = model_data['compiled_models'][name]
+            else:
+                # Legacy pickle: flattened on load
+                compiled[name] = export_tree_ensemble(model_data[name])
+                
+        # One synchronous step: a request never mixes estimators, scaler and encoders of two runs.
+        # Estimators are kept only from the legacy pickle, which the registry cannot reload.
+        (
+            self.estimators,
+            self.compiled_models,
+            self.scaler,
+            self.label_encoders,
+            self.category_tables,
+            self.model_version
+        ) = (
+            {name: model_data[name] for name in ENSEMBLE_NAMES if name in model_data},
+            {name: TreeEnsemble(arrays) for name, arrays in compiled.items()},
+            model_data['scaler'],
+            model_data['label_encoders'],
+            {
+                # Versions trained before the unknown code was reserved used 0
+                name: CategoryTable.from_encoder(
+                    encoder, model_data.get('unknown_codes', {}).get(name, LEGACY_UNKNOWN_CATEGORY)
+                )
+                for name, encoder in model_data['label_encoders'].items()
+            },
+            version
+        )
+        self.prediction_memo.reset(version, self.scaler.scale_)
+        self.is_trained = True
+    
+    def fit(self) -> str:
+        """Fit all models and publish them to the registry; runs in a training worker"""
+        started = time.perf_counter()
+        
+        # Generate synthetic training data
+        training_data = self._generate_training_data()
+        
+        # Prepare features
+        X = self._prepare_features(training_data)
+        
+        # Train price prediction model
+        price_targets = training_data['market_prices']
+        price_model = GradientBoostingRegressor(
+            n_estimators=200,
+            max_depth=8,
+            random_state=42
+        )
+        price_model.fit(X, price_targets)
+        
+        # Train demand prediction model
+        demand_targets = training_data['demand_scores']
+        demand_model = RandomForestRegressor(
+            n_estimators=150,
+            max_depth=10,
+            random_state=42
+        )
+        demand_model.fit(X, demand_targets)
+        
+        # Train risk assessment model
+        risk_targets = training_data['risk_scores']
+        risk_model = RandomForestRegressor(
+            n_estimators=100,
+            max_depth=6,
+            random_state=42
+        )
+        risk_model.fit(X, risk_targets)
+        self.estimators = {'price_model': price_model, 'demand_model': demand_model, 'risk_model': risk_model}
+        
+        # Flatten the ensembles for serving and check them against sklearn
+        tree_arrays = {}
+        for name, model in self.estimators.items():
+            tree_arrays[TREE_ARRAYS[name]] = export_tree_ensemble(model)
+            sample = X[:1000]
+            if not np.allclose(TreeEnsemble(tree_arrays[TREE_ARRAYS[name]]).predict(sample), model.predict(sample)):
+                raise ValueError(f"Exported {name} does not match its sklearn predictions")
+        
+        # Publish models; workers map the tree arrays and read the estimators only for large batches
+        model_data = {
+            **self.estimators,
+            'scaler': self.scaler,
+            'label_encoders': self.label_encoders,
+            'unknown_codes': {
+                name: CategoryTable.from_encoder(encoder).unknown_code
+                for name, encoder in self.label_encoders.items()
+            }
+        }
+        return self.registry.publish(ARBITRAGE_MODEL_NAME, model_data, {
+            "trained_at": datetime.utcnow().isoformat(),
+            "training_seconds": round(time.perf_counter() - started, 3),
+            "n_samples": len(price_targets),
+            "estimators": {
+                name: {"type": type(model).__name__, "params": model.get_params()}
+                for name, model in self.estimators.items()
+            },
+            "sklearn_version": sklearn.__version__,
+            "numpy_version": np.__version__
+        }, arrays=tree_arrays)
     
     async def analyze_arbitrage_opportunity(
         self, 
@@ -224,6 +362,7 @@ class ComprehensiveArbitrageModel:
     ) -> Dict[str, Any]:
         """Comprehensive arbitrage analysis"""
         try:
+            await self.refresh_models()
             if not self.is_trained:
                 await self.train_models()
             
@@ -284,111 +423,301 @@ class ComprehensiveArbitrageModel:
     ) -> Dict[str, Any]:
         """Analyze the specific product opportunity"""
         try:
-            # Predict market price
-            features = self._create_prediction_features(
-                product_id, source_country, target_country, quantity
+            scores = self._score_lanes(
+                [product_id], [current_price], [source_country], [target_country],
+                np.zeros((1, 3), dtype=int), quantity
             )
-            predicted_price = self.price_model.predict([features])[0]
-            predicted_demand = self.demand_model.predict([features])[0]
-            predicted_risk = self.risk_model.predict([features])[0]
+            return self._lane_summary(scores, 0)
             
-            # Calculate profit potential
-            transport_cost = self._estimate_transport_cost(
-                source_country, target_country, quantity
-            )
-            duty_cost = predicted_price * self._get_duty_rate(target_country, product_id)
-            documentation_cost = self._estimate_documentation_cost(
-                source_country, target_country
-            )
+        except Exception as e:
+            logging.error(f"Error analyzing product opportunity: {str(e)}")
+            return {"error": str(e)}
+    
+    async def score_opportunity_grid(
+        self,
+        products: Dict[str, float],
+        source_countries: List[str],
+        target_countries: List[str],
+        quantity: int,
+        top_k: int = 10
+    ) -> Dict[str, Any]:
+        """Score every product x source x target lane with one call per model.
+        
+        `products` maps product_id to its current source price. Lanes whose
+        source and target are the same country are skipped. Returns the
+        `top_k` lanes by opportunity score, each in the shape
+        `_analyze_product_opportunity` returns.
+        """
+        try:
+            await self.refresh_models()
+            if not self.is_trained:
+                await self.train_models()
+            
+            product_ids = list(products)
+            pairs = [
+                (source_index, target_index)
+                for source_index, source in enumerate(source_countries)
+                for target_index, target in enumerate(target_countries)
+                if source != target
+            ]
+            lanes = np.array([
+                (product_index, source_index, target_index)
+                for product_index in range(len(product_ids))
+                for source_index, target_index in pairs
+            ], dtype=int).reshape(-1, 3)
+            
+            if len(lanes) > self.compiled_max_rows:
+                self._load_estimators_in_background()
             
-            total_cost = current_price + transport_cost + duty_cost + documentation_cost
-            net_profit = (predicted_price * quantity) - (total_cost * quantity)
-            profit_margin = net_profit / (total_cost * quantity) if total_cost > 0 else 0
+            opportunities = []
+            if len(lanes):
+                scores = self._score_lanes(
+                    product_ids, [products[product_id] for product_id in product_ids],
+                    source_countries, target_countries, lanes, quantity
+                )
+                
+                # Partial sort: only the top K lanes are ordered
+                ranking = scores["opportunity_score"]
+                top = np.argpartition(-ranking, min(top_k, len(ranking)) - 1)[:top_k] if top_k > 0 else []
+                for lane in sorted(top, key=lambda index: -ranking[index]):
+                    product_index, source_index, target_index = lanes[lane]
+                    opportunities.append({
+                        "opportunity_id": (
+                            f"{product_ids[product_index]}_{source_countries[source_index]}_"
+                            f"{target_countries[target_index]}"
+                        ),
+                        "product_id": product_ids[product_index],
+                        "source_country": source_countries[source_index],
+                        "target_country": target_countries[target_index],
+                        **self._lane_summary(scores, lane)
+                    })
             
             return {
-                "predicted_market_price": round(predicted_price, 2),
-                "current_source_price": current_price,
-                "predicted_demand_score": round(predicted_demand, 3),
-                "risk_score": round(predicted_risk, 3),
-                "cost_breakdown": {
-                    "source_price": current_price,
-                    "transport_cost": round(transport_cost, 2),
-                    "duty_cost": round(duty_cost, 2),
-                    "documentation_cost": round(documentation_cost, 2),
-                    "total_cost_per_unit": round(total_cost, 2)
-                },
-                "profit_analysis": {
-                    "total_revenue": round(predicted_price * quantity, 2),
-                    "total_cost": round(total_cost * quantity, 2),
-                    "net_profit": round(net_profit, 2),
-                    "profit_margin": round(profit_margin, 3),
-                    "roi": round(net_profit / (current_price * quantity), 3) if current_price > 0 else 0
-                },
-                "opportunity_score": round(
-                    (profit_margin * 0.4) + (predicted_demand * 0.3) + ((1-predicted_risk) * 0.3), 3
-                ),
-                "confidence_level": self._calculate_confidence(profit_margin, predicted_demand, predicted_risk)
+                "lanes_scored": len(lanes),
+                "quantity": quantity,
+                "opportunities": opportunities,
+                "generated_at": datetime.utcnow().isoformat()
             }
             
         except Exception as e:
-            logging.error(f"Error analyzing product opportunity: {str(e)}")
+            logging.error(f"Error scoring opportunity grid: {str(e)}")
             return {"error": str(e)}
     
-    def _generate_training_data(self) -> Dict[str, Any]:
+    def _score_lanes(
+        self,
+        product_ids: List[str],
+        current_prices: List[float],
+        source_countries: List[str],
+        target_countries: List[str],
+        lanes: np.ndarray,
+        quantity: int
+    ) -> Dict[str, np.ndarray]:
+        """Predict and cost lanes given as (product, source, target) index rows"""
+        product_index, source_index, target_index = lanes[:, 0], lanes[:, 1], lanes[:, 2]
+        
+        # One feature matrix; the memo transforms and predicts only the rows it has not seen
+        features = self._feature_rows(len(lanes))
+        features[:, 0] = self._encode_labels('source_countries', source_countries)[source_index]
+        features[:, 1] = self._encode_labels('target_countries', target_countries)[target_index]
+        features[:, 2] = self._encode_label('product_categories', 'spices')
+        features[:, 3] = quantity
+        predicted_price, predicted_demand, predicted_risk = self.prediction_memo.predict(
+            features, self._predict_scores
+        ).T
+        
+        # Lane costs are looked up from per-pair tables rather than computed per lane
+        transport_costs = np.array([
+            [self._estimate_transport_cost(source, target, quantity) for target in target_countries]
+            for source in source_countries
+        ])
+        documentation_costs = np.array([
+            [self._estimate_documentation_cost(source, target) for target in target_countries]
+            for source in source_countries
+        ])
+        duty_rates = np.array([
+            [self._get_duty_rate(target, product_id) for target in target_countries]
+            for product_id in product_ids
+        ])
+        
+        source_price = np.asarray(current_prices, dtype=float)[product_index]
+        transport_cost = transport_costs[source_index, target_index]
+        duty_cost = predicted_price * duty_rates[product_index, target_index]
+        documentation_cost = documentation_costs[source_index, target_index]
+        
+        total_cost = source_price + transport_cost + duty_cost + documentation_cost
+        total_revenue = predicted_price * quantity
+        order_cost = total_cost * quantity
+        net_profit = total_revenue - order_cost
+        with np.errstate(divide="ignore", invalid="ignore"):
+            profit_margin = np.where(total_cost > 0, net_profit / order_cost, 0.0)
+            roi = np.where(source_price > 0, net_profit / (source_price * quantity), 0.0)
+        opportunity_score = (profit_margin * 0.4) + (predicted_demand * 0.3) + ((1 - predicted_risk) * 0.3)
+        
+        return {
+            "predicted_price": predicted_price,
+            "predicted_demand": predicted_demand,
+            "predicted_risk": predicted_risk,
+            "source_price": source_price,
+            "transport_cost": transport_cost,
+            "duty_cost": duty_cost,
+            "documentation_cost": documentation_cost,
+            "total_cost": total_cost,
+            "total_revenue": total_revenue,
+            "order_cost": order_cost,
+            "net_profit": net_profit,
+            "profit_margin": profit_margin,
+            "roi": roi,
+            "opportunity_score": opportunity_score,
+            "confidence_level": np.clip(opportunity_score, 0.1, 0.95)
+        }
+    
+    def _predict_scores(self, features: np.ndarray) -> np.ndarray:
+        """Price, demand and risk columns for unscaled feature rows"""
+        features = self.scaler.transform(features)
+        return np.column_stack([self._predict_ensemble(name, features) for name in ENSEMBLE_NAMES])
+    
+    def _predict_ensemble(self, name: str, features: np.ndarray) -> np.ndarray:
+        """Predict with the array engine for small batches, sklearn for large ones once it is loaded"""
+        estimator = self.estimators.get(name)
+        if estimator is None or len(features) <= self.compiled_max_rows:
+            return self.compiled_models[name].predict(features)
+        return estimator.predict(features)
+    
+    def _load_estimators_in_background(self):
+        """Start reading the sklearn ensembles off the event loop; until then the array engine serves"""
+        missing = [name for name in ENSEMBLE_NAMES if name not in self.estimators]
+        if missing and (self.estimator_task is None or self.estimator_task.done()):
+            self.estimator_task = asyncio.create_task(self._load_estimators(self.model_version, missing))
+    
+    async def _load_estimators(self, version: Optional[str], names: List[str]):
+        try:
+            _, artifacts, _ = await asyncio.to_thread(
+                self.registry.load, ARBITRAGE_MODEL_NAME, version, artifacts=names
+            )
+            # A newer version may have been swapped in while these were read
+            if version == self.model_version:
+                self.estimators = {**self.estimators, **artifacts}
+        except Exception as e:
+            logging.error(f"Error loading arbitrage estimators {version}: {str(e)}")
+    
+    @staticmethod
+    def _lane_summary(scores: Dict[str, np.ndarray], lane: int) -> Dict[str, Any]:
+        """Opportunity breakdown for one scored lane"""
+        value = {name: float(values[lane]) for name, values in scores.items()}
+        return {
+            "predicted_market_price": round(value["predicted_price"], 2),
+            "current_source_price": value["source_price"],
+            "predicted_demand_score": round(value["predicted_demand"], 3),
+            "risk_score": round(value["predicted_risk"], 3),
+            "cost_breakdown": {
+                "source_price": value["source_price"],
+                "transport_cost": round(value["transport_cost"], 2),
+                "duty_cost": round(value["duty_cost"], 2),
+                "documentation_cost": round(value["documentation_cost"], 2),
+                "total_cost_per_unit": round(value["total_cost"], 2)
+            },
+            "profit_analysis": {
+                "total_revenue": round(value["total_revenue"], 2),
+                "total_cost": round(value["order_cost"], 2),
+                "net_profit": round(value["net_profit"], 2),
+                "profit_margin": round(value["profit_margin"], 3),
+                "roi": round(value["roi"], 3)
+            },
+            "opportunity_score": round(value["opportunity_score"], 3),
+            "confidence_level": value["confidence_level"]
+        }
+    
+    def _encode_labels(self, encoder_name: str, values: List[str]) -> np.ndarray:
+        """Encode categorical values, mapping labels unseen in training to the table's unknown code"""
+        table = self.category_tables.get(encoder_name)
+        if table is None:
+            return np.full(len(values), LEGACY_UNKNOWN_CATEGORY)
+        return table.encode_many(values)
+    
+    def _encode_label(self, encoder_name: str, value: str) -> int:
+        table = self.category_tables.get(encoder_name)
+        return table.encode(value) if table is not None else LEGACY_UNKNOWN_CATEGORY
+    
+    def _feature_rows(self, n_rows: int) -> np.ndarray:
+        """First `n_rows` rows of the reusable prediction feature buffer.
+        
+        The placeholder columns are filled when the buffer grows, so callers
+        only write the categorical and quantity columns. The next call
+        overwrites the rows; copy them to keep them.
+        """
+        if len(self.feature_buffer) < n_rows:
+            self.feature_buffer = np.empty((max(n_rows, 2 * len(self.feature_buffer)), 8))
+            self.feature_buffer[:, 4:] = PREDICTION_FEATURE_DEFAULTS
+        return self.feature_buffer[:n_rows]
+    
+    def _generate_training_data(
+        self, n_samples: Optional[int] = None, seed: int = 42
+    ) -> Dict[str, Any]:
         """Generate comprehensive training data"""
-        np.random.seed(42)
-        n_samples = 2000
+        n_samples = self.training_samples if n_samples is None else n_samples
+        chunks = list(self.iter_training_data(n_samples, seed))
+        if len(chunks) == 1:
+            return chunks[0]
+        return {key: np.concatenate([chunk[key] for chunk in chunks]) for key in chunks[0]}
+    
+    def iter_training_data(
+        self, n_samples: int, seed: int = 42, chunk_size: Optional[int] = None
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield synthetic training data in chunks of at most `chunk_size` rows.
         
+        Every chunk is drawn from one generator seeded with `seed`, so the
+        rows are reproducible for a given seed and chunk size. Each chunk
+        is built with whole-array operations and holds only its own
+        temporaries, so millions of rows can be streamed.
+        """
+        rng = np.random.default_rng(seed)
+        chunk_size = chunk_size or self.training_chunk_size
+        for start in range(0, max(n_samples, 1), chunk_size):
+            yield self._generate_training_chunk(rng, min(chunk_size, n_samples - start))
+    
+    def _generate_training_chunk(self, rng: np.random.Generator, n_samples: int) -> Dict[str, Any]:
         # Create feature combinations
-        countries = ["IN", "US", "DE", "CN", "JP", "UK", "CA", "AU", "BR", "MX"]
-        products = ["spices", "textiles", "electronics", "machinery", "chemicals"]
+        countries = np.array(TRAINING_COUNTRIES)
+        products = np.array(TRAINING_PRODUCT_CATEGORIES)
         
         data = {
-            'source_countries': np.random.choice(countries, n_samples),
-            'target_countries': np.random.choice(countries, n_samples),
-            'product_categories': np.random.choice(products, n_samples),
-            'quantities': np.random.randint(100, 10000, n_samples),
-            'source_prices': np.random.uniform(10, 1000, n_samples),
-            'seasonal_factors': np.random.uniform(0.8, 1.3, n_samples),
-            'market_volatility': np.random.uniform(0.1, 0.6, n_samples),
-            'trade_relationship': np.random.uniform(0.3, 1.0, n_samples)
+            'source_countries': countries[rng.integers(0, len(countries), n_samples)],
+            'target_countries': countries[rng.integers(0, len(countries), n_samples)],
+            'product_categories': products[rng.integers(0, len(products), n_samples)],
+            'quantities': rng.integers(100, 10000, n_samples),
+            'source_prices': rng.uniform(10, 1000, n_samples),
+            'seasonal_factors': rng.uniform(0.8, 1.3, n_samples),
+            'market_volatility': rng.uniform(0.1, 0.6, n_samples),
+            'trade_relationship': rng.uniform(0.3, 1.0, n_samples)
         }
+        source_prices = data['source_prices']
+        trade_relationship = data['trade_relationship']
+        market_volatility = data['market_volatility']
         
-        # Generate target variables with realistic relationships
-        market_prices = []
-        demand_scores = []
-        risk_scores = []
+        # Market price influenced by source price, trade relationship, volatility
+        base_multiplier = 1.5 + (0.5 * trade_relationship)
+        volatility_factor = 1 + (market_volatility * 0.3)
+        market_prices = source_prices * base_multiplier * volatility_factor * data['seasonal_factors']
         
-        for i in range(n_samples):
-            # Market price influenced by source price, trade relationship, volatility
-            base_multiplier = 1.5 + (0.5 * data['trade_relationship'][i])
-            volatility_factor = 1 + (data['market_volatility'][i] * 0.3)
-            seasonal_factor = data['seasonal_factors'][i]
-            
-            market_price = (data['source_prices'][i] * base_multiplier * 
-                          volatility_factor * seasonal_factor)
-            market_prices.append(market_price)
-            
-            # Demand score influenced by price difference and market factors
-            price_attractiveness = min(1.0, (market_price - data['source_prices'][i]) / data['source_prices'][i])
-            demand_score = min(1.0, price_attractiveness * data['trade_relationship'][i] * 
-                             np.random.uniform(0.7, 1.0))
-            demand_scores.append(demand_score)
-            
-            # Risk score influenced by countries, volatility, and trade relationship
-            base_risk = 0.3
-            volatility_risk = data['market_volatility'][i] * 0.4
-            relationship_risk = (1 - data['trade_relationship'][i]) * 0.3
-            risk_score = min(1.0, base_risk + volatility_risk + relationship_risk)
-            risk_scores.append(risk_score)
+        # Demand score influenced by price difference and market factors
+        price_attractiveness = np.minimum(1.0, (market_prices - source_prices) / source_prices)
+        demand_scores = np.minimum(
+            1.0, price_attractiveness * trade_relationship * rng.uniform(0.7, 1.0, n_samples)
+        )
+        
+        # Risk score influenced by countries, volatility, and trade relationship
+        base_risk = 0.3
+        volatility_risk = market_volatility * 0.4
+        relationship_risk = (1 - trade_relationship) * 0.3
+        risk_scores = np.minimum(1.0, base_risk + volatility_risk + relationship_risk)
         
-        data['market_prices'] = np.array(market_prices)
-        data['demand_scores'] = np.array(demand_scores)
-        data['risk_scores'] = np.array(risk_scores)
+        data['market_prices'] = market_prices
+        data['demand_scores'] = demand_scores
+        data['risk_scores'] = risk_scores
         
         return data
     
-    def _prepare_features(self, training_data: Dict[str, Any]) -> np.ndarray:
+    def _prepare_features(self, training_data: Dict[str, Any], seed: int = 42) -> np.ndarray:
         """Prepare features for model training"""
         # Encode categorical variables
         if 'source_countries' not in self.label_encoders:
@@ -406,6 +735,17 @@ class ComprehensiveArbitrageModel:
             training_data['product_categories']
         )
         
+        # Give the trees a branch for labels unseen in training: a few rows per
+        # column get the reserved unknown code, one past the last class
+        rng = np.random.default_rng(seed)
+        for name, encoded in (
+            ('source_countries', source_encoded),
+            ('target_countries', target_encoded),
+            ('product_categories', product_encoded)
+        ):
+            unknown_rows = rng.random(len(encoded)) < UNKNOWN_TRAINING_FRACTION
+            encoded[unknown_rows] = len(self.label_encoders[name].classes_)
+        
         # Combine features
         features = np.column_stack([
             source_encoded,
@@ -423,46 +763,6 @@ class ComprehensiveArbitrageModel:
         
         return features
     
-    def _create_prediction_features(
-        self, product_id: str, source_country: str, target_country: str, quantity: int
-    ) -> np.ndarray:
-        """Create features for prediction"""
-        # Simplified feature creation for prediction
-        # In production, these would come from real data
-        
-        # Encode categorical features
-        try:
-            source_encoded = self.label_encoders['source_countries'].transform([source_country])[0]
-        except:
-            source_encoded = 0
-            
-        try:
-            target_encoded = self.label_encoders['target_countries'].transform([target_country])[0]
-        except:
-            target_encoded = 0
-            
-        try:
-            product_encoded = self.label_encoders['product_categories'].transform(['spices'])[0]
-        except:
-            product_encoded = 0
-        
-        # Create feature vector
-        features = np.array([
-            source_encoded,
-            target_encoded,
-            product_encoded,
-            quantity,
-            2500,  # base price
-            1.0,   # seasonal factor
-            0.3,   # market volatility
-            0.8    # trade relationship
-        ])
-        
-        # Scale features
-        features = self.scaler.transform([features])[0]
-        
-        return features
-    
     def _estimate_transport_cost(self, source: str, target: str, quantity: int) -> float:
         """Estimate transportation cost"""
         base_costs = {
@@ -487,9 +787,11 @@ class ComprehensiveArbitrageModel:
     def _estimate_documentation_cost(self, source: str, target: str) -> float:
         """Estimate documentation and handling costs"""
         return 500  # Base documentation cost
-    
-    def _calculate_confidence(self, profit_margin: float, demand: float, risk: float) -> float:
-        """Calculate confidence level for the opportunity"""
-        # Higher profit margin and demand, lower risk = higher confidence
-        confidence = (profit_margin * 0.4) + (demand * 0.3) + ((1-risk) * 0.3)
-        return min(0.95, max(0.1, confidence))
\ No newline at end of file
+
+
+def _fit_arbitrage_models(registry_root: str, training_samples: int) -> str:
+    """Training-pool entry point: fit fresh models, publish them and return the version"""
+    model = ComprehensiveArbitrageModel()
+    model.registry = ModelRegistry(registry_root)
+    model.training_samples = training_samples
+    return model.fit()
@@ -0,0 +1,42 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+# Shared by every model so concurrent retrains queue instead of oversubscribing the CPU
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def get_training_executor() -> ProcessPoolExecutor:
+    """Process pool that model fits run in; TRAINING_WORKERS sets its size"""
+    global _executor
+    if _executor is None:
+        # spawn: forking a process with a running event loop and driver threads is unsafe
+        _executor = ProcessPoolExecutor(
+            max_workers=int(os.getenv("TRAINING_WORKERS", "1")),
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _executor
+
+
+def shutdown_training_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def run_training(fit: Callable[..., Any], *args: Any) -> Any:
+    """Run a module-level fit function in the training pool without blocking the loop"""
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(get_training_executor(), fit, *args)
+    except BrokenProcessPool:
+        # A worker died (e.g. OOM-killed); start a fresh pool for the next retrain
+        logging.error("Training worker died; recreating the training pool")
+        shutdown_training_executor()
+        raise
+
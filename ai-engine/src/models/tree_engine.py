@@ -0,0 +1,109 @@
+from typing import Any, Dict
+
+import numpy as np
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
+
+# sklearn marks leaves with -1 children
+_TREE_LEAF = -1
+
+
+def export_tree_ensemble(model: Any) -> Dict[str, Any]:
+    """Flatten a fitted RandomForestRegressor or GradientBoostingRegressor into arrays.
+
+    All trees share one node table. Node ids are global, `roots` holds
+    each tree's first node, and leaves point to themselves so every
+    tree can be stepped `max_depth` times without a per-tree stop test.
+    """
+    if isinstance(model, RandomForestRegressor):
+        trees = [estimator.tree_ for estimator in model.estimators_]
+        # Forest prediction is the mean of its trees
+        scale, init = 1.0 / len(trees), 0.0
+    elif isinstance(model, GradientBoostingRegressor):
+        trees = [estimator.tree_ for estimator in model.estimators_[:, 0]]
+        scale = model.learning_rate
+        init = float(model._raw_predict_init(np.zeros((1, model.n_features_in_), dtype=np.float32))[0, 0])
+    else:
+        raise TypeError(f"Cannot export {type(model).__name__}")
+
+    n_nodes = sum(tree.node_count for tree in trees)
+    feature = np.zeros(n_nodes, dtype=np.int32)
+    threshold = np.full(n_nodes, np.inf)
+    left = np.empty(n_nodes, dtype=np.int32)
+    right = np.empty(n_nodes, dtype=np.int32)
+    value = np.empty(n_nodes, dtype=np.float64)
+    roots = np.empty(len(trees), dtype=np.int32)
+
+    offset = 0
+    for index, tree in enumerate(trees):
+        nodes = slice(offset, offset + tree.node_count)
+        local_ids = np.arange(offset, offset + tree.node_count, dtype=np.int32)
+        is_leaf = tree.children_left == _TREE_LEAF
+
+        feature[nodes] = np.where(is_leaf, 0, tree.feature)
+        threshold[nodes] = np.where(is_leaf, np.inf, tree.threshold)
+        left[nodes] = np.where(is_leaf, local_ids, tree.children_left + offset)
+        right[nodes] = np.where(is_leaf, local_ids, tree.children_right + offset)
+        value[nodes] = tree.value[:, 0, 0]
+        roots[index] = offset
+        offset += tree.node_count
+
+    return {
+        "feature": feature,
+        "threshold": threshold,
+        "left": left,
+        "right": right,
+        "value": value,
+        "roots": roots,
+        "max_depth": max(tree.max_depth for tree in trees),
+        "n_features": model.n_features_in_,
+        "scale": scale,
+        "init": init
+    }
+
+
+class TreeEnsemble:
+    """Vectorized inference over an exported tree ensemble.
+
+    Every (row, tree) pair advances one level per step, so a prediction
+    is `max_depth` numpy gathers instead of a Python call per tree. The
+    arrays may be read-only memory maps shared between processes. Rows
+    are compared in float32 like sklearn, so splits land identically;
+    sums can differ from sklearn's in the last few bits.
+    """
+
+    def __init__(self, arrays: Dict[str, Any], chunk_rows: int = 2048):
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.left = arrays["left"]
+        self.right = arrays["right"]
+        self.value = arrays["value"]
+        self.roots = arrays["roots"]
+        self.max_depth = int(arrays["max_depth"])
+        self.n_features_in_ = int(arrays["n_features"])
+        self.scale = float(arrays["scale"])
+        self.init = float(arrays["init"])
+        # Bounds the (rows x trees) working set for large batches
+        self.chunk_rows = chunk_rows
+
+    @classmethod
+    def from_model(cls, model: Any) -> "TreeEnsemble":
+        return cls(export_tree_ensemble(model))
+
+    def predict(self, X: Any) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Expected {self.n_features_in_} features, got shape {X.shape}")
+
+        predictions = np.empty(len(X), dtype=np.float64)
+        for start in range(0, len(X), self.chunk_rows):
+            rows = X[start:start + self.chunk_rows]
+            predictions[start:start + len(rows)] = self._predict_chunk(rows)
+        return predictions
+
+    def _predict_chunk(self, rows: np.ndarray) -> np.ndarray:
+        row_index = np.arange(len(rows))[:, None]
+        nodes = np.broadcast_to(self.roots, (len(rows), len(self.roots)))
+        for _ in range(self.max_depth):
+            go_left = rows[row_index, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return self.value[nodes].sum(axis=1) * self.scale + self.init
@@ -6,6 +6,9 @@ from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
+from ..utils.caching import cached
+from ..utils.single_flight import SingleFlight
+
 class TransportMode(Enum):
     AIR_FREIGHT = "air_freight"
     SEA_FREIGHT = "sea_freight"
@@ -58,6 +61,8 @@ class LogisticsOptimizer:
         self.db_client = db_client
         self.redis_client = redis_client
         self.cache_ttl = 3600  # 1 hour
+        self.stale_ttl = 6 * 3600  # serve stale while refreshing for up to 6 hours
+        self.single_flight = SingleFlight(redis_client)
         
         # Initialize shipping networks and packaging databases
         self.shipping_routes = self._initialize_shipping_routes()
@@ -76,11 +81,14 @@ class LogisticsOptimizer:
     ) -> Dict[str, Any]:
         """Optimize complete logistics chain"""
         try:
-            cache_key = f"logistics_optimization_{product_id}_{source_country}_{target_country}_{quantity}"
-            cached_result = await self.redis_client.get(cache_key)
-            if cached_result:
-                return cached_result
+            # Route, risk and paperwork analysis is shared by every order size on the lane
+            lane_profile = await self._get_lane_profile(
+                product_id, source_country, target_country, urgency
+            )
+            if "error" in lane_profile:
+                return lane_profile
             
+            rate_data = lane_profile["rate_data"]
             optimization = {
                 "optimization_id": f"OPT_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
                 "input_parameters": {
@@ -91,18 +99,51 @@ class LogisticsOptimizer:
                     "urgency": urgency,
                     "budget_constraint": budget_constraint
                 },
-                "packaging_optimization": await self._optimize_packaging(
-                    product_id, quantity, target_country
+                "packaging_optimization": self._optimize_packaging(
+                    rate_data["packaging"], quantity
                 ),
                 "transport_optimization": await self._optimize_transport(
-                    source_country, target_country, quantity, urgency, budget_constraint
-                ),
-                "route_analysis": await self._analyze_shipping_routes(
-                    source_country, target_country, urgency
+                    rate_data["routes"], source_country, target_country, quantity, urgency, budget_constraint
                 ),
+                "route_analysis": lane_profile["route_analysis"],
                 "cost_optimization": await self._optimize_costs(
                     product_id, source_country, target_country, quantity
                 ),
+                "risk_mitigation": lane_profile["risk_mitigation"],
+                "timeline_optimization": lane_profile["timeline_optimization"],
+                "documentation_workflow": lane_profile["documentation_workflow"],
+                "tracking_strategy": lane_profile["tracking_strategy"],
+                "contingency_plans": lane_profile["contingency_plans"],
+                "recommendations": await self._generate_logistics_recommendations(
+                    product_id, source_country, target_country, quantity, urgency
+                ),
+                "generated_at": datetime.utcnow().isoformat()
+            }
+            
+            return optimization
+            
+        except Exception as e:
+            logging.error(f"Error optimizing logistics chain: {str(e)}")
+            return {"error": str(e)}
+    
+    @cached(
+        "logistics_lane_{product_id}_{source_country}_{target_country}_{urgency}",
+        soft_ttl="cache_ttl",
+        hard_ttl="stale_ttl"
+    )
+    async def _get_lane_profile(
+        self, product_id: str, source_country: str, target_country: str, urgency: str
+    ) -> Dict[str, Any]:
+        """Quantity-independent analysis and rate data for a product on a lane"""
+        try:
+            profile = {
+                "rate_data": {
+                    "routes": self._get_available_routes(source_country, target_country),
+                    "packaging": await self._analyze_packaging_options(product_id, target_country)
+                },
+                "route_analysis": await self._analyze_shipping_routes(
+                    source_country, target_country, urgency
+                ),
                 "risk_mitigation": await self._analyze_logistics_risks(
                     source_country, target_country, product_id
                 ),
@@ -117,26 +158,26 @@ class LogisticsOptimizer:
                 ),
                 "contingency_plans": await self._create_contingency_plans(
                     source_country, target_country, product_id
-                ),
-                "recommendations": await self._generate_logistics_recommendations(
-                    product_id, source_country, target_country, quantity, urgency
-                ),
-                "generated_at": datetime.utcnow().isoformat()
+                )
             }
             
-            # Cache the optimization
-            await self.redis_client.set(cache_key, optimization, expire=self.cache_ttl)
-            
-            return optimization
+            # A failed section must not be cached for the lane's whole TTL
+            failed = [
+                name for name, section in [("packaging", profile["rate_data"]["packaging"]), *profile.items()]
+                if isinstance(section, dict) and "error" in section
+            ]
+            if failed:
+                return {"error": f"Lane profile sections failed: {', '.join(failed)}"}
+            return profile
             
         except Exception as e:
-            logging.error(f"Error optimizing logistics chain: {str(e)}")
+            logging.error(f"Error building logistics lane profile: {str(e)}")
             return {"error": str(e)}
     
-    async def _optimize_packaging(
-        self, product_id: str, quantity: int, target_country: str
+    async def _analyze_packaging_options(
+        self, product_id: str, target_country: str
     ) -> Dict[str, Any]:
-        """Optimize packaging for the product"""
+        """Rank packaging options for the product; costs are per unit only"""
         try:
             product_characteristics = self._get_product_characteristics(product_id)
             target_regulations = self._get_packaging_regulations(target_country)
@@ -152,9 +193,7 @@ class LogisticsOptimizer:
                         "packaging_type": pkg_type.value,
                         "description": spec.get("description", ""),
                         "cost_analysis": {
-                            "unit_cost": spec.get("cost_per_unit", 0),
-                            "total_cost": spec.get("cost_per_unit", 0) * quantity,
-                            "cost_per_kg": spec.get("cost_per_unit", 0) / max(1, quantity / 1000)
+                            "unit_cost": spec.get("cost_per_unit", 0)
                         },
                         "specifications": {
                             "materials": spec.get("materials_required", []),
@@ -179,15 +218,10 @@ class LogisticsOptimizer:
             # Sort by suitability score
             packaging_options.sort(key=lambda x: x["suitability_score"], reverse=True)
             
-            # Select optimal packaging
-            optimal_packaging = packaging_options[0] if packaging_options else None
-            
             return {
-                "optimal_packaging": optimal_packaging,
-                "alternative_options": packaging_options[1:3],  # Top 2 alternatives
+                "options": packaging_options[:3],  # Optimal plus top 2 alternatives
                 "packaging_requirements": {
                     "primary_packaging": self._get_primary_packaging_requirements(product_id),
-                    "secondary_packaging": self._get_secondary_packaging_requirements(quantity),
                     "shipping_packaging": self._get_shipping_packaging_requirements(target_country),
                     "labeling_requirements": self._get_labeling_requirements(product_id, target_country)
                 },
@@ -197,11 +231,44 @@ class LogisticsOptimizer:
             }
             
         except Exception as e:
-            logging.error(f"Error optimizing packaging: {str(e)}")
+            logging.error(f"Error analyzing packaging options: {str(e)}")
             return {"error": str(e)}
     
+    def _optimize_packaging(self, packaging_profile: Dict[str, Any], quantity: int) -> Dict[str, Any]:
+        """Price the ranked packaging options for an order quantity"""
+        if "error" in packaging_profile:
+            return packaging_profile
+            
+        packaging_options = []
+        for option in packaging_profile["options"]:
+            unit_cost = option["cost_analysis"]["unit_cost"]
+            packaging_options.append({
+                **option,
+                "cost_analysis": {
+                    "unit_cost": unit_cost,
+                    "total_cost": unit_cost * quantity,
+                    "cost_per_kg": unit_cost / max(1, quantity / 1000)
+                }
+            })
+            
+        requirements = packaging_profile["packaging_requirements"]
+        return {
+            "optimal_packaging": packaging_options[0] if packaging_options else None,
+            "alternative_options": packaging_options[1:3],  # Top 2 alternatives
+            "packaging_requirements": {
+                "primary_packaging": requirements["primary_packaging"],
+                "secondary_packaging": self._get_secondary_packaging_requirements(quantity),
+                "shipping_packaging": requirements["shipping_packaging"],
+                "labeling_requirements": requirements["labeling_requirements"]
+            },
+            "packaging_best_practices": packaging_profile["packaging_best_practices"],
+            "cost_saving_tips": packaging_profile["cost_saving_tips"],
+            "sustainability_options": packaging_profile["sustainability_options"]
+        }
+    
     async def _optimize_transport(
         self,
+        available_routes: List[Dict[str, Any]],
         source_country: str,
         target_country: str,
         quantity: int,
@@ -210,9 +277,6 @@ class LogisticsOptimizer:
     ) -> Dict[str, Any]:
         """Optimize transportation method and route"""
         try:
-            # Get available routes
-            available_routes = self._get_available_routes(source_country, target_country)
-            
             transport_options = []
             
             for route in available_routes:
@@ -678,4 +742,16 @@ class LogisticsOptimizer:
                 "cargo": quantity * base_rate * 0.02,
                 "liability": 100
             }
-        }
\ No newline at end of file
+        }
+    
+    def _initialize_carrier_networks(self) -> Dict[str, Any]:
+        """Carriers serving each transport mode, derived from the route table"""
+        networks: Dict[str, Any] = {}
+        for route in self.shipping_routes.values():
+            carriers = networks.setdefault(route["transport_mode"], [])
+            carriers.extend(carrier for carrier in route["carriers"] if carrier not in carriers)
+        return networks
+    
+    def _initialize_port_capabilities(self) -> Dict[str, Any]:
+        """Port handling capabilities; none are recorded yet"""
+        return {}
@@ -1,9 +1,12 @@
 import numpy as np
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Any, Optional
 import logging
 from dataclasses import dataclass
 
+from ..utils.caching import cached
+from ..utils.single_flight import SingleFlight
+
 
 @dataclass
 class MarketOpportunity:
@@ -28,6 +31,15 @@ class MarketAnalyzer:
         self.redis_client = redis_client
         self.markets = ["US", "EU", "UK", "Canada", "Australia", "Japan"]
         self.analysis_cache_ttl = 300  # 5 minutes
+        self.analysis_stale_ttl = 3600  # serve stale while refreshing for up to 1 hour
+        self.price_history_days = 90
+        # Trend window in days and the confidence of a fully covered window
+        self.trend_windows = {
+            "short_term": (7, 0.75),
+            "medium_term": (30, 0.65),
+            "long_term": (90, 0.55)
+        }
+        self.single_flight = SingleFlight(redis_client)
         
     async def analyze_multiple_products(
         self, 
@@ -47,6 +59,9 @@ class MarketAnalyzer:
                 "generated_at": datetime.now(timezone.utc).isoformat()
             }
             
+            # Load every product in one round trip; the per-product reads hit the cache
+            await self.db_client.get_products(product_ids)
+            
             for product_id in product_ids:
                 product_analysis = await self._analyze_single_product(
                     product_id, target_markets, analysis_type
@@ -74,15 +89,10 @@ class MarketAnalyzer:
             logging.error(f"Multi-product analysis error: {str(e)}")
             return {"error": str(e)}
     
+    @cached("intelligence_{product_id}", soft_ttl="analysis_cache_ttl", hard_ttl="analysis_stale_ttl")
     async def get_product_intelligence(self, product_id: str) -> Dict[str, Any]:
         """Get comprehensive market intelligence for a product"""
         try:
-            # Check cache first
-            cache_key = f"intelligence_{product_id}"
-            cached_intelligence = await self.redis_client.get(cache_key)
-            if cached_intelligence:
-                return cached_intelligence
-            
             # Get product data
             product = await self.db_client.get_product(product_id)
             if not product:
@@ -102,16 +112,23 @@ class MarketAnalyzer:
                 "generated_at": datetime.now(timezone.utc).isoformat()
             }
             
+            # Daily OHLC rows reduced on the server, shared by the market and trend analysis
+            price_history = await self.db_client.get_market_ohlc(
+                product_id,
+                "1d",
+                start=datetime.now(timezone.utc) - timedelta(days=self.price_history_days)
+            )
+            
             # Analyze each market
             for market in self.markets:
                 market_analysis = await self._analyze_market_for_product(
-                    product_id, market, product
+                    product_id, market, product, price_history
                 )
                 intelligence["market_analysis"][market] = market_analysis
             
             # Generate price trends
             intelligence["price_trends"] = await self._generate_price_trends(
-                product_id
+                product_id, price_history
             )
             
             # Analyze supply and demand
@@ -137,11 +154,6 @@ class MarketAnalyzer:
                 product_id, intelligence
             )
             
-            # Cache the intelligence
-            await self.redis_client.set(
-                cache_key, intelligence, expire=self.analysis_cache_ttl
-            )
-            
             return intelligence
             
         except Exception as e:
@@ -170,6 +182,11 @@ class MarketAnalyzer:
             total_value = 0
             total_costs = 0.0
             
+            # Load every line's product in one round trip; the per-line reads hit the cache
+            await self.db_client.get_products([
+                product.get("product_id") for product in order_data.get("products", [])
+            ])
+            
             for product in order_data.get("products", []):
                 product_id = product.get("product_id")
                 quantity = product.get("quantity", 0)
@@ -272,7 +289,8 @@ class MarketAnalyzer:
         self, 
         product_id: str, 
         market: str, 
-        product: Dict[str, Any]
+        product: Dict[str, Any],
+        price_history: Optional[List[Dict[str, Any]]] = None
     ) -> Dict[str, Any]:
         """Analyze specific market for a product"""
         try:
@@ -296,7 +314,7 @@ class MarketAnalyzer:
                 "profit_potential": profit_potential,
                 "demand_level": self._generate_demand_level(market),
                 "supply_level": self._generate_supply_level(market),
-                "market_volatility": self._generate_volatility(market),
+                "market_volatility": self._market_volatility(market, price_history),
                 "trend": self._generate_market_trend(market),
                 "risk_factors": self._identify_market_risks(market)
             }
@@ -307,27 +325,55 @@ class MarketAnalyzer:
             logging.error(f"Market analysis error: {str(e)}")
             return {"error": str(e)}
     
-    async def _generate_price_trends(self, product_id: str) -> Dict[str, Any]:
-        """Generate price trends for a product"""
+    async def _generate_price_trends(
+        self, 
+        product_id: str, 
+        price_history: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        """Generate price trends for a product from its daily OHLC rows"""
         try:
-            # Simulate price trend data
-            trends = {
-                "short_term": {
-                    "trend": "increasing",
-                    "change_percentage": 5.2,
-                    "confidence": 0.75
-                },
-                "medium_term": {
-                    "trend": "stable",
-                    "change_percentage": 2.1,
-                    "confidence": 0.65
-                },
-                "long_term": {
-                    "trend": "increasing",
-                    "change_percentage": 8.5,
-                    "confidence": 0.55
+            if not price_history:
+                # No recorded ticks yet: fall back to simulated trends
+                return {
+                    "short_term": {
+                        "trend": "increasing",
+                        "change_percentage": 5.2,
+                        "confidence": 0.75
+                    },
+                    "medium_term": {
+                        "trend": "stable",
+                        "change_percentage": 2.1,
+                        "confidence": 0.65
+                    },
+                    "long_term": {
+                        "trend": "increasing",
+                        "change_percentage": 8.5,
+                        "confidence": 0.55
+                    }
+                }
+            
+            now = datetime.now(timezone.utc)
+            trends = {}
+            for horizon, (days, confidence) in self.trend_windows.items():
+                window_start = now - timedelta(days=days)
+                rows = [row for row in price_history if self._as_utc(row["period_start"]) >= window_start]
+                
+                # Change from the first open to the last close, averaged over markets
+                changes = []
+                for market in {row.get("market") for row in rows}:
+                    market_rows = [row for row in rows if row.get("market") == market]
+                    first_open = market_rows[0].get("open")
+                    last_close = market_rows[-1].get("close")
+                    if first_open and last_close is not None:
+                        changes.append((last_close - first_open) / first_open * 100)
+                        
+                change = float(np.mean(changes)) if changes else 0.0
+                days_covered = len({row["period_start"] for row in rows})
+                trends[horizon] = {
+                    "trend": "increasing" if change > 1 else "decreasing" if change < -1 else "stable",
+                    "change_percentage": round(change, 1),
+                    "confidence": round(confidence * min(1.0, days_covered / days), 2)
                 }
-            }
             
             return trends
             
@@ -502,6 +548,22 @@ class MarketAnalyzer:
         """Generate market volatility"""
         return np.random.uniform(0.1, 0.4)
     
+    def _market_volatility(self, market: str, price_history: Optional[List[Dict[str, Any]]]) -> float:
+        """Mean daily relative volatility of a market, simulated when it has no history"""
+        volatilities = [
+            row["relative_volatility"] for row in price_history or []
+            if row.get("market") == market and row.get("relative_volatility") is not None
+        ]
+        if not volatilities:
+            return self._generate_volatility(market)
+        return float(np.mean(volatilities))
+    
+    def _as_utc(self, timestamp: datetime) -> datetime:
+        """OHLC period starts come back as naive UTC"""
+        if timestamp.tzinfo is None:
+            return timestamp.replace(tzinfo=timezone.utc)
+        return timestamp
+    
     def _generate_market_trend(self, market: str) -> str:
         """Generate market trend"""
         trends = ["increasing", "stable", "decreasing"]
@@ -319,8 +319,7 @@ class NewsProcessor:
     async def _store_news_impacts(self, impacts: List[Dict[str, Any]]) -> None:
         """Store news impacts in database"""
         try:
-            for impact in impacts:
-                await self.db_client.store_news_impact(impact)
+            await self.db_client.store_news_impacts(impacts)
         except Exception as e:
             logging.error(f"Error storing news impacts: {str(e)}")
     
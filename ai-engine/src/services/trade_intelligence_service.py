@@ -8,6 +8,8 @@ from ..models.trade_analytics_models import (
     CountryProfile, ProductProfile, SupplierProfile, BuyerProfile,
     TradeRoute, ComprehensiveArbitrageModel, RiskLevel, TradeProfitability
 )
+from ..utils.caching import cached
+from ..utils.single_flight import SingleFlight
 
 class TradeIntelligenceService:
     """Comprehensive trade intelligence and recommendation service"""
@@ -17,6 +19,8 @@ class TradeIntelligenceService:
         self.redis_client = redis_client
         self.arbitrage_model = ComprehensiveArbitrageModel()
         self.cache_ttl = 3600  # 1 hour
+        self.stale_ttl = 6 * 3600  # serve stale while refreshing for up to 6 hours
+        self.single_flight = SingleFlight(redis_client)
         
         # Initialize reference data
         self.countries = self._initialize_country_data()
@@ -29,6 +33,11 @@ class TradeIntelligenceService:
         await self.arbitrage_model.load_models()
         logging.info("Trade Intelligence Service initialized")
     
+    @cached(
+        "trade_analysis_{product_name}_{source_country}_{target_country}_{quantity}_{budget}",
+        soft_ttl="cache_ttl",
+        hard_ttl="stale_ttl"
+    )
     async def get_comprehensive_trade_analysis(
         self, 
         product_name: str,
@@ -39,11 +48,6 @@ class TradeIntelligenceService:
     ) -> Dict[str, Any]:
         """Get comprehensive trade analysis for Shilajit example"""
         try:
-            cache_key = f"trade_analysis_{product_name}_{source_country}_{target_country}"
-            cached_result = await self.redis_client.get(cache_key)
-            if cached_result:
-                return cached_result
-            
             # Example: Shilajit from India to US
             current_price = 25.0  # $25 per gram in India
             
@@ -100,9 +104,6 @@ class TradeIntelligenceService:
                 )
             }
             
-            # Cache the result
-            await self.redis_client.set(cache_key, analysis, expire=self.cache_ttl)
-            
             return analysis
             
         except Exception as e:
@@ -0,0 +1,116 @@
+import asyncio
+import copy
+import functools
+import inspect
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple, Union
+
+# Cached values are wrapped so readers know when they went stale
+VALUE_FIELD = "_cached_value"
+REFRESH_AT_FIELD = "_refresh_at"
+
+_refresh_tasks: Set[asyncio.Task] = set()
+
+
+def _is_cacheable(result: Any) -> bool:
+    """Service methods report failures as {"error": ...}; never cache those"""
+    if result is None:
+        return False
+    return not (isinstance(result, dict) and "error" in result)
+
+
+def _resolve_ttl(instance: Any, ttl: Union[float, str]) -> float:
+    return getattr(instance, ttl) if isinstance(ttl, str) else ttl
+
+
+def _unwrap(entry: Any) -> Tuple[Any, bool]:
+    """Return (value, fresh) for a stored entry; None when nothing usable is cached"""
+    if isinstance(entry, dict) and VALUE_FIELD in entry:
+        return entry[VALUE_FIELD], entry.get(REFRESH_AT_FIELD, 0) > time.time()
+    if entry:
+        # Written before the stale-while-revalidate envelope: serve it, then refresh
+        return entry, False
+    return None, False
+
+
+def cached(
+    key: Optional[str] = None,
+    soft_ttl: Union[float, str] = 300,
+    hard_ttl: Union[float, str] = 3600,
+    should_cache: Callable[[Any], bool] = _is_cacheable
+):
+    """Stale-while-revalidate caching for async service methods.
+    
+    `key` is a format string over the method's arguments, e.g.
+    "intelligence_{product_id}"; without one the key is built from the
+    method name and all argument values. Entries expire from Redis after
+    `hard_ttl` seconds. Once `soft_ttl` has passed the stale value is
+    returned immediately and a single background refresh is started.
+    Either TTL may name an attribute of the instance instead.
+    
+    The instance must expose `redis_client` and `single_flight`.
+    """
+    def decorator(func: Callable[..., Awaitable[Any]]):
+        signature = inspect.signature(func)
+        
+        def build_key(args: tuple, kwargs: Dict[str, Any]) -> str:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = dict(bound.arguments)
+            arguments.pop("self", None)
+            if key is not None:
+                return key.format(**arguments)
+            return "_".join([func.__name__] + [str(value) for value in arguments.values()])
+        
+        async def load_fresh(redis_client: Any, cache_key: str) -> Any:
+            value, fresh = _unwrap(await redis_client.get(cache_key))
+            return value if fresh else None
+        
+        async def compute_and_store(self: Any, cache_key: str, args: tuple, kwargs: Dict[str, Any]) -> Any:
+            result = await func(self, *args, **kwargs)
+            if should_cache(result):
+                soft = _resolve_ttl(self, soft_ttl)
+                hard = max(_resolve_ttl(self, hard_ttl), soft)
+                await self.redis_client.set(
+                    cache_key,
+                    {VALUE_FIELD: result, REFRESH_AT_FIELD: time.time() + soft},
+                    expire=int(hard)
+                )
+            return result
+        
+        async def refresh(self: Any, cache_key: str, args: tuple, kwargs: Dict[str, Any]) -> None:
+            try:
+                await self.single_flight.do(
+                    cache_key,
+                    lambda: compute_and_store(self, cache_key, args, kwargs),
+                    load_cached=lambda: load_fresh(self.redis_client, cache_key),
+                    wait=False
+                )
+            except Exception as e:
+                logging.error(f"Background refresh of {cache_key} failed: {str(e)}")
+        
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            cache_key = build_key((self,) + args, kwargs)
+            # redis_client.get decodes a fresh copy per call, so this value is the caller's own
+            value, fresh = _unwrap(await self.redis_client.get(cache_key))
+            
+            if value is not None:
+                if not fresh and cache_key not in self.single_flight.inflight:
+                    task = asyncio.create_task(refresh(self, cache_key, args, kwargs))
+                    _refresh_tasks.add(task)
+                    task.add_done_callback(_refresh_tasks.discard)
+                return value
+            
+            # Cold miss: concurrent callers share one computation but each gets its own copy
+            result = await self.single_flight.do(
+                cache_key,
+                lambda: compute_and_store(self, cache_key, args, kwargs),
+                load_cached=lambda: load_fresh(self.redis_client, cache_key)
+            )
+            return copy.deepcopy(result)
+        
+        return wrapper
+    
+    return decorator
@@ -0,0 +1,134 @@
+import bisect
+from typing import Any, Dict, List, Optional, Tuple
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is unbounded
+LATENCY_BUCKETS_MS = (0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram with cheap percentile estimates"""
+    
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+    
+    def observe(self, elapsed_ms: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, elapsed_ms)] += 1
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+    
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Upper bound of the bucket holding the given fraction of samples"""
+        if not self.count:
+            return None
+        target = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return self.buckets[index] if index < len(self.buckets) else self.max_ms
+        return self.max_ms
+    
+    def snapshot(self) -> Dict[str, Any]:
+        cumulative = 0
+        buckets = {}
+        for bound, bucket_count in zip(list(self.buckets) + ["inf"], self.counts):
+            cumulative += bucket_count
+            buckets[f"le_{bound}"] = cumulative
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else 0,
+            "p50_ms": self.percentile(0.5),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": round(self.max_ms, 3),
+            "buckets": buckets
+        }
+
+
+class CacheMetrics:
+    """Cache counters and latency histograms grouped by backend and key prefix.
+    
+    Keys are attributed to the longest matching entry in `prefixes`;
+    anything else is grouped by the text up to its first "_" or ":".
+    """
+    
+    def __init__(self, prefixes: Tuple[str, ...] = ()):
+        self.prefixes = tuple(sorted(prefixes, key=len, reverse=True))
+        self.series: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    
+    def prefix_for(self, key: str) -> str:
+        for prefix in self.prefixes:
+            if key.startswith(prefix):
+                return prefix
+        cut = min((i for i in (key.find("_"), key.find(":")) if i >= 0), default=-1)
+        return key[:cut + 1] if cut >= 0 else "other"
+    
+    def _series(self, backend: str, key: str) -> Dict[str, Any]:
+        series_key = (backend, self.prefix_for(key))
+        series = self.series.get(series_key)
+        if series is None:
+            series = {
+                "hits": 0,
+                "l1_hits": 0,
+                "misses": 0,
+                "writes": 0,
+                "deletes": 0,
+                "errors": 0,
+                "bytes_read": 0,
+                "bytes_written": 0,
+                "read_latency": LatencyHistogram(),
+                "write_latency": LatencyHistogram()
+            }
+            self.series[series_key] = series
+        return series
+    
+    def record_read(
+        self, backend: str, key: str, hit: bool, size: int = 0,
+        elapsed_ms: Optional[float] = None, l1: bool = False
+    ) -> None:
+        series = self._series(backend, key)
+        if hit:
+            series["hits"] += 1
+            series["bytes_read"] += size
+            if l1:
+                series["l1_hits"] += 1
+        else:
+            series["misses"] += 1
+        if elapsed_ms is not None:
+            series["read_latency"].observe(elapsed_ms)
+    
+    def record_write(
+        self, backend: str, key: str, size: int = 0, elapsed_ms: Optional[float] = None
+    ) -> None:
+        series = self._series(backend, key)
+        series["writes"] += 1
+        series["bytes_written"] += size
+        if elapsed_ms is not None:
+            series["write_latency"].observe(elapsed_ms)
+    
+    def record_delete(self, backend: str, key: str) -> None:
+        self._series(backend, key)["deletes"] += 1
+    
+    def record_error(self, backend: str, key: str) -> None:
+        self._series(backend, key)["errors"] += 1
+    
+    def reset(self) -> None:
+        self.series.clear()
+    
+    def snapshot(self) -> List[Dict[str, Any]]:
+        rows = []
+        for (backend, prefix), series in sorted(self.series.items()):
+            lookups = series["hits"] + series["misses"]
+            rows.append({
+                "backend": backend,
+                "prefix": prefix,
+                **{name: value for name, value in series.items() if not name.endswith("_latency")},
+                "hit_ratio": round(series["hits"] / lookups, 4) if lookups else 0,
+                "read_latency": series["read_latency"].snapshot(),
+                "write_latency": series["write_latency"].snapshot()
+            })
+        return rows
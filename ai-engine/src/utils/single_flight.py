@@ -0,0 +1,108 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+
+class SingleFlight:
+    """Coalesces concurrent cache misses so each key is computed once.
+    
+    Within a worker, callers for the same key await the leader's future.
+    Across workers, the leader holds a Redis lock with a lease; other
+    workers poll the cache until the value appears, the lock is released
+    or the wait times out, and only then compute themselves.
+    """
+    
+    def __init__(
+        self,
+        redis_client: Any,
+        lock_lease: float = 60.0,
+        wait_timeout: float = 30.0,
+        poll_interval: float = 0.1
+    ):
+        self.redis_client = redis_client
+        self.lock_lease = lock_lease
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self.inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {"leader_runs": 0, "local_waits": 0, "remote_waits": 0, "remote_hits": 0}
+    
+    async def do(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        load_cached: Optional[Callable[[], Awaitable[Any]]] = None,
+        wait: bool = True
+    ) -> Any:
+        """Run `compute` once per key and share its result with concurrent callers.
+        
+        `load_cached` reads the value the leader stores; it defaults to
+        `redis_client.get(key)`. With `wait=False` the call returns None
+        straight away when another worker already holds the lock.
+        """
+        future = self.inflight.get(key)
+        if future is not None:
+            self.stats["local_waits"] += 1
+            return await asyncio.shield(future)
+        
+        future = asyncio.get_running_loop().create_future()
+        self.inflight[key] = future
+        try:
+            result = await self._run_across_workers(key, compute, load_cached, wait)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when nobody else is waiting
+            raise
+        finally:
+            self.inflight.pop(key, None)
+    
+    async def _run_across_workers(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        load_cached: Optional[Callable[[], Awaitable[Any]]],
+        wait: bool
+    ) -> Any:
+        load = load_cached or (lambda: self.redis_client.get(key))
+        lock_name = f"lock:{key}"
+        deadline = time.monotonic() + self.wait_timeout
+        
+        while True:
+            token = await self.redis_client.acquire_lock(lock_name, self.lock_lease)
+            if token is not None:
+                try:
+                    # Another worker may have finished between our miss and the lock
+                    cached = await load()
+                    if cached is not None:
+                        self.stats["remote_hits"] += 1
+                        return cached
+                    
+                    self.stats["leader_runs"] += 1
+                    return await compute()
+                finally:
+                    await self.redis_client.release_lock(lock_name, token)
+            
+            if not await self.redis_client.exists(lock_name):
+                # Nobody holds the lock yet we could not take it: Redis is unavailable
+                self.stats["leader_runs"] += 1
+                return await compute()
+            
+            if not wait:
+                return None
+            
+            # Another worker holds the lease: wait for its result
+            self.stats["remote_waits"] += 1
+            while time.monotonic() < deadline:
+                await asyncio.sleep(self.poll_interval)
+                cached = await load()
+                if cached is not None:
+                    self.stats["remote_hits"] += 1
+                    return cached
+                if not await self.redis_client.exists(lock_name):
+                    break  # leader gave up without caching; try to take over
+            else:
+                logging.warning(f"Timed out waiting for {key} from another worker, computing locally")
+                self.stats["leader_runs"] += 1
+                return await compute()
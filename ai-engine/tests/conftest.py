@@ -0,0 +1,17 @@
+import os
+import sys
+
+import pytest
+
+# Tests import the service as `src.*`, like the app entry points run from ai-engine
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database.redis_client import MockRedisPool, RedisClient  # noqa: E402
+
+
+@pytest.fixture
+def redis_client() -> RedisClient:
+    """RedisClient on the in-memory pool, as used when no server is reachable"""
+    client = RedisClient()
+    client.redis_pool = MockRedisPool(codec=client.codec)
+    return client
@@ -0,0 +1,101 @@
+import asyncio
+import threading
+
+import pytest
+
+from src.models.trade_analytics_models import ENSEMBLE_NAMES, TRAINING_COUNTRIES, ComprehensiveArbitrageModel
+
+SOURCES = TRAINING_COUNTRIES[:5]
+TARGETS = TRAINING_COUNTRIES[5:]
+
+
+@pytest.fixture(scope="module")
+def registry_dir(tmp_path_factory):
+    root = str(tmp_path_factory.mktemp("registry"))
+    trainer = ComprehensiveArbitrageModel()
+    trainer.registry.root = root
+    trainer.fit()
+    return root
+
+
+@pytest.fixture
+def model(registry_dir) -> ComprehensiveArbitrageModel:
+    model = ComprehensiveArbitrageModel()
+    model.registry.root = registry_dir
+    model.version_watch.registry = model.registry
+    asyncio.run(model.load_models())
+    return model
+
+
+def products(count: int):
+    return {f"sku-{index}": 100.0 + index for index in range(count)}
+
+
+def test_large_grids_never_load_estimators_on_the_event_loop(model):
+    loads = []
+    load = model.registry.load
+    
+    def recording_load(*args, **kwargs):
+        loads.append((tuple(kwargs.get("artifacts")), threading.current_thread() is threading.main_thread()))
+        return load(*args, **kwargs)
+        
+    model.registry.load = recording_load
+    catalogue = products(model.compiled_max_rows // 25 + 2)
+    
+    async def run():
+        first = await model.score_opportunity_grid(catalogue, SOURCES, TARGETS, 500, top_k=5)
+        # The array engine scored the grid while the estimators load off the loop
+        assert model.estimators == {}
+        await model.estimator_task
+        model.prediction_memo.reset(model.model_version, model.scaler.scale_)
+        second = await model.score_opportunity_grid(catalogue, SOURCES, TARGETS, 500, top_k=5)
+        return first, second
+        
+    first, second = asyncio.run(run())
+    
+    assert loads == [(ENSEMBLE_NAMES, False)]
+    assert set(model.estimators) == set(ENSEMBLE_NAMES)
+    assert first["lanes_scored"] > model.compiled_max_rows
+    assert [lane["opportunity_id"] for lane in first["opportunities"]] == [
+        lane["opportunity_id"] for lane in second["opportunities"]
+    ]
+
+
+def test_estimators_of_a_replaced_version_are_discarded(model):
+    async def run():
+        model._load_estimators_in_background()
+        model.model_version = "newer"
+        await model.estimator_task
+        
+    asyncio.run(run())
+    assert model.estimators == {}
+
+
+def test_grid_scores_every_lane_and_returns_the_top_k(model):
+    countries = ["IN", "US", "DE"]
+    result = asyncio.run(model.score_opportunity_grid(products(4), countries, countries, 200, top_k=3))
+    
+    # Same-country lanes are skipped
+    assert result["lanes_scored"] == 4 * 6
+    scores = [lane["opportunity_score"] for lane in result["opportunities"]]
+    assert len(scores) == 3 and scores == sorted(scores, reverse=True)
+    assert all(lane["source_country"] != lane["target_country"] for lane in result["opportunities"])
+    
+    everything = asyncio.run(model.score_opportunity_grid(products(4), countries, countries, 200, top_k=100))
+    assert len(everything["opportunities"]) == 24
+    assert max(lane["opportunity_score"] for lane in everything["opportunities"]) == scores[0]
+
+
+def test_grid_lane_matches_the_single_lane_analysis(model):
+    result = asyncio.run(model.score_opportunity_grid({"sku-7": 120.0}, ["IN"], ["US"], 300, top_k=1))
+    single = asyncio.run(model._analyze_product_opportunity("sku-7", "IN", "US", 300, 120.0))
+    
+    lane = result["opportunities"][0]
+    assert lane["opportunity_id"] == "sku-7_IN_US"
+    for field in ("predicted_market_price", "predicted_demand_score", "risk_score", "cost_breakdown", "profit_analysis"):
+        assert lane[field] == single[field]
+
+
+def test_empty_grid(model):
+    result = asyncio.run(model.score_opportunity_grid(products(2), ["IN"], ["IN"], 100))
+    assert result["lanes_scored"] == 0 and result["opportunities"] == []
@@ -0,0 +1,133 @@
+import asyncio
+import time
+
+from src.services.trade_intelligence_service import TradeIntelligenceService
+from src.utils import caching
+from src.utils.caching import REFRESH_AT_FIELD, VALUE_FIELD, cached
+from src.utils.single_flight import SingleFlight
+
+
+class Service:
+    def __init__(self, redis_client, soft_ttl: float = 300):
+        self.redis_client = redis_client
+        self.single_flight = SingleFlight(redis_client, poll_interval=0.01)
+        self.soft_ttl = soft_ttl
+        self.calls = 0
+    
+    @cached(key="intelligence_{product_id}", soft_ttl="soft_ttl", hard_ttl=600)
+    async def analyze(self, product_id: str):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return {"product_id": product_id, "run": self.calls}
+    
+    @cached(key="failing_{product_id}")
+    async def failing(self, product_id: str):
+        self.calls += 1
+        return {"error": "upstream unavailable"}
+
+
+async def settle_refreshes():
+    while caching._refresh_tasks:
+        await asyncio.gather(*list(caching._refresh_tasks))
+
+
+def test_cached_serves_fresh_entries_within_soft_ttl(redis_client):
+    service = Service(redis_client)
+    
+    async def run():
+        first = await service.analyze("p1")
+        second = await service.analyze("p1")
+        await settle_refreshes()
+        return first, second
+    
+    first, second = asyncio.run(run())
+    assert first == second == {"product_id": "p1", "run": 1}
+    assert service.calls == 1
+
+
+def test_cached_serves_stale_entry_and_refreshes_in_background(redis_client):
+    service = Service(redis_client, soft_ttl=0)
+    
+    async def run():
+        first = await service.analyze("p1")
+        stale = await service.analyze("p1")
+        await settle_refreshes()
+        return first, stale, await redis_client.get("intelligence_p1")
+    
+    first, stale, stored = asyncio.run(run())
+    assert first == stale == {"product_id": "p1", "run": 1}
+    assert service.calls == 2
+    assert stored[VALUE_FIELD] == {"product_id": "p1", "run": 2}
+
+
+def test_cached_entries_expire_after_hard_ttl(redis_client):
+    service = Service(redis_client)
+    pool = redis_client.redis_pool
+    
+    async def run():
+        await service.analyze("p1")
+        assert 590 <= pool.expirations["intelligence_p1"] - time.monotonic() <= 600
+        pool.expirations["intelligence_p1"] = time.monotonic() - 1
+        return await service.analyze("p1")
+    
+    assert asyncio.run(run()) == {"product_id": "p1", "run": 2}
+
+
+def test_cached_reads_entries_written_before_the_envelope(redis_client):
+    service = Service(redis_client)
+    
+    async def run():
+        await redis_client.set("intelligence_p1", {"product_id": "p1", "run": 0})
+        legacy = await service.analyze("p1")
+        await settle_refreshes()
+        return legacy, await redis_client.get("intelligence_p1")
+    
+    legacy, stored = asyncio.run(run())
+    assert legacy == {"product_id": "p1", "run": 0}
+    assert stored[VALUE_FIELD] == {"product_id": "p1", "run": 1}
+    assert stored[REFRESH_AT_FIELD] > time.time()
+
+
+def test_cached_does_not_store_errors(redis_client):
+    service = Service(redis_client)
+    
+    async def run():
+        await service.failing("p1")
+        await service.failing("p1")
+        return await redis_client.get("failing_p1")
+    
+    assert asyncio.run(run()) is None
+    assert service.calls == 2
+
+
+def test_cached_results_are_independent_copies(redis_client):
+    service = Service(redis_client)
+    
+    async def run():
+        first = await service.analyze("p1")
+        first["run"] = "mutated"
+        return await service.analyze("p1")
+    
+    assert asyncio.run(run())["run"] == 1
+
+
+def test_trade_analysis_is_cached_per_quantity_and_budget(redis_client):
+    service = TradeIntelligenceService(db_client=None, redis_client=redis_client)
+    
+    async def run():
+        for quantity, budget in ((1000, 50000), (5000, 50000), (1000, 90000)):
+            await redis_client.set(
+                f"trade_analysis_shilajit_IN_US_{quantity}_{budget}",
+                {VALUE_FIELD: {"quantity": quantity, "budget": budget}, REFRESH_AT_FIELD: time.time() + 300}
+            )
+        return [
+            await service.get_comprehensive_trade_analysis("shilajit", "IN", "US"),
+            await service.get_comprehensive_trade_analysis("shilajit", "IN", "US", quantity=5000),
+            await service.get_comprehensive_trade_analysis("shilajit", "IN", "US", 1000, 90000)
+        ]
+    
+    assert asyncio.run(run()) == [
+        {"quantity": 1000, "budget": 50000},
+        {"quantity": 5000, "budget": 50000},
+        {"quantity": 1000, "budget": 90000}
+    ]
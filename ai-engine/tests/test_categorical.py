@@ -0,0 +1,38 @@
+import numpy as np
+from sklearn.preprocessing import LabelEncoder
+
+from src.models.categorical import LEGACY_UNKNOWN_CATEGORY, CategoryTable
+
+COUNTRIES = ["IN", "US", "DE", "CN", "JP", "UK", "CA", "AU", "BR", "MX"]
+
+
+def test_codes_match_the_label_encoder():
+    encoder = LabelEncoder().fit(COUNTRIES)
+    table = CategoryTable.from_encoder(encoder)
+    
+    assert len(table) == len(COUNTRIES)
+    np.testing.assert_array_equal(table.encode_many(COUNTRIES), encoder.transform(COUNTRIES))
+    assert table.encode("US") == encoder.transform(["US"])[0]
+
+
+def test_unknown_labels_get_a_code_of_their_own():
+    table = CategoryTable.from_encoder(LabelEncoder().fit(COUNTRIES))
+    
+    assert table.unknown_code == len(COUNTRIES)
+    assert table.encode("ZZ") == table.unknown_code
+    assert table.unknown_code not in table.codes.values()
+    # "AU" sorts first, so it has the code unknown labels used to share
+    assert table.encode("AU") == 0 != table.encode("ZZ")
+
+
+def test_encode_many_accepts_lists_and_arrays():
+    table = CategoryTable(["a", "b"])
+    
+    np.testing.assert_array_equal(table.encode_many(["b", "x", "a"]), [1, 2, 0])
+    np.testing.assert_array_equal(table.encode_many(np.array(["b", "x"])), [1, 2])
+    assert table.encode_many([]).shape == (0,)
+
+
+def test_legacy_unknown_code_can_be_kept():
+    table = CategoryTable(["a", "b"], unknown_code=LEGACY_UNKNOWN_CATEGORY)
+    assert table.encode("x") == 0
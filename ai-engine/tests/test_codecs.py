@@ -0,0 +1,52 @@
+import json
+
+import pytest
+
+from src.database.codecs import FORMAT_VERSION, CacheCodec
+
+PAYLOAD = {"product_id": "p1", "prices": [1.5, 2.25], "nested": {"ok": True, "count": 3}}
+
+
+@pytest.mark.parametrize("serializer", ["json", "orjson", "msgpack"])
+@pytest.mark.parametrize("compression", ["none", "zlib", "zstd"])
+def test_round_trip(serializer, compression):
+    codec = CacheCodec(serializer=serializer, compression=compression, compress_threshold=16)
+    encoded = codec.encode(PAYLOAD)
+    
+    assert encoded[0] == FORMAT_VERSION
+    assert codec.decode(encoded) == PAYLOAD
+
+
+def test_small_payloads_are_not_compressed():
+    codec = CacheCodec(serializer="json", compression="zlib", compress_threshold=4096)
+    assert codec.encode(PAYLOAD)[2:] == json.dumps(PAYLOAD).encode("utf-8")
+
+
+def test_any_codec_decodes_another_codecs_entries():
+    writer = CacheCodec(serializer="msgpack", compression="zstd", compress_threshold=0)
+    assert CacheCodec(serializer="json", compression="none").decode(writer.encode(PAYLOAD)) == PAYLOAD
+
+
+def test_strings_and_bytes_are_stored_raw():
+    codec = CacheCodec()
+    assert codec.encode("42") == b"42"
+    assert codec.encode(b"\x00raw") == b"\x00raw"
+
+
+@pytest.mark.parametrize("stored, expected", [
+    (json.dumps(PAYLOAD).encode("utf-8"), PAYLOAD),
+    (json.dumps(PAYLOAD), PAYLOAD),
+    (b"plain text", "plain text"),
+    (b"17", 17),
+    (b"", None),
+    (None, None)
+])
+def test_decodes_legacy_entries(stored, expected):
+    assert CacheCodec().decode(stored) == expected
+
+
+def test_rejects_unknown_settings():
+    with pytest.raises(ValueError):
+        CacheCodec(serializer="pickle")
+    with pytest.raises(ValueError):
+        CacheCodec(compression="lz4")
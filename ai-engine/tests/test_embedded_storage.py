@@ -0,0 +1,90 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+
+from src.database.embedded_storage import EmbeddedStorage
+
+TICKS = [
+    # product, market, price, volume, timestamp (ISO strings are stored tz-aware, datetimes as given)
+    ("p1", "US", 10.0, 5, "2024-01-01T01:00:00Z"),
+    ("p1", "US", 14.0, 5, datetime(2024, 1, 1, 12)),
+    ("p1", "US", 12.0, 10, "2024-01-01T06:00:00+00:00"),
+    ("p1", "US", 20.0, 1, "2024-01-02T03:00:00Z"),
+    ("p1", "DE", 8.0, 2, "2024-01-01T02:00:00Z"),
+    ("p2", "US", 99.0, 1, "2024-01-01T02:00:00Z")
+]
+
+
+@pytest.fixture
+def storage() -> EmbeddedStorage:
+    storage = EmbeddedStorage()
+    asyncio.run(storage.connect())
+    storage.seed({"market_data": [
+        {"product_id": product, "market": market, "price": price, "volume": volume, "timestamp": timestamp}
+        for product, market, price, volume, timestamp in TICKS
+    ]})
+    return storage
+
+
+def test_daily_ohlc_per_market(storage):
+    rows = asyncio.run(storage.get_market_ohlc("p1", "1d"))
+    
+    assert [(row["market"], row["period_start"]) for row in rows] == [
+        ("DE", datetime(2024, 1, 1)),
+        ("US", datetime(2024, 1, 1)),
+        ("US", datetime(2024, 1, 2))
+    ]
+    us_day = rows[1]
+    assert (us_day["open"], us_day["high"], us_day["low"], us_day["close"]) == (10.0, 14.0, 10.0, 14.0)
+    assert us_day["mean"] == pytest.approx(12.0)
+    assert us_day["volatility"] == pytest.approx((8 / 3) ** 0.5)
+    assert us_day["volume"] == 20
+    assert us_day["samples"] == 3
+
+
+def test_intraday_interval_and_market_filter(storage):
+    rows = asyncio.run(storage.get_market_ohlc("p1", "4h", market="US"))
+    
+    assert [(row["period_start"], row["close"]) for row in rows] == [
+        (datetime(2024, 1, 1, 0), 10.0),
+        (datetime(2024, 1, 1, 4), 12.0),
+        (datetime(2024, 1, 1, 12), 14.0),
+        (datetime(2024, 1, 2, 0), 20.0)
+    ]
+
+
+@pytest.mark.parametrize("tzinfo", [None, timezone.utc])
+def test_time_bounds_accept_naive_and_aware_datetimes(storage, tzinfo):
+    rows = asyncio.run(storage.get_market_ohlc(
+        "p1", "1d", market="US",
+        start=datetime(2024, 1, 1, 5, tzinfo=tzinfo),
+        end=datetime(2024, 1, 2, tzinfo=tzinfo)
+    ))
+    
+    assert len(rows) == 1
+    assert (rows[0]["open"], rows[0]["close"], rows[0]["samples"]) == (12.0, 14.0, 2)
+
+
+def test_unknown_interval_returns_no_rows(storage):
+    assert asyncio.run(storage.get_market_ohlc("p1", "3x")) == []
+
+
+def test_stored_ticks_are_read_back(storage):
+    asyncio.run(storage.store_market_data(
+        {"product_id": "p3", "market": "UK", "price": 5.0, "timestamp": "2024-03-01T00:00:00Z"}
+    ))
+    
+    ticks = asyncio.run(storage.get_market_data("p3"))
+    assert len(ticks) == 1
+    assert ticks[0]["meta"] == {"product_id": "p3", "market": "UK"}
+    assert asyncio.run(storage.get_market_ohlc("p3", "1M"))[0]["period_start"] == datetime(2024, 3, 1)
+
+
+def test_iter_batches_uses_the_default_batch_size(storage):
+    storage.default_batch_size = 4
+    
+    async def collect():
+        return [len(batch) async for batch in storage.iter_batches("market_data")]
+    
+    assert asyncio.run(collect()) == [4, 2]
@@ -0,0 +1,90 @@
+import asyncio
+from typing import Any, Dict, List
+
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+from src.database.indexes import INDEX_SPECS, QUERY_SHAPES, ensure_indexes, find_uncovered_queries
+
+
+class FakeCollection:
+    def __init__(self, name: str, database: "FakeDatabase"):
+        self.name = name
+        self.database = database
+    
+    async def create_indexes(self, indexes: List[IndexModel]) -> List[str]:
+        existing = self.database.indexes.setdefault(self.name, {})
+        for index in indexes:
+            document = index.document
+            current = existing.get(document["name"])
+            if current is not None and current != document:
+                raise OperationFailure("Index already exists with different options", code=85)
+        for index in indexes:
+            existing[index.document["name"]] = dict(index.document)
+        return [index.document["name"] for index in indexes]
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.indexes: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.commands: List[Dict[str, Any]] = []
+    
+    def __getitem__(self, name: str) -> FakeCollection:
+        return FakeCollection(name, self)
+    
+    async def command(self, command: Dict[str, Any]) -> Dict[str, Any]:
+        self.commands.append(command)
+        index = command["index"]
+        self.indexes[command["collMod"]][index["name"]]["expireAfterSeconds"] = index["expireAfterSeconds"]
+        return {"ok": 1}
+
+
+def test_every_declared_query_is_covered():
+    assert find_uncovered_queries() == []
+
+
+def test_missing_index_is_reported():
+    specs = {name: indexes for name, indexes in INDEX_SPECS.items() if name != "suppliers"}
+    
+    assert find_uncovered_queries(specs) == [{"collection": "suppliers", "filter_fields": ["country"]}]
+
+
+def test_only_index_prefixes_cover_a_query():
+    specs = {"orders": [IndexModel([("created_at", ASCENDING), ("status", ASCENDING)], name="created_at_1_status_1")]}
+    shapes = [("orders", ("status",)), ("orders", ("status", "created_at")), ("orders", ("_id",))]
+    
+    assert find_uncovered_queries(specs, shapes) == [{"collection": "orders", "filter_fields": ["status"]}]
+
+
+def test_query_shapes_only_name_indexed_or_unfiltered_collections():
+    for collection, fields in QUERY_SHAPES:
+        assert collection in INDEX_SPECS or not fields
+
+
+def test_ensure_indexes_is_idempotent():
+    db = FakeDatabase()
+    
+    first = asyncio.run(ensure_indexes(db))
+    second = asyncio.run(ensure_indexes(db))
+    
+    assert first == second
+    assert set(first) == set(INDEX_SPECS)
+    assert db.indexes["market_data"]["meta_product_id_1_meta_market_1_timestamp_-1"]["key"] == {
+        "meta.product_id": 1, "meta.market": 1, "timestamp": -1
+    }
+    assert db.commands == []
+
+
+def test_changed_ttl_is_applied_in_place():
+    db = FakeDatabase()
+    asyncio.run(ensure_indexes(db))
+    db.indexes["predictions"]["created_at_ttl"]["expireAfterSeconds"] = 60
+    
+    applied = asyncio.run(ensure_indexes(db))
+    
+    assert applied["predictions"] == ["product_id_1_created_at_-1", "created_at_ttl"]
+    assert db.commands == [{
+        "collMod": "predictions",
+        "index": {"name": "created_at_ttl", "expireAfterSeconds": INDEX_SPECS["predictions"][1].document["expireAfterSeconds"]}
+    }]
+    assert db.indexes["predictions"]["created_at_ttl"]["expireAfterSeconds"] == 90 * 24 * 3600
@@ -0,0 +1,340 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+import pytest
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from src.database.market_data import (
+    build_ohlc_pipeline,
+    ensure_market_data_collection,
+    to_time_series_document
+)
+from src.database.market_data_migration import (
+    MIGRATION_ID,
+    MigrationLocked,
+    acquire_migration_lock,
+    migrate_market_data
+)
+from src.services.market_analyzer import MarketAnalyzer
+
+
+def _field(document: Dict[str, Any], path: str) -> Any:
+    for part in path.split("."):
+        document = (document or {}).get(part)
+    return document
+
+
+def _matches(document: Dict[str, Any], query: Dict[str, Any]) -> bool:
+    for path, condition in query.items():
+        if path == "$or":
+            if not any(_matches(document, branch) for branch in condition):
+                return False
+            continue
+        value = _field(document, path)
+        if not isinstance(condition, dict):
+            if value != condition:
+                return False
+            continue
+        for operator, operand in condition.items():
+            if operator == "$in" and value not in operand:
+                return False
+            if operator == "$gt" and not (value is not None and value > operand):
+                return False
+            if operator == "$lt" and not (value is not None and value < operand):
+                return False
+            if operator == "$gte" and not (value is not None and value >= operand):
+                return False
+            if operator == "$lte" and not (value is not None and value <= operand):
+                return False
+    return True
+
+
+class FakeCursor:
+    def __init__(self, documents: List[Dict[str, Any]]):
+        self.documents = documents
+    
+    def sort(self, field: str, direction: int):
+        self.documents = sorted(self.documents, key=lambda document: document[field], reverse=direction < 0)
+        return self
+    
+    def limit(self, count: int):
+        self.documents = self.documents[:count]
+        return self
+    
+    async def to_list(self, length=None):
+        return list(self.documents)
+
+
+class FakeResult:
+    def __init__(self, matched_count: int):
+        self.matched_count = matched_count
+
+
+class FakeCollection:
+    """Just enough of a motor collection for the migration job"""
+    
+    def __init__(self, db: "FakeDatabase", name: str, kind: str = "collection"):
+        self.db = db
+        self.name = name
+        self.kind = kind
+        self.documents: List[Dict[str, Any]] = []
+        self.fail_inserts = 0
+        self.reject = None  # predicate for documents the server refuses
+    
+    def find(self, query=None, projection=None):
+        return FakeCursor([dict(document) for document in self.documents if _matches(document, query or {})])
+    
+    async def insert_many(self, documents, ordered=True):
+        if self.fail_inserts:
+            self.fail_inserts -= 1
+            self.documents.extend(dict(document) for document in documents)
+            raise ConnectionError("connection reset after the write")
+        errors = []
+        for index, document in enumerate(documents):
+            if self.reject and self.reject(document):
+                errors.append({"index": index, "code": 121, "errmsg": "validation failed"})
+            else:
+                self.documents.append(dict(document))
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "writeConcernErrors": []})
+    
+    async def delete_many(self, query):
+        self.documents = [document for document in self.documents if not _matches(document, query)]
+    
+    async def count_documents(self, query):
+        return len(self.find(query).documents)
+    
+    async def update_one(self, query, update):
+        for document in self.documents:
+            if _matches(document, query):
+                document.update(update["$set"])
+                return FakeResult(1)
+        return FakeResult(0)
+    
+    async def find_one_and_update(self, query, update, upsert=False, return_document=None):
+        for document in self.documents:
+            if _matches(document, query):
+                document.update(update["$set"])
+                return dict(document)
+        if any(document["_id"] == query["_id"] for document in self.documents):
+            raise DuplicateKeyError("duplicate key")
+        document = {"_id": query["_id"], **update["$set"]}
+        self.documents.append(document)
+        return dict(document)
+    
+    async def rename(self, name: str):
+        self.db.collections[name] = self.db.collections.pop(self.name)
+        self.name = name
+    
+    async def drop(self):
+        self.db.collections.pop(self.name, None)
+
+
+class FakeListing:
+    def __init__(self, infos):
+        self.infos = infos
+    
+    async def to_list(self, length=None):
+        return self.infos
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.collections: Dict[str, FakeCollection] = {}
+    
+    def __getitem__(self, name: str) -> FakeCollection:
+        if name not in self.collections:
+            self.collections[name] = FakeCollection(self, name)
+        return self.collections[name]
+    
+    async def list_collections(self, filter=None):
+        infos = [{"name": name, "type": collection.kind} for name, collection in self.collections.items()]
+        return FakeListing([info for info in infos if _matches(info, filter or {})])
+    
+    async def create_collection(self, name, timeseries=None):
+        self.collections[name] = FakeCollection(self, name, "timeseries" if timeseries else "collection")
+
+
+def legacy_database(count: int) -> FakeDatabase:
+    db = FakeDatabase()
+    db["market_data"].documents = [
+        {
+            "_id": index,
+            "product_id": "p1",
+            "market": "US",
+            "price": float(index),
+            "timestamp": datetime(2024, 1, 1) + timedelta(hours=index)
+        }
+        for index in range(count)
+    ]
+    return db
+
+
+def test_ohlc_pipeline_reduces_on_the_server():
+    start, end = datetime(2024, 1, 1), datetime(2024, 2, 1)
+    pipeline = build_ohlc_pipeline("p1", "4h", market="US", start=start, end=end)
+    
+    assert pipeline[0] == {"$match": {
+        "meta.product_id": "p1",
+        "meta.market": "US",
+        "timestamp": {"$gte": start, "$lt": end}
+    }}
+    group = pipeline[2]["$group"]
+    assert group["_id"]["period_start"] == {"$dateTrunc": {"date": "$timestamp", "unit": "hour", "binSize": 4}}
+    assert group["open"] == {"$first": "$price"} and group["close"] == {"$last": "$price"}
+    assert group["volatility"] == {"$stdDevPop": "$price"}
+    assert pipeline[-1]["$project"]["_id"] == 0
+    
+    with pytest.raises(ValueError):
+        build_ohlc_pipeline("p1", "3x")
+
+
+def test_time_series_document_keeps_or_rejects_timestamps():
+    document = to_time_series_document({"product_id": "p1", "market": "US", "price": 1.0, "timestamp": "2024-01-01T00:00:00Z"})
+    assert document["meta"] == {"product_id": "p1", "market": "US"}
+    assert document["timestamp"] == datetime(2024, 1, 1, tzinfo=timezone.utc)
+    assert "product_id" not in document
+    
+    # New ticks are stamped; stored ticks are never re-dated
+    assert isinstance(to_time_series_document({"price": 1.0})["timestamp"], datetime)
+    with pytest.raises(ValueError):
+        to_time_series_document({"price": 1.0}, stamp_missing=False)
+    with pytest.raises(ValueError):
+        to_time_series_document({"price": 1.0, "timestamp": "yesterday"})
+
+
+def test_connect_leaves_a_plain_collection_for_the_migration_job():
+    db = legacy_database(3)
+    
+    assert asyncio.run(ensure_market_data_collection(db)) is False
+    assert db.collections["market_data"].kind == "collection"
+    assert len(db["market_data"].documents) == 3
+    
+    empty = FakeDatabase()
+    assert asyncio.run(ensure_market_data_collection(empty)) is True
+    assert empty.collections["market_data"].kind == "timeseries"
+
+
+def test_migration_moves_every_document_once():
+    db = legacy_database(25)
+    
+    stats = asyncio.run(migrate_market_data(db, batch_size=10))
+    
+    assert stats == {"migrated": 25, "rejected": 0, "recovered": 0, "remaining": 0, "completed": True}
+    assert db.collections["market_data"].kind == "timeseries"
+    assert "market_data_legacy" not in db.collections
+    migrated = db["market_data"].documents
+    assert sorted(document["_id"] for document in migrated) == list(range(25))
+    assert all(document["meta"] == {"product_id": "p1", "market": "US"} for document in migrated)
+    assert db["migrations"].documents[0]["owner"] is None
+
+
+def test_migration_keeps_documents_it_cannot_move():
+    db = legacy_database(6)
+    db["market_data"].documents[1]["timestamp"] = "not a date"
+    del db["market_data"].documents[2]["timestamp"]
+    
+    stats = asyncio.run(migrate_market_data(db, batch_size=4))
+    
+    assert stats["migrated"] == 4 and stats["rejected"] == 2
+    assert stats["remaining"] == 2 and stats["completed"] is False
+    assert sorted(document["_id"] for document in db["market_data_legacy"].documents) == [1, 2]
+    assert all(isinstance(document["timestamp"], datetime) for document in db["market_data"].documents)
+    
+    # A rerun finds nothing new to move and does not duplicate anything
+    stats = asyncio.run(migrate_market_data(db, batch_size=4))
+    assert stats["migrated"] == 0 and stats["rejected"] == 2
+    assert len(db["market_data"].documents) == 4
+
+
+def test_migration_only_deletes_confirmed_inserts():
+    db = legacy_database(5)
+    
+    async def run():
+        await db["market_data"].rename("market_data_legacy")
+        await db.create_collection("market_data", timeseries={"timeField": "timestamp"})
+        db["market_data"].reject = lambda document: document["_id"] == 3
+        return await migrate_market_data(db)
+        
+    stats = asyncio.run(run())
+    
+    assert stats["migrated"] == 4 and stats["rejected"] == 1
+    assert [document["_id"] for document in db["market_data_legacy"].documents] == [3]
+
+
+def test_interrupted_batch_is_resolved_without_duplicates():
+    db = legacy_database(8)
+    
+    async def interrupted():
+        await db["market_data"].rename("market_data_legacy")
+        await db.create_collection("market_data", timeseries={"timeField": "timestamp"})
+        db["market_data"].fail_inserts = 1
+        await migrate_market_data(db, batch_size=5)
+        
+    with pytest.raises(ConnectionError):
+        asyncio.run(interrupted())
+    # The batch reached market_data but is still in the legacy collection
+    assert len(db["market_data"].documents) == 5
+    assert len(db["market_data_legacy"].documents) == 8
+    
+    stats = asyncio.run(migrate_market_data(db, batch_size=5))
+    
+    assert stats["recovered"] == 5 and stats["migrated"] == 3
+    assert sorted(document["_id"] for document in db["market_data"].documents) == list(range(8))
+    assert "market_data_legacy" not in db.collections
+
+
+def test_migration_lease_keeps_concurrent_runs_out():
+    db = legacy_database(3)
+    
+    async def run():
+        assert await acquire_migration_lock(db, "other-worker", lease=60) is not None
+        with pytest.raises(MigrationLocked):
+            await migrate_market_data(db)
+            
+        # An expired lease is taken over
+        db["migrations"].documents[0]["expires_at"] = datetime.utcnow() - timedelta(seconds=1)
+        return await migrate_market_data(db)
+        
+    stats = asyncio.run(run())
+    assert stats["migrated"] == 3
+    assert db["migrations"].documents[0]["_id"] == MIGRATION_ID
+
+
+class OhlcSource:
+    def __init__(self, rows: List[Dict[str, Any]]):
+        self.rows = rows
+        self.calls: List[Any] = []
+    
+    async def get_market_ohlc(self, product_id, interval="1d", market=None, start=None, end=None):
+        self.calls.append((product_id, interval, start))
+        return self.rows
+
+
+def test_price_trends_come_from_daily_ohlc():
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    rows = [
+        {
+            "market": "US",
+            "period_start": today - timedelta(days=29 - day),
+            "open": 100.0 + day,
+            "close": 101.0 + day,
+            "relative_volatility": 0.02
+        }
+        for day in range(30)
+    ]
+    source = OhlcSource(rows)
+    analyzer = MarketAnalyzer(source, redis_client=None)
+    
+    trends = asyncio.run(analyzer._generate_price_trends("p1", rows))
+    
+    # Last 7 days: open 123 -> close 130
+    assert trends["short_term"]["change_percentage"] == pytest.approx(5.7, abs=0.05)
+    assert trends["short_term"]["trend"] == "increasing"
+    assert trends["medium_term"]["change_percentage"] == pytest.approx(30.0, abs=0.05)
+    assert trends["long_term"]["confidence"] < trends["medium_term"]["confidence"]
+    assert analyzer._market_volatility("US", rows) == pytest.approx(0.02)
+    
+    # No history: the simulated values are kept
+    assert asyncio.run(analyzer._generate_price_trends("p1", []))["short_term"]["change_percentage"] == 5.2
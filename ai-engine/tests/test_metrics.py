@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+from src.database.redis_client import CACHE_METRIC_PREFIXES, MockRedisPool, RedisClient
+from src.utils.metrics import CacheMetrics, LatencyHistogram
+
+
+def test_histogram_percentiles_use_bucket_bounds():
+    histogram = LatencyHistogram(buckets=(1, 10, 100))
+    for elapsed_ms in (0.5, 0.7, 5, 50, 500):
+        histogram.observe(elapsed_ms)
+        
+    assert histogram.percentile(0.4) == 1
+    assert histogram.percentile(0.6) == 10
+    assert histogram.percentile(1.0) == 500
+    snapshot = histogram.snapshot()
+    assert snapshot["buckets"] == {"le_1": 2, "le_10": 3, "le_100": 4, "le_inf": 5}
+    assert snapshot["avg_ms"] == pytest.approx(111.24)
+    assert LatencyHistogram().percentile(0.5) is None
+
+
+def test_keys_are_grouped_by_longest_known_prefix():
+    metrics = CacheMetrics(("logistics_", "logistics_lane_"))
+    
+    assert metrics.prefix_for("logistics_lane_US_EU") == "logistics_lane_"
+    assert metrics.prefix_for("logistics_route_1") == "logistics_"
+    assert metrics.prefix_for("session:abc") == "session:"
+    assert metrics.prefix_for("plain") == "other"
+
+
+def test_metric_prefixes_match_service_cache_keys():
+    assert "logistics_lane_" in CACHE_METRIC_PREFIXES
+    assert "logistics_optimization_" not in CACHE_METRIC_PREFIXES
+
+
+def test_client_counts_hits_misses_and_bytes_per_prefix():
+    client = RedisClient()
+    client.redis_pool = MockRedisPool(codec=client.codec)
+    
+    async def run():
+        await client.set("trade_analysis_tea_IN_US", {"score": 0.9})
+        await client.get("trade_analysis_tea_IN_US")
+        await client.get("trade_analysis_coffee_IN_US")
+        await client.delete("trade_analysis_tea_IN_US")
+        await client.get("intelligence_p1")
+        
+    asyncio.run(run())
+    metrics = client.get_cache_metrics()
+    rows = {row["prefix"]: row for row in metrics["prefixes"]}
+    
+    assert metrics["backend"] == "mock" and metrics["degraded"] is True
+    trade = rows["trade_analysis_"]
+    assert (trade["hits"], trade["misses"], trade["writes"], trade["deletes"]) == (1, 1, 1, 1)
+    assert trade["hit_ratio"] == 0.5
+    assert trade["bytes_written"] > 0 and trade["bytes_read"] == trade["bytes_written"]
+    assert trade["read_latency"]["count"] == 2
+    assert rows["intelligence_"]["misses"] == 1
+    
+    client.metrics.reset()
+    assert client.get_cache_metrics()["prefixes"] == []
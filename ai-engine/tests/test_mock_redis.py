@@ -0,0 +1,89 @@
+import asyncio
+import time
+
+import pytest
+
+from src.database import redis_client as redis_client_module
+from src.database.redis_client import MockRedisPool
+
+
+class FakeClock:
+    """Stands in for the time module so TTLs can expire without sleeping"""
+    
+    def __init__(self):
+        self.now = 1000.0
+    
+    def monotonic(self) -> float:
+        return self.now
+    
+    def __getattr__(self, name):
+        return getattr(time, name)
+
+
+@pytest.fixture
+def clock(monkeypatch) -> FakeClock:
+    clock = FakeClock()
+    monkeypatch.setattr(redis_client_module, "time", clock)
+    return clock
+
+
+def test_values_round_trip_through_the_codec():
+    pool = MockRedisPool()
+    asyncio.run(pool.set("key", {"a": [1, 2]}))
+    
+    assert asyncio.run(pool.get("key")) == {"a": [1, 2]}
+    assert isinstance(pool.data["key"], bytes)
+
+
+def test_keys_expire_lazily_on_access(clock):
+    pool = MockRedisPool()
+    asyncio.run(pool.set("short", "v", expire=10))
+    asyncio.run(pool.set("forever", "v"))
+    
+    clock.now += 9
+    assert asyncio.run(pool.get("short")) == "v"
+    clock.now += 2
+    assert asyncio.run(pool.get("short")) is None
+    assert asyncio.run(pool.get("forever")) == "v"
+    assert pool.stats["expirations"] == 1
+    assert "short" not in pool.sizes
+
+
+def test_set_without_ttl_clears_the_expiry(clock):
+    pool = MockRedisPool()
+    asyncio.run(pool.set("key", "v", expire=10))
+    asyncio.run(pool.set("key", "v2"))
+    
+    clock.now += 60
+    assert asyncio.run(pool.get("key")) == "v2"
+
+
+def test_sweep_removes_expired_keys(clock):
+    pool = MockRedisPool()
+    for index in range(5):
+        asyncio.run(pool.set(f"key{index}", "v", expire=index + 1))
+        
+    clock.now += 3
+    assert pool.sweep_expired() == 3
+    assert sorted(pool.data) == ["key3", "key4"]
+
+
+def test_evicts_least_recently_used_over_entry_limit():
+    pool = MockRedisPool(max_entries=3)
+    for key in ("a", "b", "c"):
+        asyncio.run(pool.set(key, key))
+    asyncio.run(pool.get("a"))  # a becomes most recently used
+    asyncio.run(pool.set("d", "d"))
+    
+    assert list(pool.data) == ["c", "a", "d"]
+    assert pool.stats["evictions"] == 1
+
+
+def test_evicts_over_byte_budget():
+    pool = MockRedisPool(max_bytes=100)
+    for index in range(5):
+        asyncio.run(pool.set(f"k{index}", "x" * 30))
+        
+    assert pool.current_bytes <= 100
+    assert list(pool.data) == ["k2", "k3", "k4"]
+    assert pool.current_bytes == sum(pool.sizes.values())
@@ -0,0 +1,118 @@
+import asyncio
+from typing import Any, Dict, List
+
+import pytest
+from pymongo import monitoring
+
+from src.database.mongodb_client import MongoDBClient
+from src.database.pool_monitor import PoolMonitor
+
+PRIMARY = ("db-1", 27017)
+SECONDARY = ("db-2", 27017)
+
+
+def check_out(monitor: PoolMonitor, address, connection_id: int, duration: float = 0.002):
+    monitor.connection_check_out_started(monitoring.ConnectionCheckOutStartedEvent(address))
+    monitor.connection_checked_out(monitoring.ConnectionCheckedOutEvent(address, connection_id, duration))
+
+
+def test_checkouts_saturation_and_waits_per_server():
+    monitor = PoolMonitor(max_pool_size=2)
+    for connection_id in (1, 2):
+        monitor.connection_created(monitoring.ConnectionCreatedEvent(PRIMARY, connection_id))
+        check_out(monitor, PRIMARY, connection_id, duration=0.001 * connection_id)
+    check_out(monitor, SECONDARY, 3)
+    
+    # A third checkout on the full primary pool waits and then times out
+    monitor.connection_check_out_started(monitoring.ConnectionCheckOutStartedEvent(PRIMARY))
+    monitor.connection_check_out_failed(
+        monitoring.ConnectionCheckOutFailedEvent(PRIMARY, monitoring.ConnectionCheckOutFailedReason.TIMEOUT, 0.05)
+    )
+    monitor.connection_checked_in(monitoring.ConnectionCheckedInEvent(PRIMARY, 1))
+    stats = monitor.snapshot()
+    
+    assert stats["checkouts"] == 3
+    assert stats["saturated_checkouts"] == 1
+    assert (stats["failed_checkouts"], stats["pool_timeouts"]) == (1, 1)
+    assert stats["peak_in_use"] == 2
+    assert stats["in_use"] == 2 and stats["open"] == 2
+    assert stats["saturation"] == 0.5
+    assert stats["max_wait_ms"] == pytest.approx(2.0)
+    assert stats["avg_wait_ms"] == pytest.approx(5.0 / 3, abs=0.001)
+    assert stats["servers"] == {"db-1:27017": {"in_use": 1, "open": 2}, "db-2:27017": {"in_use": 1, "open": 0}}
+    assert monitor.checkout_started == {}
+
+
+def test_closed_pools_and_clears():
+    monitor = PoolMonitor(max_pool_size=4)
+    check_out(monitor, PRIMARY, 1)
+    monitor.pool_cleared(monitoring.PoolClearedEvent(PRIMARY))
+    monitor.pool_closed(monitoring.PoolClosedEvent(PRIMARY))
+    stats = monitor.snapshot()
+    
+    assert stats["pool_clears"] == 1
+    assert stats["servers"] == {} and stats["saturation"] == 0
+
+
+class FakeCursor:
+    def __init__(self, documents: List[Dict[str, Any]]):
+        self.documents = documents
+    
+    async def to_list(self, length=None):
+        return list(self.documents)
+
+
+class FakeCollection:
+    def __init__(self, name: str, read_preference: Any, reads: List[tuple]):
+        self.name = name
+        self.read_preference = read_preference
+        self.reads = reads
+    
+    def find(self, query: Dict[str, Any]) -> FakeCursor:
+        self.reads.append((self.name, getattr(self.read_preference, "mongos_mode", "primary")))
+        return FakeCursor([{"_id": 1}])
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.reads: List[tuple] = []
+    
+    def __getitem__(self, name: str) -> FakeCollection:
+        return FakeCollection(name, None, self.reads)
+    
+    def get_collection(self, name: str, read_preference: Any = None) -> FakeCollection:
+        return FakeCollection(name, read_preference, self.reads)
+
+
+def test_reads_are_routed_by_method():
+    client = MongoDBClient(read_preferences={"get_market_data": "nearest"}, max_staleness=120)
+    client.db = FakeDatabase()
+    
+    async def run():
+        await client.get_all_products()
+        await client.get_market_data("p1")
+        
+    asyncio.run(run())
+    
+    assert client.db.reads == [("products", "secondaryPreferred"), ("market_data", "nearest")]
+    assert client.read_preferences["get_market_data"].max_staleness == 120
+
+
+def test_unknown_read_preference_is_rejected():
+    with pytest.raises(ValueError):
+        MongoDBClient(read_preferences={"get_market_data": "anywhere"})
+
+
+def test_pool_stats_include_configuration_and_monitor_counters():
+    client = MongoDBClient(max_pool_size=8, min_pool_size=2, compressors="zstd")
+    assert client.get_pool_stats()["backend"] == "disconnected"
+    
+    client.client = object()
+    check_out(client.pool_monitor, PRIMARY, 1)
+    stats = client.get_pool_stats()
+    
+    assert (stats["backend"], stats["max_pool_size"], stats["min_pool_size"]) == ("mongodb", 8, 2)
+    assert stats["compressors"] == "zstd"
+    assert stats["read_preferences"]["get_predictions"] == "secondaryPreferred"
+    assert "get_product" not in stats["read_preferences"]
+    assert stats["checkouts"] == 1 and stats["saturation"] == 0.125
@@ -0,0 +1,75 @@
+import numpy as np
+
+from src.models.prediction_memo import PredictionMemo
+
+
+class Counter:
+    def __init__(self):
+        self.rows = 0
+    
+    def __call__(self, features):
+        self.rows += len(features)
+        return features.sum(axis=1)
+
+
+def test_repeat_rows_are_served_from_the_memo():
+    memo, compute = PredictionMemo(), Counter()
+    memo.reset("v1", np.ones(2))
+    features = np.array([[1.0, 2.0], [3.0, 4.0]])
+    
+    np.testing.assert_array_equal(memo.predict(features, compute), [3.0, 7.0])
+    np.testing.assert_array_equal(memo.predict(features[::-1], compute), [7.0, 3.0])
+    assert compute.rows == 2
+    assert memo.get_stats()["hit_ratio"] == 0.5
+
+
+def test_duplicate_rows_in_a_batch_are_computed_once():
+    memo, compute = PredictionMemo(), Counter()
+    memo.reset("v1")
+    
+    result = memo.predict(np.array([[1.0, 1.0], [2.0, 2.0], [1.0, 1.0]]), compute)
+    np.testing.assert_array_equal(result, [2.0, 4.0, 2.0])
+    assert compute.rows == 2
+
+
+def test_rows_within_resolution_share_an_entry():
+    memo, compute = PredictionMemo(resolution=1e-3), Counter()
+    memo.reset("v1", feature_scale=np.array([100.0, 1.0]))
+    
+    memo.predict(np.array([[50.0, 0.5]]), compute)
+    memo.predict(np.array([[50.01, 0.5]]), compute)  # 1e-4 standard deviations away
+    memo.predict(np.array([[51.0, 0.5]]), compute)
+    assert compute.rows == 2
+
+
+def test_reset_invalidates_entries_of_the_previous_version():
+    memo, compute = PredictionMemo(), Counter()
+    memo.reset("v1")
+    memo.predict(np.array([[1.0, 2.0]]), compute)
+    memo.reset("v2")
+    memo.predict(np.array([[1.0, 2.0]]), compute)
+    
+    assert compute.rows == 2
+    assert memo.get_stats()["model_version"] == "v2"
+    assert memo.stats["invalidations"] == 1
+
+
+def test_least_recently_used_entries_are_evicted():
+    memo, compute = PredictionMemo(max_entries=2), Counter()
+    memo.reset("v1")
+    for value in (1.0, 2.0, 1.0, 3.0):
+        memo.predict(np.array([[value]]), compute)
+        
+    assert memo.stats["evictions"] == 1
+    memo.predict(np.array([[1.0]]), compute)
+    assert compute.rows == 3
+
+
+def test_disabled_memo_computes_every_row():
+    memo, compute = PredictionMemo(max_entries=0), Counter()
+    memo.reset("v1")
+    memo.predict(np.array([[1.0]]), compute)
+    memo.predict(np.array([[1.0]]), compute)
+    
+    assert compute.rows == 2
+    assert not memo.entries
@@ -0,0 +1,84 @@
+import asyncio
+import threading
+
+import numpy as np
+import pytest
+
+from src.models.prediction_models import PricePredictionModel
+
+
+@pytest.fixture(scope="module")
+def registry_dir(tmp_path_factory):
+    root = str(tmp_path_factory.mktemp("registry"))
+    trainer = PricePredictionModel()
+    trainer.registry.root = root
+    trainer.fit()
+    return root
+
+
+@pytest.fixture
+def model(registry_dir) -> PricePredictionModel:
+    model = PricePredictionModel()
+    model.registry.root = registry_dir
+    model.version_watch.registry = model.registry
+    asyncio.run(model.load_model())
+    return model
+
+
+def test_large_batches_never_load_the_forest_on_the_event_loop(model):
+    loads = []
+    load = model.registry.load
+    
+    def recording_load(*args, **kwargs):
+        loads.append((kwargs.get("artifacts"), threading.current_thread() is threading.main_thread()))
+        return load(*args, **kwargs)
+        
+    model.registry.load = recording_load
+    product_ids = [f"sku-{index}" for index in range(model.compiled_max_rows + 44)]
+    
+    async def run():
+        first = await model.predict_batch(product_ids)
+        # The array engine served the batch while the forest loads off the loop
+        assert model.model is None
+        await model.estimator_task
+        model.prediction_memo.reset(model.model_version, model.scaler.scale_)
+        second = await model.predict_batch(product_ids)
+        return first, second
+        
+    first, second = asyncio.run(run())
+    
+    assert loads == [(("model",), False)]
+    assert model.model is not None
+    for product_id in product_ids:
+        assert first[product_id]["predictions"]["price_3_days"]["value"] == pytest.approx(
+            second[product_id]["predictions"]["price_3_days"]["value"], abs=0.01
+        )
+
+
+def test_small_batches_use_the_array_engine_only(model):
+    asyncio.run(model.predict_batch(["sku-1", "sku-2"]))
+    
+    assert model.estimator_task is None
+    assert model.model is None
+    assert isinstance(model._predict_prices(np.array([[2500.0, 0.5, 0.8, 1.0, 0.2]])), np.ndarray)
+
+
+def test_batch_matches_per_item_predictions(model):
+    product_ids = ["sku-1", "sku-2", "sku-3"]
+    
+    async def run():
+        batch = await model.predict_batch(product_ids)
+        single = {product_id: await model.predict(product_id) for product_id in product_ids}
+        return batch, single
+        
+    batch, single = asyncio.run(run())
+    
+    assert list(batch) == product_ids
+    for product_id in product_ids:
+        assert set(batch[product_id]["predictions"]) == {"price_3_days", "price_7_days", "price_14_days", "price_30_days"}
+        for horizon, prediction in single[product_id]["predictions"].items():
+            assert batch[product_id]["predictions"][horizon]["value"] == prediction["value"]
+            assert batch[product_id]["predictions"][horizon]["confidence"] == pytest.approx(prediction["confidence"])
+        assert batch[product_id]["model_version"] == model.model_version
+    assert asyncio.run(model.predict_batch([])) == {}
+    assert list(asyncio.run(model.predict_batch(["sku-1"], horizons=[30]))["sku-1"]["predictions"]) == ["price_30_days"]
@@ -0,0 +1,78 @@
+import asyncio
+
+from src.database.product_cache import ProductCache
+
+
+class Loader:
+    def __init__(self, products, delay: float = 0.0):
+        self.products = products
+        self.delay = delay
+        self.calls = []
+    
+    async def __call__(self, product_ids):
+        self.calls.append(list(product_ids))
+        # Read now, return later: like a query that sees the data as of its start
+        loaded = {product_id: dict(self.products[product_id]) for product_id in product_ids if product_id in self.products}
+        await asyncio.sleep(self.delay)
+        return loaded
+
+
+def test_misses_are_loaded_once_and_cached():
+    loader = Loader({"p1": {"name": "pepper"}, "p2": {"name": "cumin"}})
+    cache = ProductCache(loader)
+    
+    async def run():
+        first = await cache.get_many(["p1", "p2", "p3"])
+        second = await cache.get_many(["p1", "p2", "p3"])
+        return first, second
+    
+    first, second = asyncio.run(run())
+    assert first == second == {"p1": {"name": "pepper"}, "p2": {"name": "cumin"}}
+    assert loader.calls == [["p1", "p2", "p3"]]  # p3 is cached as missing too
+
+
+def test_concurrent_requests_share_one_load():
+    loader = Loader({"p1": {"name": "pepper"}}, delay=0.02)
+    cache = ProductCache(loader)
+    
+    async def run():
+        return await asyncio.gather(*(cache.get("p1") for _ in range(5)))
+    
+    assert asyncio.run(run()) == [{"name": "pepper"}] * 5
+    assert len(loader.calls) == 1
+    assert cache.stats["coalesced"] == 4
+
+
+def test_invalidate_drops_the_entry():
+    products = {"p1": {"price": 1}}
+    loader = Loader(products)
+    cache = ProductCache(loader)
+    
+    async def run():
+        await cache.get("p1")
+        products["p1"] = {"price": 2}
+        cache.invalidate("p1")
+        return await cache.get("p1")
+    
+    assert asyncio.run(run()) == {"price": 2}
+    assert len(loader.calls) == 2
+
+
+def test_load_started_before_invalidation_is_not_cached():
+    products = {"p1": {"price": 1}}
+    loader = Loader(products, delay=0.02)
+    cache = ProductCache(loader)
+    
+    async def run():
+        loading = asyncio.create_task(cache.get("p1"))
+        await asyncio.sleep(0.005)
+        # An update lands while the old document is being read
+        products["p1"] = {"price": 2}
+        cache.invalidate("p1")
+        stale = await loading
+        return stale, await cache.get("p1")
+    
+    stale, fresh = asyncio.run(run())
+    assert stale == {"price": 1}
+    assert fresh == {"price": 2}
+    assert len(loader.calls) == 2
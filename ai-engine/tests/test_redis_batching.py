@@ -0,0 +1,120 @@
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from src.database.redis_client import RedisClient
+
+
+class RecordingPipeline:
+    def __init__(self, server: "RecordingRedis"):
+        self.server = server
+        self.commands: List[tuple] = []
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        return False
+    
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.commands.append((name, args, kwargs))
+    
+    async def execute(self, raise_on_error: bool = True) -> List[Any]:
+        self.server.round_trips += 1
+        return [await getattr(self.server, name)(*args, **kwargs) for name, args, kwargs in self.commands]
+
+
+class RecordingRedis:
+    """Server stand-in that counts round trips and remembers TTLs"""
+    
+    def __init__(self):
+        self.store: Dict[str, bytes] = {}
+        self.ttls: Dict[str, Optional[int]] = {}
+        self.round_trips = 0
+    
+    def pipeline(self, transaction: bool = True) -> RecordingPipeline:
+        return RecordingPipeline(self)
+    
+    async def mget(self, keys):
+        self.round_trips += 1
+        return [self.store.get(key) for key in keys]
+    
+    async def get(self, key):
+        return self.store.get(key)
+    
+    async def set(self, key, value):
+        self.store[key], self.ttls[key] = value, None
+        return True
+    
+    async def setex(self, key, ttl, value):
+        self.store[key], self.ttls[key] = value, ttl
+        return True
+    
+    async def delete(self, key):
+        return int(self.store.pop(key, None) is not None)
+    
+    async def exists(self, key):
+        return int(key in self.store)
+    
+    async def publish(self, channel, message):
+        return 0
+
+
+def make_client() -> RedisClient:
+    client = RedisClient(local_cache_prefixes=())
+    client.redis = RecordingRedis()
+    return client
+
+
+def test_set_many_and_get_many_use_one_round_trip_each():
+    client = make_client()
+    
+    async def run():
+        stored = await client.set_many({"a": {"n": 1}, "b": [1, 2], "c": "text"}, expire={"a": 60})
+        values = await client.get_many(["a", "b", "c", "missing"])
+        return stored, values
+        
+    stored, values = asyncio.run(run())
+    
+    assert stored is True
+    assert values == {"a": {"n": 1}, "b": [1, 2], "c": "text", "missing": None}
+    assert client.redis.round_trips == 2
+    assert client.redis.ttls == {"a": 60, "b": None, "c": None}
+
+
+def test_set_many_applies_one_ttl_to_every_key():
+    client = make_client()
+    asyncio.run(client.set_many({"a": 1, "b": 2}, expire=30))
+    assert client.redis.ttls == {"a": 30, "b": 30}
+
+
+def test_empty_batches_skip_the_server():
+    client = make_client()
+    
+    async def run():
+        return await client.get_many([]), await client.set_many({})
+        
+    assert asyncio.run(run()) == ({}, True)
+    assert client.redis.round_trips == 0
+
+
+def test_pipeline_decodes_results_in_order():
+    client = make_client()
+    
+    async def run():
+        async with client.pipeline() as pipe:
+            pipe.set("a", {"n": 1}, expire=10)
+            pipe.get("a")
+            pipe.exists("b")
+            pipe.delete("a")
+        return pipe.results
+        
+    assert asyncio.run(run()) == [True, {"n": 1}, False, True]
+    assert client.redis.round_trips == 1
+
+
+def test_batch_calls_on_the_mock_pool(redis_client):
+    async def run():
+        await redis_client.set_many({"x": 1, "y": {"z": 2}})
+        return await redis_client.get_many(["x", "y", "w"])
+        
+    assert asyncio.run(run()) == {"x": 1, "y": {"z": 2}, "w": None}
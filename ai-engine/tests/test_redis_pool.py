@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+from redis import asyncio as aioredis
+
+from src.database.redis_client import InstrumentedConnectionPool, MockRedisPool, RedisClient
+
+
+class IdleConnection(aioredis.Connection):
+    """Connection that never touches a socket; checkouts exercise only the pool"""
+    
+    async def connect(self):
+        pass
+    
+    async def can_read(self, timeout: float = 0):
+        return False
+    
+    async def disconnect(self, nowait: bool = False):
+        pass
+
+
+def make_pool(max_connections: int = 2, timeout: float = 0.05) -> InstrumentedConnectionPool:
+    return InstrumentedConnectionPool(
+        connection_class=IdleConnection, max_connections=max_connections, timeout=timeout
+    )
+
+
+def test_checkouts_beyond_the_limit_time_out():
+    pool = make_pool()
+    
+    async def run():
+        held = [await pool.get_connection(), await pool.get_connection()]
+        with pytest.raises(aioredis.ConnectionError):
+            await pool.get_connection()
+        return held
+        
+    held = asyncio.run(run())
+    
+    assert len({id(connection) for connection in held}) == 2
+    assert pool.stats["checkouts"] == 2
+    assert pool.stats["saturated_checkouts"] == 1
+    assert pool.stats["timeouts"] == 1
+    assert pool.stats["peak_in_use"] == 2
+
+
+def test_waiting_caller_gets_a_released_connection():
+    pool = make_pool(max_connections=1, timeout=1.0)
+    
+    async def run():
+        first = await pool.get_connection()
+        
+        async def release_later():
+            await asyncio.sleep(0.05)
+            await pool.release(first)
+            
+        asyncio.create_task(release_later())
+        second = await pool.get_connection()
+        return first, second
+        
+    first, second = asyncio.run(run())
+    
+    # The connection is reused rather than a second one opened
+    assert second is first
+    assert pool.stats["timeouts"] == 0
+    assert pool.stats["max_wait_ms"] >= 40
+
+
+def test_pool_stats_report_saturation():
+    client = RedisClient(max_connections=2)
+    client.redis_pool = make_pool()
+    
+    async def run():
+        for _ in range(2):
+            await client.redis_pool.get_connection()
+        with pytest.raises(aioredis.ConnectionError):
+            await client.redis_pool.get_connection()
+            
+    asyncio.run(run())
+    stats = client.get_pool_stats()
+    
+    assert stats["backend"] == "redis"
+    assert (stats["in_use"], stats["idle"], stats["saturation"]) == (2, 0, 1.0)
+    assert stats["pool_timeouts"] == 1 and stats["checkouts"] == 2
+
+
+def test_unreachable_server_falls_back_to_the_mock_pool():
+    client = RedisClient(connection_string="redis://127.0.0.1:1", socket_timeout=0.5, local_cache_prefixes=())
+    
+    async def run():
+        await client.connect()
+        stored = await client.set("key", {"value": 1})
+        value = await client.get("key")
+        await client.disconnect()
+        return stored, value
+        
+    stored, value = asyncio.run(run())
+    
+    assert isinstance(client.redis_pool, MockRedisPool)
+    assert client.redis is None
+    assert stored is True and value == {"value": 1}
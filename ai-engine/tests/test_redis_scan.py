@@ -0,0 +1,75 @@
+import asyncio
+import fnmatch
+from typing import Dict, List
+
+from src.database.redis_client import RedisClient
+
+
+class ScanningRedis:
+    """Server stand-in that records SCAN batch sizes and UNLINK calls"""
+    
+    def __init__(self, keys: List[str]):
+        self.store: Dict[bytes, bytes] = {key.encode("utf-8"): b"1" for key in keys}
+        self.scan_counts: List[int] = []
+        self.unlinks: List[tuple] = []
+    
+    async def scan_iter(self, match: str = "*", count: int = 10):
+        self.scan_counts.append(count)
+        for key in list(self.store):
+            if fnmatch.fnmatch(key.decode("utf-8"), match):
+                yield key
+    
+    async def keys(self, pattern: str = "*"):
+        raise AssertionError("KEYS blocks the server")
+    
+    async def unlink(self, *keys):
+        self.unlinks.append(keys)
+        return sum(self.store.pop(key.encode("utf-8"), None) is not None for key in keys)
+    
+    async def publish(self, channel, message):
+        return 0
+
+
+def make_client(keys: List[str]) -> RedisClient:
+    client = RedisClient(local_cache_prefixes=())
+    client.redis = ScanningRedis(keys)
+    return client
+
+
+def test_keys_uses_scan_and_decodes_names():
+    client = make_client(["product_1", "product_2", "news_1"])
+    
+    assert sorted(asyncio.run(client.keys("product_*"))) == ["product_1", "product_2"]
+    assert client.redis.scan_counts == [1000]
+
+
+def test_delete_pattern_unlinks_in_batches():
+    keys = [f"trade_analysis_{index}" for index in range(7)]
+    client = make_client(keys + ["product_1"])
+    
+    assert asyncio.run(client.delete_pattern("trade_analysis_*", batch_size=3)) == 7
+    assert [len(batch) for batch in client.redis.unlinks] == [3, 3, 1]
+    assert client.redis.scan_counts == [3]
+    assert list(client.redis.store) == [b"product_1"]
+
+
+def test_delete_pattern_without_matches():
+    client = make_client(["product_1"])
+    
+    assert asyncio.run(client.delete_pattern("missing_*")) == 0
+    assert client.redis.unlinks == []
+
+
+def test_scan_and_delete_on_the_mock_pool(redis_client):
+    async def run():
+        await redis_client.set_many({f"news_{index}": index for index in range(5)})
+        await redis_client.set("product_1", {"name": "tea"})
+        scanned = sorted([key async for key in redis_client.scan_keys("news_*", count=2)])
+        deleted = await redis_client.delete_pattern("news_*", batch_size=2)
+        return scanned, deleted, await redis_client.keys()
+        
+    scanned, deleted, remaining = asyncio.run(run())
+    
+    assert scanned == [f"news_{index}" for index in range(5)]
+    assert deleted == 5
+    assert remaining == ["product_1"]
@@ -0,0 +1,111 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from src.models.registry import CURRENT_FILE, MANIFEST_FILE, ModelRegistry, VersionWatch
+
+
+@pytest.fixture
+def registry(tmp_path) -> ModelRegistry:
+    return ModelRegistry(str(tmp_path), keep_versions=2)
+
+
+def publish(registry: ModelRegistry, scale: float = 1.0) -> str:
+    return registry.publish(
+        "demo",
+        {"scaler": {"scale": scale}, "labels": ["a", "b"]},
+        {"n_samples": 10},
+        arrays={"tree": {"value": np.arange(5, dtype=np.float64) * scale, "max_depth": 3}}
+    )
+
+
+def test_publish_and_load_round_trip(registry):
+    version = publish(registry)
+    loaded_version, artifacts, manifest = registry.load("demo")
+    
+    assert loaded_version == version == registry.current_version("demo")
+    assert artifacts["scaler"] == {"scale": 1.0}
+    assert artifacts["labels"] == ["a", "b"]
+    assert manifest["metadata"] == {"n_samples": 10}
+    np.testing.assert_array_equal(artifacts["tree"]["value"], np.arange(5))
+    assert int(artifacts["tree"]["max_depth"]) == 3
+
+
+def test_arrays_are_memory_mapped_read_only(registry):
+    publish(registry)
+    _, artifacts, _ = registry.load("demo")
+    
+    value = artifacts["tree"]["value"]
+    assert isinstance(value, np.memmap)
+    with pytest.raises(ValueError):
+        value[0] = 1.0
+        
+    _, artifacts, _ = registry.load("demo", mmap=False)
+    assert not isinstance(artifacts["tree"]["value"], np.memmap)
+
+
+def test_load_only_requested_artifacts(registry):
+    publish(registry)
+    _, artifacts, _ = registry.load("demo", artifacts=["tree", "scaler", "not_published"])
+    assert sorted(artifacts) == ["scaler", "tree"]
+
+
+def test_checksum_mismatch_is_rejected(registry):
+    version = publish(registry)
+    manifest = registry.get_manifest("demo")
+    path = os.path.join(registry.root, "demo", version, manifest["arrays"]["tree"]["value"]["file"])
+    with open(path, "r+b") as handle:
+        handle.seek(-1, os.SEEK_END)
+        handle.write(b"\x01")
+        
+    with pytest.raises(ValueError):
+        registry.load("demo")
+    registry.load("demo", verify=False)
+
+
+def test_missing_model_raises_file_not_found(registry):
+    assert registry.current_version("demo") is None
+    with pytest.raises(FileNotFoundError):
+        registry.load("demo")
+
+
+def test_publish_moves_current_and_prunes_old_versions(registry):
+    versions = [publish(registry, scale) for scale in (1.0, 2.0, 3.0)]
+    
+    assert registry.current_version("demo") == versions[-1]
+    assert registry.list_versions("demo") == versions[1:]
+    assert not any(entry.startswith(".staging") for entry in os.listdir(os.path.join(registry.root, "demo")))
+    _, artifacts, _ = registry.load("demo", versions[1])
+    assert artifacts["scaler"] == {"scale": 2.0}
+
+
+def test_prune_keeps_the_current_version(registry):
+    versions = [publish(registry, scale) for scale in (1.0, 2.0, 3.0)]
+    with open(os.path.join(registry.root, "demo", CURRENT_FILE), "w") as handle:
+        handle.write(versions[1])  # rolled back
+    registry.keep_versions = 1
+    
+    assert registry.prune("demo") == []
+    assert registry.list_versions("demo") == versions[1:]
+
+
+def test_manifest_records_file_checksums(registry):
+    version = publish(registry)
+    with open(os.path.join(registry.root, "demo", version, MANIFEST_FILE)) as handle:
+        manifest = json.load(handle)
+        
+    assert manifest["version"] == version
+    assert set(manifest["artifacts"]) == {"scaler", "labels"}
+    assert set(manifest["arrays"]["tree"]) == {"value", "max_depth"}
+    assert all(len(entry["sha256"]) == 64 for entry in manifest["artifacts"].values())
+
+
+def test_version_watch_reports_new_versions(registry):
+    watch = VersionWatch(registry, "demo", interval=0)
+    assert watch.newer_than(None) is None
+    
+    version = publish(registry)
+    assert watch.newer_than(None) == version
+    assert watch.newer_than(version) is None
@@ -0,0 +1,58 @@
+import asyncio
+
+from src.utils.single_flight import SingleFlight
+
+
+def test_single_flight_runs_concurrent_callers_once(redis_client):
+    single_flight = SingleFlight(redis_client)
+    calls = []
+    
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "value"
+    
+    async def run():
+        return await asyncio.gather(*(single_flight.do("key", compute) for _ in range(5)))
+    
+    assert asyncio.run(run()) == ["value"] * 5
+    assert len(calls) == 1
+    assert single_flight.stats["local_waits"] == 4
+    assert not single_flight.inflight
+
+
+def test_single_flight_waits_for_another_workers_result(redis_client):
+    leader, follower = SingleFlight(redis_client), SingleFlight(redis_client, poll_interval=0.01)
+    follower_calls = []
+    
+    async def lead():
+        await asyncio.sleep(0.05)
+        await redis_client.set("key", "from leader")
+        return "from leader"
+    
+    async def follow():
+        follower_calls.append(1)
+        return "from follower"
+    
+    async def run():
+        leading = asyncio.create_task(leader.do("key", lead))
+        await asyncio.sleep(0.01)  # the leader holds the lock
+        return await asyncio.gather(leading, follower.do("key", follow))
+    
+    assert asyncio.run(run()) == ["from leader", "from leader"]
+    assert not follower_calls
+    assert follower.stats["remote_hits"] == 1
+
+
+def test_single_flight_shares_failures_and_forgets_them(redis_client):
+    single_flight = SingleFlight(redis_client)
+    
+    async def compute():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+    
+    async def run():
+        return await asyncio.gather(*(single_flight.do("key", compute) for _ in range(3)), return_exceptions=True)
+    
+    assert all(isinstance(result, RuntimeError) for result in asyncio.run(run()))
+    assert not single_flight.inflight
@@ -0,0 +1,104 @@
+import asyncio
+from typing import Any, Dict, List
+
+import pytest
+from pymongo.errors import AutoReconnect
+from pymongo.read_preferences import SecondaryPreferred
+
+from src.database.embedded_storage import EmbeddedStorage
+from src.database.mongodb_client import MongoDBClient
+
+
+class FakeCursor:
+    """Async cursor that hands out documents and can fail part way"""
+    
+    def __init__(self, documents: List[Dict[str, Any]], fail_after: int = -1):
+        self.documents = documents
+        self.fail_after = fail_after
+        self.batch = None
+    
+    def sort(self, sort):
+        self.documents = sorted(self.documents, key=lambda document: document[sort[0][0]], reverse=sort[0][1] < 0)
+        return self
+    
+    def limit(self, limit):
+        self.documents = self.documents[:limit]
+        return self
+    
+    def batch_size(self, batch_size):
+        self.batch = batch_size
+        return self
+    
+    def __aiter__(self):
+        return self._iterate()
+    
+    async def _iterate(self):
+        for position, document in enumerate(self.documents):
+            if position == self.fail_after:
+                raise AutoReconnect("connection reset")
+            yield document
+
+
+class FakeDatabase:
+    def __init__(self, cursor: FakeCursor):
+        self.cursor = cursor
+        self.read_preferences: List[Any] = []
+    
+    def get_collection(self, name, read_preference=None):
+        self.read_preferences.append(read_preference)
+        return self
+    
+    def __getitem__(self, name):
+        self.read_preferences.append(None)
+        return self
+    
+    def find(self, filter_query, projection=None):
+        return self.cursor
+
+
+def make_client(cursor: FakeCursor) -> MongoDBClient:
+    client = MongoDBClient()
+    client.db = FakeDatabase(cursor)
+    return client
+
+
+async def collect(iterator) -> List[Any]:
+    return [item async for item in iterator]
+
+
+def test_streams_from_a_secondary_in_server_batches():
+    cursor = FakeCursor([{"_id": index} for index in range(5)])
+    client = make_client(cursor)
+    
+    documents = asyncio.run(collect(client.iter_documents("orders", sort=[("_id", -1)], limit=3, batch_size=2)))
+    
+    assert [document["_id"] for document in documents] == [4, 3, 2]
+    assert cursor.batch == 2
+    assert isinstance(client.db.read_preferences[-1], SecondaryPreferred)
+
+
+def test_stream_errors_are_raised_not_truncated():
+    client = make_client(FakeCursor([{"_id": index} for index in range(5)], fail_after=3))
+    received = []
+    
+    async def run():
+        async for document in client.iter_documents("orders"):
+            received.append(document)
+            
+    with pytest.raises(AutoReconnect):
+        asyncio.run(run())
+    assert len(received) == 3
+    
+    with pytest.raises(AutoReconnect):
+        asyncio.run(collect(make_client(FakeCursor([{"_id": 1}], fail_after=0)).iter_batches("orders")))
+
+
+def test_iter_batches_groups_the_stream():
+    storage = EmbeddedStorage()
+    storage.seed({"orders": [{"_id": index, "status": "open" if index % 2 else "closed"} for index in range(7)]})
+    
+    batches = asyncio.run(collect(storage.iter_batches("orders", {"status": "open"}, batch_size=2)))
+    assert [[document["_id"] for document in batch] for batch in batches] == [[1, 3], [5]]
+    
+    orders = asyncio.run(collect(storage.stream_orders("closed", projection={"status": 1}, limit=2)))
+    assert orders == [{"_id": 0, "status": "closed"}, {"_id": 2, "status": "closed"}]
@@ -0,0 +1,63 @@
+import numpy as np
+
+from src.models.trade_analytics_models import TRAINING_COUNTRIES, TRAINING_PRODUCT_CATEGORIES, ComprehensiveArbitrageModel
+
+COLUMNS = {
+    "source_countries", "target_countries", "product_categories", "quantities", "source_prices",
+    "seasonal_factors", "market_volatility", "trade_relationship", "market_prices", "demand_scores", "risk_scores"
+}
+
+
+def test_columns_have_one_row_per_sample_within_range():
+    data = ComprehensiveArbitrageModel()._generate_training_data(n_samples=5000)
+    
+    assert set(data) == COLUMNS
+    assert all(len(column) == 5000 for column in data.values())
+    assert set(data["source_countries"]) <= set(TRAINING_COUNTRIES)
+    assert set(data["product_categories"]) == set(TRAINING_PRODUCT_CATEGORIES)
+    assert data["quantities"].min() >= 100 and data["quantities"].max() < 10000
+    assert data["demand_scores"].max() <= 1.0 and data["risk_scores"].max() <= 1.0
+
+
+def test_targets_follow_the_row_features():
+    data = ComprehensiveArbitrageModel()._generate_training_data(n_samples=1000)
+    
+    expected_prices = (
+        data["source_prices"]
+        * (1.5 + 0.5 * data["trade_relationship"])
+        * (1 + 0.3 * data["market_volatility"])
+        * data["seasonal_factors"]
+    )
+    expected_risk = np.minimum(
+        1.0, 0.3 + 0.4 * data["market_volatility"] + 0.3 * (1 - data["trade_relationship"])
+    )
+    attractiveness = np.minimum(1.0, (data["market_prices"] - data["source_prices"]) / data["source_prices"])
+    
+    np.testing.assert_allclose(data["market_prices"], expected_prices)
+    np.testing.assert_allclose(data["risk_scores"], expected_risk)
+    # Demand is attractiveness scaled by the relationship and a 0.7-1.0 draw
+    ratio = data["demand_scores"] / (attractiveness * data["trade_relationship"])
+    assert ratio.min() >= 0.7 - 1e-9 and ratio.max() <= 1.0 + 1e-9
+
+
+def test_generation_is_reproducible_per_seed():
+    model = ComprehensiveArbitrageModel()
+    first = model._generate_training_data(n_samples=500, seed=7)
+    second = model._generate_training_data(n_samples=500, seed=7)
+    other = model._generate_training_data(n_samples=500, seed=8)
+    
+    for column in COLUMNS:
+        np.testing.assert_array_equal(first[column], second[column])
+    assert not np.array_equal(first["source_prices"], other["source_prices"])
+
+
+def test_chunks_stream_the_same_rows():
+    model = ComprehensiveArbitrageModel()
+    model.training_chunk_size = 300
+    
+    chunks = list(model.iter_training_data(1000, seed=3))
+    combined = model._generate_training_data(n_samples=1000, seed=3)
+    
+    assert [len(chunk["quantities"]) for chunk in chunks] == [300, 300, 300, 100]
+    for column in COLUMNS:
+        np.testing.assert_array_equal(np.concatenate([chunk[column] for chunk in chunks]), combined[column])
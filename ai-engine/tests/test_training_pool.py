@@ -0,0 +1,78 @@
+import asyncio
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from src.models import training
+from src.models.trade_analytics_models import ARBITRAGE_MODEL_NAME, ComprehensiveArbitrageModel
+from src.models.training import get_training_executor, run_training, shutdown_training_executor
+
+
+@pytest.fixture(autouse=True)
+def training_pool():
+    yield
+    shutdown_training_executor()
+
+
+def test_fits_run_in_a_separate_process():
+    assert asyncio.run(run_training(os.getpid)) != os.getpid()
+
+
+def test_dead_worker_resets_the_pool():
+    pool = get_training_executor()
+    
+    with pytest.raises(BrokenProcessPool):
+        asyncio.run(run_training(os._exit, 1))
+    assert training._executor is None
+    
+    assert asyncio.run(run_training(abs, -3)) == 3
+    assert training._executor is not pool
+
+
+def test_concurrent_retrains_share_one_run_and_hot_swap(tmp_path):
+    model = ComprehensiveArbitrageModel()
+    model.registry.root = str(tmp_path)
+    model.version_watch.registry = model.registry
+    model.training_samples = 500
+    
+    async def run():
+        await model.train_models(wait=False)
+        first_task = model.training_task
+        # The loop keeps running while the worker fits
+        ticks = 0
+        while not first_task.done():
+            ticks += 1
+            await asyncio.sleep(0.01)
+        first_version = model.model_version
+        
+        await asyncio.gather(model.train_models(), model.train_models())
+        return first_task, ticks, first_version
+        
+    first_task, ticks, first_version = asyncio.run(run())
+    
+    assert ticks > 0
+    assert model.training_task is not first_task
+    assert model.is_trained and model.compiled_models
+    assert model.model_version != first_version
+    assert model.registry.current_version(ARBITRAGE_MODEL_NAME) == model.model_version
+    # The two concurrent calls published one version between them
+    versions = [entry.name for entry in (tmp_path / ARBITRAGE_MODEL_NAME).iterdir() if entry.is_dir()]
+    assert sorted(versions) == sorted([first_version, model.model_version])
+
+
+def test_failed_retrain_keeps_serving_the_current_models(tmp_path, monkeypatch):
+    model = ComprehensiveArbitrageModel()
+    model.registry.root = str(tmp_path)
+    model.version_watch.registry = model.registry
+    model.training_samples = 500
+    asyncio.run(model.train_models())
+    version = model.model_version
+    
+    async def broken(*args):
+        raise BrokenProcessPool("worker died")
+        
+    monkeypatch.setattr("src.models.trade_analytics_models.run_training", broken)
+    asyncio.run(model.train_models())
+    
+    assert model.model_version == version and model.is_trained
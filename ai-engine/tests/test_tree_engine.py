@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import GradientBoostingRegressor, RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+
+from src.models.tree_engine import TreeEnsemble, export_tree_ensemble
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(400, 5))
+    y = X[:, 0] * 3 + np.sin(X[:, 1]) - X[:, 2] * X[:, 3] + rng.normal(scale=0.1, size=400)
+    return X, y, rng.normal(size=(1000, 5))
+
+
+@pytest.mark.parametrize("model", [
+    RandomForestRegressor(n_estimators=20, max_depth=6, random_state=0),
+    GradientBoostingRegressor(n_estimators=30, max_depth=4, random_state=0),
+    RandomForestRegressor(n_estimators=5, random_state=0)  # unbounded depth, uneven trees
+])
+def test_matches_sklearn(data, model):
+    X, y, X_test = data
+    model.fit(X, y)
+    engine = TreeEnsemble.from_model(model)
+    
+    np.testing.assert_allclose(engine.predict(X_test), model.predict(X_test), rtol=1e-9, atol=1e-9)
+    np.testing.assert_allclose(engine.predict(X_test[:1]), model.predict(X_test[:1]), rtol=1e-9, atol=1e-9)
+
+
+def test_chunked_prediction_matches_one_pass(data):
+    X, y, X_test = data
+    model = RandomForestRegressor(n_estimators=10, max_depth=5, random_state=0).fit(X, y)
+    arrays = export_tree_ensemble(model)
+    
+    np.testing.assert_array_equal(
+        TreeEnsemble(arrays, chunk_rows=7).predict(X_test), TreeEnsemble(arrays).predict(X_test)
+    )
+
+
+def test_export_layout(data):
+    X, y, _ = data
+    model = RandomForestRegressor(n_estimators=3, max_depth=3, random_state=0).fit(X, y)
+    arrays = export_tree_ensemble(model)
+    
+    assert len(arrays["roots"]) == 3
+    assert arrays["n_features"] == 5
+    leaves = np.flatnonzero(np.isinf(arrays["threshold"]))
+    # Leaves point at themselves so traversal can run a fixed number of steps
+    np.testing.assert_array_equal(arrays["left"][leaves], leaves)
+    np.testing.assert_array_equal(arrays["right"][leaves], leaves)
+
+
+def test_rejects_wrong_feature_count(data):
+    X, y, _ = data
+    engine = TreeEnsemble.from_model(RandomForestRegressor(n_estimators=2, random_state=0).fit(X, y))
+    with pytest.raises(ValueError):
+        engine.predict(np.zeros((2, 4)))
+
+
+def test_rejects_unsupported_models(data):
+    X, y, _ = data
+    with pytest.raises(TypeError):
+        export_tree_ensemble(LinearRegression().fit(X, y))
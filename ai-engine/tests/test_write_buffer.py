@@ -0,0 +1,206 @@
+import asyncio
+from typing import Any, Dict, List
+
+import pytest
+from bson.errors import InvalidDocument
+from pymongo.errors import AutoReconnect, BulkWriteError
+
+from src.database.write_buffer import WriteBehindBuffer, WriteBufferFull
+
+
+class FakeCollection:
+    """insert_many stand-in that fails a set number of times, then stores"""
+    
+    def __init__(self, failures: int = 0, write_before_failing: int = 0, reject: Any = None):
+        self.failures = failures
+        self.write_before_failing = write_before_failing  # documents stored by a failing call
+        self.reject = reject  # predicate for documents the server refuses
+        self.documents: List[Dict[str, Any]] = []
+        self.calls = 0
+    
+    async def insert_many(self, documents, ordered=True):
+        self.calls += 1
+        if any("unencodable" in document for document in documents):
+            raise InvalidDocument("cannot encode object")
+        for document in documents:
+            document.setdefault("_id", id(document))
+        if self.failures:
+            self.failures -= 1
+            stored_ids = {document["_id"] for document in self.documents}
+            self.documents.extend(
+                document for document in documents[:self.write_before_failing] if document["_id"] not in stored_ids
+            )
+            raise AutoReconnect("connection reset")
+            
+        stored_ids = {document["_id"] for document in self.documents}
+        errors = []
+        for index, document in enumerate(documents):
+            if document["_id"] in stored_ids:
+                errors.append({"index": index, "code": 11000, "errmsg": "duplicate key"})
+            elif self.reject and self.reject(document):
+                errors.append({"index": index, "code": 121, "errmsg": "validation failed"})
+            else:
+                self.documents.append(document)
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nInserted": len(documents) - len(errors)})
+
+
+class FakeDatabase(dict):
+    def __missing__(self, name):
+        self[name] = FakeCollection()
+        return self[name]
+
+
+def make_buffer(db, **kwargs) -> WriteBehindBuffer:
+    options = {"max_batch": 10, "max_delay": 0.05, "max_pending": 50, "retry_backoff": 0.001}
+    options.update(kwargs)
+    return WriteBehindBuffer(db, **options)
+
+
+def test_flushes_full_batches_immediately():
+    db = FakeDatabase()
+    buffer = make_buffer(db, max_batch=5)
+    
+    async def run():
+        await buffer.enqueue_many("news_impacts", [{"n": index} for index in range(12)])
+    
+    asyncio.run(run())
+    assert len(db["news_impacts"].documents) == 10
+    assert buffer.pending == 2
+
+
+def test_background_flush_writes_after_max_delay():
+    db = FakeDatabase()
+    buffer = make_buffer(db)
+    
+    async def run():
+        buffer.start()
+        futures = await buffer.enqueue_many("predictions", [{"n": index} for index in range(3)])
+        results = await asyncio.wait_for(asyncio.gather(*futures), timeout=1)
+        await buffer.close()
+        return results
+    
+    assert asyncio.run(run()) == [True, True, True]
+    assert len(db["predictions"].documents) == 3
+
+
+def test_close_flushes_everything_still_queued():
+    db = FakeDatabase()
+    buffer = make_buffer(db, max_delay=60)
+    
+    async def run():
+        buffer.start()
+        await buffer.enqueue_many("market_data", [{"n": index} for index in range(7)])
+        await buffer.enqueue("predictions", {"n": 0})
+        await buffer.close()
+    
+    asyncio.run(run())
+    assert len(db["market_data"].documents) == 7
+    assert len(db["predictions"].documents) == 1
+    assert buffer.pending == 0
+    assert buffer.flush_task is None
+
+
+def test_transient_failures_are_retried_without_duplicates():
+    db = FakeDatabase()
+    db["news_impacts"] = FakeCollection(failures=2, write_before_failing=2)
+    buffer = make_buffer(db)
+    
+    async def run():
+        futures = await buffer.enqueue_many("news_impacts", [{"n": index} for index in range(4)])
+        written = await buffer.flush_all()
+        return written, [future.result() for future in futures]
+    
+    assert asyncio.run(run()) == (4, [True] * 4)
+    assert sorted(document["n"] for document in db["news_impacts"].documents) == [0, 1, 2, 3]
+    assert buffer.stats["retries"] == 2
+
+
+def test_batches_still_failing_are_requeued_not_dropped():
+    db = FakeDatabase()
+    db["news_impacts"] = FakeCollection(failures=10)
+    buffer = make_buffer(db, max_retries=2)
+    
+    async def run():
+        futures = await buffer.enqueue_many("news_impacts", [{"n": index} for index in range(4)])
+        assert await buffer.flush_all() == 0
+        assert buffer.pending == 4 and not any(future.done() for future in futures)
+        
+        db["news_impacts"].failures = 0
+        assert await buffer.flush_all() == 4
+        return [future.result() for future in futures]
+    
+    assert asyncio.run(run()) == [True] * 4
+    assert [document["n"] for document in db["news_impacts"].documents] == [0, 1, 2, 3]
+    assert buffer.stats["requeued"] == 4
+    assert buffer.pending == 0
+
+
+def test_documents_written_before_a_requeue_are_not_counted_as_rejected():
+    db = FakeDatabase()
+    db["news_impacts"] = FakeCollection(failures=2, write_before_failing=3)
+    buffer = make_buffer(db, max_retries=1)
+    
+    async def run():
+        futures = await buffer.enqueue_many("news_impacts", [{"n": index} for index in range(4)])
+        assert await buffer.flush_all() == 0
+        assert await buffer.flush_all() == 4
+        return [future.result() for future in futures]
+    
+    assert asyncio.run(run()) == [True] * 4
+    assert buffer.stats["rejected"] == 0
+    assert len(db["news_impacts"].documents) == 4
+
+
+def test_unencodable_document_is_isolated_and_rejected():
+    db = FakeDatabase()
+    buffer = make_buffer(db)
+    documents = [{"n": index} for index in range(7)]
+    documents[4]["unencodable"] = object()
+    
+    async def run():
+        futures = await buffer.enqueue_many("news_impacts", documents)
+        written = await buffer.flush_all()
+        return written, [future.result() for future in futures]
+    
+    written, results = asyncio.run(run())
+    assert written == 6
+    assert results == [True, True, True, True, False, True, True]
+    assert buffer.stats["rejected"] == 1
+    assert buffer.stats["requeued"] == 0
+    assert buffer.pending == 0
+
+
+def test_documents_the_server_rejects_are_reported():
+    db = FakeDatabase()
+    db["news_impacts"] = FakeCollection(reject=lambda document: document["n"] == 1)
+    buffer = make_buffer(db)
+    
+    async def run():
+        futures = await buffer.enqueue_many("news_impacts", [{"n": index} for index in range(3)])
+        await buffer.flush_all()
+        return [future.result() for future in futures]
+    
+    assert asyncio.run(run()) == [True, False, True]
+    assert buffer.stats["written"] == 2
+    assert buffer.stats["rejected"] == 1
+
+
+def test_full_buffer_refuses_writes_after_timeout():
+    db = FakeDatabase()
+    db["news_impacts"] = FakeCollection(failures=10 ** 6)
+    buffer = make_buffer(db, max_pending=5, max_retries=0, enqueue_timeout=0.1)
+    
+    async def run():
+        buffer.start()
+        await buffer.enqueue_many("news_impacts", [{"n": index} for index in range(5)])
+        try:
+            with pytest.raises(WriteBufferFull):
+                await buffer.enqueue("news_impacts", {"n": 5})
+        finally:
+            buffer.closing = True
+            await buffer.flush_task
+            
+    asyncio.run(run())
+    assert buffer.pending == 5
+    assert buffer.stats["backpressure_waits"] == 1